@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de las herramientas de traducción y verificación
+
+Uso:
+    python bench_i18n.py                                  # 1×/10×/100× y 100/1000/10000 reglas
+    python bench_i18n.py --scales 1 10 --rules 100 --repeat 3
+    python bench_i18n.py --compare bench-results/abc1234.json   # falla si algo empeora
+
+Genera páginas sintéticas a partir de info.html (su <body> repetido N veces,
+sin los data-i18n para que las reglas tengan trabajo) y tablas de reglas
+sintéticas que completan las reales hasta el tamaño pedido. Para cada
+herramienta mide cada fase (read, compile, parse, match, write) y el pico de
+memoria (tracemalloc, en una pasada aparte para no falsear los tiempos).
+
+  - translate_file:       MultiReplacer sobre la tabla TRANSLATIONS
+  - translate_info_html:  anotador de una pasada sobre INFO_RULES
+  - verify:               índice de html_index + comprobaciones de verify_translation
+
+El resultado se guarda en JSON (bench-results/<commit>.json por defecto) para
+comparar ejecuciones entre commits.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from build_cache import atomic_write_text
+from html_index import build_index
+from i18n_annotator import Rule, RuleTable, annotate
+from translate_info_complete import INFO_HTML, INFO_RULES, translate_info_html
+from translate_info_html import TRANSLATIONS, MultiReplacer, translate_file
+from verify_translation import CHECKS, verify
+
+RESULTS_DIR = 'bench-results'
+DEFAULT_SCALES = (1, 10, 100)
+DEFAULT_RULES = (100, 1000, 10000)
+DEFAULT_REPEAT = 5
+# Una de cada SYNTHETIC_HIT reglas sintéticas tiene su elemento en la página
+SYNTHETIC_HIT = 10
+REGRESSION_THRESHOLD = 0.10
+
+_I18N_ATTR_RE = re.compile(r'\s+data-i18n(?:-[a-z-]+)?="[^"]*"')
+_BODY_RE = re.compile(r'(<body[^>]*>)(.*)(</body>)', re.S)
+
+
+# --- datos sintéticos --------------------------------------------------------
+
+def _synthetic_text(i):
+    return f'Campo sintético {i}'
+
+
+def synthetic_page(base, scale, synthetic=0):
+    """``base`` sin data-i18n, con el <body> repetido ``scale`` veces"""
+    base = _I18N_ATTR_RE.sub('', base)
+    m = _BODY_RE.search(base)
+    block = ''.join(f'<label>{_synthetic_text(i)}</label>\n' for i in range(0, synthetic, SYNTHETIC_HIT))
+    body = (m.group(2) + block) * scale
+    return base[:m.start(2)] + body + base[m.end(2):]
+
+
+def replacer_table(size):
+    """TRANSLATIONS (recortada o completada hasta ``size`` entradas)"""
+    table = dict(list(TRANSLATIONS.items())[:size])
+    for i in range(size - len(table)):
+        text = _synthetic_text(i)
+        table[f'>{text}<'] = f' data-i18n="bench.field{i}">{text}<'
+    return table
+
+
+def annotator_rules(size):
+    """INFO_RULES (recortada o completada hasta ``size`` reglas)"""
+    rules = list(INFO_RULES[:size])
+    rules.extend(Rule('label', _synthetic_text(i), f'bench.field{i}') for i in range(size - len(rules)))
+    return rules
+
+
+def synthetic_count(tool, size):
+    real = len(TRANSLATIONS) if tool == 'translate_file' else len(INFO_RULES)
+    return max(0, size - real)
+
+
+# --- herramientas por fases --------------------------------------------------
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def phases_translate_file(path, size, out_path):
+    table = replacer_table(size)
+    yield 'read'
+    content = _read(path)
+    yield 'compile'
+    matcher = MultiReplacer(table)
+    yield 'match'
+    content = matcher.sub(content)
+    yield 'write'
+    atomic_write_text(out_path, content)
+
+
+def phases_translate_info_html(path, size, out_path):
+    rules = annotator_rules(size)
+    yield 'read'
+    content = _read(path)
+    yield 'compile'
+    table = RuleTable(rules)
+    yield 'match'
+    content, _ = annotate(content, table)
+    yield 'write'
+    atomic_write_text(out_path, content)
+
+
+def phases_verify(path, size, out_path):
+    yield 'read'
+    content = _read(path)
+    yield 'parse'
+    index = build_index(content)
+    yield 'match'
+    for _, _, check in CHECKS:
+        check(index)
+
+
+TOOLS = {
+    'translate_file': (phases_translate_file, True),
+    'translate_info_html': (phases_translate_info_html, True),
+    'verify': (phases_verify, False),
+}
+
+
+def _timed_phases(steps):
+    """Recorre el generador de fases y devuelve {fase: ms}"""
+    timings = {}
+    phase = None
+    start = time.perf_counter()
+    for next_phase in steps:
+        now = time.perf_counter()
+        if phase:
+            timings[phase] = (now - start) * 1000
+        phase, start = next_phase, now
+    if phase:
+        timings[phase] = (time.perf_counter() - start) * 1000
+    return timings
+
+
+def _peak_memory(steps):
+    tracemalloc.start()
+    try:
+        for _ in steps:
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def end_to_end(tool, path):
+    """Tiempo de la función real (tablas reales) sobre ``path``, en ms"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if tool == 'translate_file':
+            translate_file(path)
+        elif tool == 'translate_info_html':
+            translate_info_html(path)
+        else:
+            verify(path)
+    return (time.perf_counter() - start) * 1000
+
+
+# --- ejecución ---------------------------------------------------------------
+
+def run_case(tool, base, scale, size, repeat, workdir):
+    """Mide una combinación herramienta × escala × reglas"""
+    phases, uses_rules = TOOLS[tool]
+    synthetic = synthetic_count(tool, size) if uses_rules else 0
+    page = synthetic_page(base, scale, synthetic)
+    src = os.path.join(workdir, f'{tool}-{scale}x-{size}.html')
+    out = src + '.out'
+    atomic_write_text(src, page)
+
+    runs = [_timed_phases(phases(src, size, out)) for _ in range(repeat)]
+    names = list(runs[0])
+    result = {
+        'tool': tool,
+        'scale': scale,
+        'rules': size if uses_rules else None,
+        'page_bytes': len(page.encode('utf-8')),
+        'phases_ms': {name: statistics.median(r[name] for r in runs) for name in names},
+        'total_ms': statistics.median(sum(r.values()) for r in runs),
+        'min_total_ms': min(sum(r.values()) for r in runs),
+        'peak_bytes': _peak_memory(phases(src, size, out)),
+    }
+
+    # La función real, con sus tablas, sobre una copia de la página
+    copy = src + '.e2e.html'
+    e2e = []
+    for _ in range(repeat):
+        atomic_write_text(copy, page)
+        e2e.append(end_to_end(tool, copy))
+    result['end_to_end_ms'] = statistics.median(e2e)
+    return result
+
+
+def run_suite(scales, sizes, repeat, tools=None):
+    base = _read(INFO_HTML)
+    results = []
+    with tempfile.TemporaryDirectory(prefix='bench-i18n-') as workdir:
+        for tool in tools or TOOLS:
+            uses_rules = TOOLS[tool][1]
+            for scale in scales:
+                for size in (sizes if uses_rules else sizes[:1]):
+                    r = run_case(tool, base, scale, size, repeat, workdir)
+                    results.append(r)
+                    print_case(r)
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def case_id(r):
+    return f"{r['tool']}@{r['scale']}x/{r['rules'] or '-'}"
+
+
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD):
+    """
+    Casos cuyo tiempo empeora más de ``threshold`` respecto a ``baseline``.
+
+    Compara el mínimo de las repeticiones, que es menos ruidoso que la mediana.
+    """
+    previous = {case_id(r): r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get(case_id(r))
+        if old and old['min_total_ms'] > 0:
+            ratio = r['min_total_ms'] / old['min_total_ms'] - 1
+            if ratio > threshold:
+                regressions.append((case_id(r), old['min_total_ms'], r['min_total_ms'], ratio))
+    return regressions
+
+
+# --- informe -----------------------------------------------------------------
+
+def print_case(r):
+    phases = '  '.join(f'{name} {ms:.2f}' for name, ms in r['phases_ms'].items())
+    print(f"⏱️  {case_id(r):<34} {r['total_ms']:>9.2f} ms  [{phases}]  "
+          f"e2e {r['end_to_end_ms']:.2f} ms  pico {r['peak_bytes'] / 1024:,.0f} KiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de las herramientas de traducción")
+    parser.add_argument('--scales', type=int, nargs='+', default=list(DEFAULT_SCALES), help="Escalas de página")
+    parser.add_argument('--rules', type=int, nargs='+', default=list(DEFAULT_RULES), help="Tamaños de tabla de reglas")
+    parser.add_argument('--tools', nargs='+', choices=list(TOOLS), help="Herramientas a medir (por defecto, todas)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Repeticiones por caso (se usa la mediana)")
+    parser.add_argument('--output', help="JSON de salida (por defecto bench-results/<commit>.json)")
+    parser.add_argument('--compare', help="JSON de una ejecución anterior con el que comparar")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="Empeoramiento relativo que se considera regresión (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    commit = _git_commit()
+    print("=" * 60)
+    print(f"BENCHMARK I18N ({commit})")
+    print("=" * 60)
+    start = time.perf_counter()
+    results = run_suite(args.scales, args.rules, args.repeat, args.tools)
+
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    atomic_write_text(output, json.dumps({
+        'version': 1,
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': results,
+    }, indent=2) + '\n')
+    print("=" * 60)
+    print(f"💾 Resultados en {output}   Tiempo total: {time.perf_counter() - start:.1f} s")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, 'r', encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    if not regressions:
+        print(f"✅ Sin regresiones respecto a {args.compare}")
+        return 0
+    print(f"❌ Regresiones respecto a {args.compare}: {len(regressions)}")
+    for name, old, new, ratio in regressions:
+        print(f"   - {name}: {old:.2f} → {new:.2f} ms (+{ratio * 100:.0f}%)")
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de t(): recorrido del árbol anidado frente a las tablas planas
+
+Uso:
+    python bench_i18n_lookup.py                       # todas las claves, 100 vueltas × 5 repeticiones
+    python bench_i18n_lookup.py --rounds 50 --repeat 9
+    python bench_i18n_lookup.py --node /usr/local/bin/node
+
+Ejecuta en node tres implementaciones sobre el mismo catálogo:
+
+  - anidado:   el t() anterior (getCurrentLocale con JSON.parse del store,
+               split('.') + recorrido del árbol y un new RegExp por placeholder)
+  - aplanado:  i18n.js tal cual, que aplana el literal la primera vez
+  - enlazado:  i18n.js tras build_i18n_tables.py --link, con las tablas generadas
+
+La carga de trabajo es cada clave de cada idioma (las plantillas con todos sus
+parámetros) en dos escenarios: sin sesión y con sesión (token y un store de
+STORE_BYTES bytes en localStorage, que es cuando se parseaba el store en
+cada llamada). Antes de medir comprueba que las tres devuelven lo mismo.
+Todo se hace en una carpeta temporal: site/ no se toca.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from build_i18n_bundles import nest
+from build_i18n_tables import build_tables, link_runtime, render_module
+from i18n_catalog import I18N_JS, load_catalog
+
+DEFAULT_ROUNDS = 100
+DEFAULT_REPEAT = 5
+STORE_BYTES = 2048
+
+DRIVER = r"""
+const [dataPath, rounds, repeat] = [process.argv[2], Number(process.argv[3]), Number(process.argv[4])];
+const data = JSON.parse(require('fs').readFileSync(dataPath, 'utf8'));
+
+const storage = new Map();
+globalThis.localStorage = {
+  getItem: key => (storage.has(key) ? storage.get(key) : null),
+  setItem: (key, value) => storage.set(key, String(value)),
+  removeItem: key => storage.delete(key),
+};
+Object.defineProperty(globalThis, 'navigator', { value: { language: 'es-ES' }, configurable: true });
+
+// t() anterior, copiado tal cual de i18n.js
+function legacyFactory(translations) {
+  const SUPPORTED_LOCALES = ['es', 'en'];
+  function getCurrentLocale() {
+    const token = localStorage.getItem('token');
+    if (token) {
+      try {
+        const storeData = localStorage.getItem('store');
+        if (storeData) {
+          const store = JSON.parse(storeData);
+          if (store.language && SUPPORTED_LOCALES.includes(store.language)) return store.language;
+        }
+      } catch (e) {}
+    }
+    const stored = localStorage.getItem('app_locale');
+    if (stored && SUPPORTED_LOCALES.includes(stored)) return stored;
+    const browserLang = navigator.language?.split('-')[0];
+    if (browserLang && SUPPORTED_LOCALES.includes(browserLang)) return browserLang;
+    return 'es';
+  }
+  return function t(key, localeOrParams = null, params = null) {
+    let locale = null;
+    let replacements = null;
+    if (typeof localeOrParams === 'object' && localeOrParams !== null) {
+      replacements = localeOrParams;
+      locale = getCurrentLocale();
+    } else {
+      locale = localeOrParams || getCurrentLocale();
+      replacements = params;
+    }
+    const keys = key.split('.');
+    let value = translations[locale];
+    for (const k of keys) {
+      if (value && typeof value === 'object') value = value[k];
+      else break;
+    }
+    if (typeof value !== 'string') return key;
+    if (replacements && typeof replacements === 'object') {
+      for (const [placeholder, replacement] of Object.entries(replacements)) {
+        value = value.replace(new RegExp(`\\{${placeholder}\\}`, 'g'), replacement);
+      }
+    }
+    return value;
+  };
+}
+
+const SCENARIOS = {
+  'sin sesión': () => { storage.clear(); },
+  'con sesión': locale => {
+    storage.set('token', 'bench-token');
+    storage.set('store', JSON.stringify({ language: locale, padding: 'x'.repeat(data.storeBytes) }));
+  },
+};
+
+function run(t, calls) {
+  let out = 0;
+  for (const [key, params] of calls) out += t(key, params).length;
+  return out;
+}
+
+(async () => {
+  const impls = {
+    anidado: legacyFactory(data.nested),
+    aplanado: (await import(data.modules.aplanado)).t,
+    enlazado: (await import(data.modules.enlazado)).t,
+  };
+  const results = [];
+  for (const [scenario, setup] of Object.entries(SCENARIOS)) {
+    for (const [locale, calls] of Object.entries(data.workload)) {
+      setup(locale);
+      storage.set('app_locale', locale);
+      const expected = calls.map(([key, params]) => impls.anidado(key, params));
+      const mismatches = {};
+      for (const [name, t] of Object.entries(impls)) {
+        const bad = calls.filter(([key, params], i) => t(key, params) !== expected[i]).map(([key]) => key);
+        if (bad.length) mismatches[name] = bad.slice(0, 5);
+      }
+      const timings = {};
+      for (const [name, t] of Object.entries(impls)) {
+        run(t, calls);  // calentamiento (y, en aplanado, construir la tabla)
+        const samples = [];
+        for (let r = 0; r < repeat; r++) {
+          const start = process.hrtime.bigint();
+          for (let i = 0; i < rounds; i++) run(t, calls);
+          samples.push(Number(process.hrtime.bigint() - start) / (rounds * calls.length));
+        }
+        samples.sort((a, b) => a - b);
+        timings[name] = samples[Math.floor(samples.length / 2)];
+      }
+      results.push({ scenario, locale, calls: calls.length, timings, mismatches });
+    }
+  }
+  console.log(JSON.stringify(results));
+})().catch(err => { console.error(err); process.exit(1); });
+"""
+
+
+def workload(catalog):
+    """{locale: [[clave, parámetros | null], ...]}: cada clave, las plantillas con todos sus parámetros"""
+    calls = {}
+    for locale, entries in build_tables(catalog).items():
+        calls[locale] = [
+            [key, {name: f'<{name}>' for name in entry[1::2]} if isinstance(entry, list) else None]
+            for key, entry in entries
+        ]
+    return calls
+
+
+def prepare(workdir, source, catalog):
+    """Copia i18n.js (aplanado) e i18n.js enlazado + tablas en ``workdir``; devuelve sus URLs"""
+    with open(os.path.join(workdir, 'package.json'), 'w', encoding='utf-8') as f:
+        f.write('{"type": "module"}\n')
+    modules = {}
+    for name in ('aplanado', 'enlazado'):
+        folder = os.path.join(workdir, name)
+        os.makedirs(folder)
+        text = source
+        if name == 'enlazado':
+            text = link_runtime(source)
+            with open(os.path.join(folder, 'i18n-tables.js'), 'w', encoding='utf-8') as f:
+                f.write(render_module(build_tables(catalog), 'bench'))
+        path = os.path.join(folder, 'i18n.js')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        modules[name] = 'file://' + os.path.abspath(path)
+    return modules
+
+
+def report(results):
+    names = list(results[0]['timings'])
+    print("=" * 72)
+    print("t(): ÁRBOL ANIDADO vs TABLAS PLANAS (ns por llamada, mediana)")
+    print("=" * 72)
+    print(f"{'Escenario':<22} {'Llamadas':>8} " + ' '.join(f"{n:>10}" for n in names) + f" {'Mejora':>8}")
+    failed = False
+    for r in results:
+        timings = r['timings']
+        best = min(timings[n] for n in names[1:])
+        print(f"{r['scenario'] + ' (' + r['locale'] + ')':<22} {r['calls']:>8} "
+              + ' '.join(f"{timings[n]:>10.1f}" for n in names) + f" {timings[names[0]] / best:>7.1f}×")
+        for name, keys in r['mismatches'].items():
+            failed = True
+            print(f"   ❌ {name} no coincide con el t() anterior en: {', '.join(keys)}")
+    print("=" * 72)
+    print("❌ Hay diferencias en el resultado" if failed else "✅ Las tres implementaciones devuelven lo mismo")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara el t() anidado con las tablas planas precompiladas")
+    parser.add_argument('--rounds', type=int, default=DEFAULT_ROUNDS, help="Pasadas por el catálogo en cada medida")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Medidas por caso (se usa la mediana)")
+    parser.add_argument('--node', default='node', help="Ejecutable de node")
+    args = parser.parse_args(argv)
+
+    if not shutil.which(args.node):
+        print(f"❌ No se encuentra node ({args.node})")
+        return 1
+    with open(I18N_JS, 'r', encoding='utf-8') as f:
+        source = f.read()
+    catalog = load_catalog()
+    if not any(catalog.values()):
+        print(f"❌ {I18N_JS} no tiene traducciones (¿ya se ejecutó con --link o --strip?)")
+        return 1
+
+    with tempfile.TemporaryDirectory(prefix='bench-i18n-') as workdir:
+        data = {
+            'nested': {locale: nest(flat) for locale, flat in catalog.items()},
+            'workload': workload(catalog),
+            'modules': prepare(workdir, source, catalog),
+            'storeBytes': STORE_BYTES,
+        }
+        data_path = os.path.join(workdir, 'data.json')
+        with open(data_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        driver_path = os.path.join(workdir, 'driver.cjs')
+        with open(driver_path, 'w', encoding='utf-8') as f:
+            f.write(DRIVER)
+        proc = subprocess.run([args.node, driver_path, data_path, str(args.rounds), str(args.repeat)],
+                              capture_output=True, text=True)
+    if proc.returncode:
+        print(f"❌ node terminó con código {proc.returncode}:\n{proc.stderr}")
+        return 1
+    return 1 if report(json.loads(proc.stdout)) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
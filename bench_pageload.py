@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reproduce cargas de página concurrentes contra el sitio local y mide la latencia
+
+Uso:
+    python bench_pageload.py --serve                     # arranca serve_hosting + backend de pega
+    python bench_pageload.py --url http://127.0.0.1:5000 --users 20 --loads 10
+    python bench_pageload.py --serve --pages secciones/email.html --stub-latency 40
+
+Cada usuario virtual carga la página como lo haría un navegador:
+
+  1. pide el HTML;
+  2. pide los recursos por niveles de site_graph.page_assets() (CSS, scripts
+     y módulos de entrada; después fuentes, @import e imports; etc.), cada
+     nivel cuando ha terminado el anterior, que es cuando el navegador los
+     descubre. Cada recurso se pide con la URL que escriben el HTML, las
+     hojas y los módulos (tras fingerprint_assets.py, con su ?v=), y los
+     partials ya incrustados por inline_partials.py no se piden;
+  3. al final, las llamadas a /api/** que hace la página al arrancar.
+
+Cada usuario tiene su propio pool de conexiones keep-alive (como mucho
+--connections por origen) y su propia caché: lo inmutable o con max-age
+vigente no se pide, lo que tiene ETag se revalida con If-None-Match y lo
+no-store se descarga siempre. La primera carga de cada usuario es en frío y
+las siguientes en caliente.
+
+Informa p50/p95/p99 del tiempo hasta el último byte por página (frío y
+caliente) y por recurso.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+from html_index import build_index
+from inline_partials import MARK_ATTR
+from serve_hosting import load_target, make_server, start_stub_backend
+from site_graph import (SITE_DIR, css_imports, follows, is_local, js_imports, page_assets, page_refs, site_url,
+                        split_url)
+
+DEFAULT_URL = 'http://127.0.0.1:5000'
+DEFAULT_PAGES = ('secciones/inbox.html', 'secciones/email.html', 'secciones/info.html')
+DEFAULT_USERS = 10
+DEFAULT_LOADS = 5
+# Conexiones simultáneas por origen, como Chrome/Firefox en HTTP/1.1
+DEFAULT_CONNECTIONS = 6
+STUB_PORT = 8099
+SLOWEST_ASSETS = 10
+
+# Llamadas a la API que cada página hace al arrancar
+PAGE_API_CALLS = {
+    'secciones/inbox.html': ['/api/emails/get?page=1&sort=desc&sort_by=date'],
+    'secciones/email.html': ['/api/emails/get?page=1&sort=desc&sort_by=date'],
+    'secciones/info.html': ['/api/emails/past?limit=100', '/api/policies/get?policy_name=Preguntas%20Frecuentes'],
+}
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def percentile(values, pct):
+    """Percentil por el método del rango más cercano"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def referenced_urls(assets, site_dir=SITE_DIR):
+    """
+    {ruta: URL} con la que piden cada recurso el HTML, las hojas y los módulos.
+
+    Es la URL que descarga y cachea el navegador: tras fingerprint_assets.py
+    lleva ?v=<hash>, y con ella serve_hosting responde como inmutable.
+    """
+    urls = {}
+
+    def add(url, path):
+        if path and is_local(url) and path not in urls:
+            _, query = split_url(url)
+            urls[path] = site_url(path, site_dir) + (f'?{query}' if query else '')
+
+    for path, kind, _ in assets:
+        if kind == 'html':
+            with open(path, 'r', encoding='utf-8') as f:
+                index = build_index(f.read())
+            for ref in page_refs(path, site_dir, index):
+                add(ref.url, ref.path)
+            for el in index.by_tag('script'):
+                if el.attrs.get('type') == 'module' and 'src' not in el.attrs:
+                    for imp in js_imports(path, site_dir, index.inner_html(el)):
+                        add(imp.specifier, imp.path)
+        elif kind == 'module':
+            for imp in js_imports(path, site_dir):
+                if follows(imp):
+                    add(imp.specifier, imp.path)
+        elif kind == 'stylesheet':
+            for imp in css_imports(path, site_dir):
+                add(imp.specifier, imp.path)
+    return urls
+
+
+def inlined_partials(html_path):
+    """Nombres de los partials que la página ya trae incrustados (su módulo no los descarga)"""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        index = build_index(f.read())
+    return {el.attrs[MARK_ATTR] for el in index.with_attr(MARK_ATTR) if el.children}
+
+
+def load_plan(page, site_dir=SITE_DIR):
+    """[[url, ...] por nivel] de una página: HTML, recursos por profundidad y API"""
+    html_path = os.path.join(site_dir, page)
+    assets = page_assets(html_path, site_dir)
+    urls = referenced_urls(assets, site_dir)
+    inlined = inlined_partials(html_path)
+    levels = {}
+    for path, kind, depth in assets:
+        if kind == 'partial' and os.path.splitext(os.path.basename(path))[0] in inlined:
+            continue
+        levels.setdefault(depth, []).append(urls.get(path) or site_url(path, site_dir))
+    plan = [levels[d] for d in sorted(levels)]
+    if PAGE_API_CALLS.get(page):
+        plan.append(PAGE_API_CALLS[page])
+    return plan
+
+
+# --- cliente HTTP/1.1 --------------------------------------------------------
+
+class Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    async def request(self, host, url, headers):
+        lines = [f'GET {url} HTTP/1.1', f'Host: {host}', 'Accept-Encoding: br, gzip',
+                 *(f'{k}: {v}' for k, v in headers.items())]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b'\r\n\r\n')
+        status_line, *header_lines = head.decode('latin-1').split('\r\n')
+        status = int(status_line.split()[1])
+        response = {}
+        for line in header_lines:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                response[key.strip().lower()] = value.strip()
+        if response.get('transfer-encoding') == 'chunked':
+            size = 0
+            while True:
+                length = int((await self.reader.readline()).split(b';')[0], 16)
+                await self.reader.readexactly(length + 2)
+                size += length
+                if not length:
+                    break
+        else:
+            size = int(response.get('content-length') or 0)
+            await self.reader.readexactly(size)
+        return status, response, size
+
+    def close(self):
+        self.writer.close()
+
+
+class Origin:
+    """Pool de conexiones keep-alive hacia un origen, con un máximo simultáneo"""
+
+    def __init__(self, url, limit):
+        parts = urlsplit(url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.netloc = parts.netloc
+        self.slots = asyncio.Semaphore(limit)
+        self.idle = []
+
+    async def fetch(self, url, headers):
+        async with self.slots:
+            conn = self.idle.pop() if self.idle else None
+            if conn is None:
+                conn = Connection(*await asyncio.open_connection(self.host, self.port))
+            try:
+                result = await conn.request(self.netloc, url, headers)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                conn.close()
+                raise
+            if result[1].get('connection', '').lower() == 'close':
+                conn.close()
+            else:
+                self.idle.append(conn)
+            return result
+
+    def close(self):
+        for conn in self.idle:
+            conn.close()
+        self.idle.clear()
+
+
+class BrowserCache:
+    """Caché HTTP de un usuario: frescura por Cache-Control y validación por ETag"""
+
+    def __init__(self):
+        self.entries = {}
+
+    def lookup(self, url, now):
+        """('hit' | 'revalidate' | 'miss', cabeceras para la petición)"""
+        entry = self.entries.get(url)
+        if not entry:
+            return 'miss', {}
+        if entry['expires'] > now:
+            return 'hit', {}
+        if entry['etag']:
+            return 'revalidate', {'If-None-Match': entry['etag']}
+        return 'miss', {}
+
+    def store(self, url, status, headers, now):
+        cache_control = headers.get('cache-control', '').lower()
+        if 'no-store' in cache_control or status not in (200, 304):
+            self.entries.pop(url, None)
+            return
+        m = _MAX_AGE_RE.search(cache_control)
+        max_age = 0 if 'no-cache' in cache_control or not m else int(m.group(1))
+        entry = self.entries.setdefault(url, {'etag': None, 'expires': 0})
+        entry['etag'] = headers.get('etag', entry['etag'])
+        entry['expires'] = now + max_age
+
+
+# --- usuarios virtuales ------------------------------------------------------
+
+async def fetch_asset(origin, cache, url, samples):
+    start = time.perf_counter()
+    state, headers = cache.lookup(url, start)
+    if state == 'hit':
+        samples.append((url, 'cache', 0.0, 0))
+        return
+    status, response, size = await origin.fetch(url, headers)
+    cache.store(url, status, response, time.perf_counter())
+    samples.append((url, str(status), (time.perf_counter() - start) * 1000, size))
+
+
+async def load_page(origin, cache, plan):
+    """Carga una página nivel a nivel; devuelve (ms hasta el último byte, muestras)"""
+    samples = []
+    start = time.perf_counter()
+    for level in plan:
+        await asyncio.gather(*(fetch_asset(origin, cache, url, samples) for url in level))
+    return (time.perf_counter() - start) * 1000, samples
+
+
+async def virtual_user(base_url, page, plan, loads, connections, results):
+    origin = Origin(base_url, connections)
+    cache = BrowserCache()
+    try:
+        for i in range(loads):
+            ttlb, samples = await load_page(origin, cache, plan)
+            results.append({'page': page, 'warm': i > 0, 'ttlb': ttlb, 'samples': samples})
+    finally:
+        origin.close()
+
+
+async def run(base_url, pages, users, loads, connections):
+    results = []
+    plans = {page: load_plan(page) for page in pages}
+    for page in pages:
+        await asyncio.gather(*(virtual_user(base_url, page, plans[page], loads, connections, results)
+                               for _ in range(users)))
+    return results, plans
+
+
+# --- informe -----------------------------------------------------------------
+
+def _row(label, values):
+    return (f"{label:<44} {len(values):>5} {percentile(values, 50):>8.1f} {percentile(values, 95):>8.1f} "
+            f"{percentile(values, 99):>8.1f}")
+
+
+def report(results, plans, elapsed):
+    header = f"{'':<44} {'n':>5} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    print("=" * 78)
+    print("CARGA DE PÁGINAS (tiempo hasta el último byte)")
+    print("=" * 78)
+    print(header)
+    for page, plan in plans.items():
+        for warm in (False, True):
+            values = [r['ttlb'] for r in results if r['page'] == page and r['warm'] == warm]
+            if values:
+                print(_row(f"{page} ({'caliente' if warm else 'frío'})", values))
+        requests = sum(len(level) for level in plan)
+        print(f"   {requests} recursos en {len(plan)} niveles")
+
+    per_asset = {}
+    statuses = {}
+    for r in results:
+        for url, status, ms, _ in r['samples']:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status != 'cache':
+                per_asset.setdefault(url, []).append(ms)
+    print("-" * 78)
+    print("Recursos más lentos (p95, peticiones reales):")
+    print(header)
+    slowest = sorted(per_asset.items(), key=lambda item: -percentile(item[1], 95))[:SLOWEST_ASSETS]
+    for url, values in slowest:
+        print(_row(url if len(url) <= 44 else '…' + url[-43:], values))
+    print("=" * 78)
+    total = sum(statuses.values())
+    print(f"Respuestas: {', '.join(f'{s} {n}' for s, n in sorted(statuses.items()))}  "
+          f"({total / elapsed:,.0f} recursos/s)  Tiempo total: {elapsed:.1f} s")
+
+
+def serve_in_background(target, port, stub_latency):
+    """Arranca serve_hosting y un backend de pega en hilos; devuelve la URL base"""
+    start_stub_backend(STUB_PORT, stub_latency)
+    server = make_server(load_target(target), port=port, backend=f'http://127.0.0.1:{STUB_PORT}', quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de carga de páginas contra el sitio local")
+    parser.add_argument('--url', default=DEFAULT_URL, help="Origen a medir (ignorado con --serve)")
+    parser.add_argument('--pages', nargs='+', default=list(DEFAULT_PAGES), help="Páginas relativas a site/")
+    parser.add_argument('--users', type=int, default=DEFAULT_USERS, help="Usuarios virtuales concurrentes por página")
+    parser.add_argument('--loads', type=int, default=DEFAULT_LOADS, help="Cargas por usuario (la primera, en frío)")
+    parser.add_argument('--connections', type=int, default=DEFAULT_CONNECTIONS, help="Conexiones por origen y usuario")
+    parser.add_argument('--serve', action='store_true', help="Arranca serve_hosting.py con backend de pega")
+    parser.add_argument('--target', default='prod', help="Target de firebase.json para --serve")
+    parser.add_argument('--stub-latency', type=float, default=20, help="Latencia del backend de pega (ms)")
+    args = parser.parse_args(argv)
+
+    base_url = serve_in_background(args.target, 0, args.stub_latency) if args.serve else args.url
+    print(f"🎯 {base_url}: {args.users} usuarios × {args.loads} cargas × {len(args.pages)} páginas, "
+          f"{args.connections} conexiones por usuario")
+    start = time.perf_counter()
+    try:
+        results, plans = asyncio.run(run(base_url, args.pages, args.users, args.loads, args.connections))
+    except (ConnectionError, OSError) as e:
+        print(f"❌ No se puede conectar con {base_url}: {e}")
+        return 1
+    report(results, plans, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Caché incremental por hash de contenido para los scripts de build
+
+El manifiesto guarda, por etapa y por archivo, el SHA-256 de la entrada, de
+la salida y de las reglas usadas. Si ninguno cambia, la etapa se salta el
+archivo. Cada etapa tiene su propio archivo (.build-cache/manifest/<etapa>.json)
+y al guardar se vuelve a leer y solo se aplican las entradas que ha cambiado
+esta ejecución: dos etapas a la vez no se pisan, y dos ejecuciones de la misma
+etapa solo compiten por las rutas que ambas han tocado.
+
+Las escrituras son atómicas y solo se hacen cuando los bytes de salida
+cambian, así no se tocan los mtimes.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+MANIFEST_DIR = os.path.join('.build-cache', 'manifest')
+MANIFEST_VERSION = 1
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path):
+    with open(path, 'rb') as f:
+        return sha256_bytes(f.read())
+
+
+def fingerprint(*parts):
+    """Hash estable de datos serializables a JSON (tablas de reglas, opciones...)"""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=repr)
+    return sha256_bytes(payload.encode('utf-8'))
+
+
+def atomic_write(path, data):
+    """
+    Escribe ``data`` (bytes) en ``path`` de forma atómica, solo si cambia.
+
+    Devuelve True si el archivo se ha escrito.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    return True
+
+
+def atomic_write_text(path, text):
+    return atomic_write(path, text.encode('utf-8'))
+
+
+class Manifest:
+    """Manifiesto etapa → ruta → {input, output, rules}, un archivo JSON por etapa"""
+
+    def __init__(self, directory=MANIFEST_DIR):
+        self.directory = directory
+        self.stages = {}
+        # etapa → {ruta: entrada nueva o None si se ha borrado}
+        self.changes = {}
+
+    def stage_path(self, stage):
+        return os.path.join(self.directory, f'{stage}.json')
+
+    def _load(self, stage):
+        try:
+            with open(self.stage_path(stage), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            data = {}
+        return data.get('entries', {}) if data.get('version') == MANIFEST_VERSION else {}
+
+    def _entries(self, stage):
+        if stage not in self.stages:
+            self.stages[stage] = self._load(stage)
+        return self.stages[stage]
+
+    def _key(self, path):
+        return os.path.normpath(path).replace(os.sep, '/')
+
+    def entry(self, stage, path):
+        return self._entries(stage).get(self._key(path))
+
+    def is_fresh(self, stage, path, digest, rules):
+        """¿El archivo (con hash ``digest``) ya está procesado con estas reglas?"""
+        entry = self.entry(stage, path)
+        return (entry is not None and entry.get('rules') == rules
+                and digest in (entry.get('input'), entry.get('output')))
+
+    def record(self, stage, path, input_digest, output_digest, rules, **extra):
+        entry = {'input': input_digest, 'output': output_digest, 'rules': rules, **extra}
+        entries = self._entries(stage)
+        key = self._key(path)
+        if entries.get(key) != entry:
+            entries[key] = entry
+            self.changes.setdefault(stage, {})[key] = entry
+
+    def prune(self, stage):
+        """Elimina las entradas de archivos que ya no existen"""
+        entries = self._entries(stage)
+        for key in list(entries):
+            if not os.path.exists(key):
+                del entries[key]
+                self.changes.setdefault(stage, {})[key] = None
+
+    def save(self):
+        """Escribe las etapas con cambios; devuelve True si se ha escrito alguna"""
+        written = False
+        for stage, changes in self.changes.items():
+            # Se parte de lo que haya en disco ahora, no de lo leído al empezar
+            entries = self._load(stage)
+            for key, entry in changes.items():
+                if entry is None:
+                    entries.pop(key, None)
+                else:
+                    entries[key] = entry
+            self.stages[stage] = entries
+            text = json.dumps({'version': MANIFEST_VERSION, 'entries': entries},
+                              ensure_ascii=False, indent=2, sort_keys=True) + '\n'
+            written |= atomic_write_text(self.stage_path(stage), text)
+        self.changes = {}
+        return written
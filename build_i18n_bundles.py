@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Divide el catálogo de i18n.js en bundles por idioma y sección
+
+Uso:
+    python build_i18n_bundles.py            # genera site/i18n/ e informa del ahorro
+    python build_i18n_bundles.py --strip    # además vacía el literal de i18n.js (solo en deploy)
+
+Genera:
+  - site/i18n/<locale>/<sección>.json   una sección de primer nivel (common, info...)
+  - site/i18n/manifest.json             bundles con su hash y secciones que usa cada página
+
+Las secciones de una página salen de sus data-i18n*, de los módulos que importa
+(t('...'), getSection('...') y literales con forma de clave), de los partials
+que esos módulos descargan y de ALWAYS_SECTIONS. i18n.js solo descarga bundles
+cuando su literal está vacío (--strip); sin él la página funciona como siempre.
+Con --strip, cada página espera a ``await initI18n()`` antes de su primer t().
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from build_cache import atomic_write, atomic_write_text, sha256_bytes
+from check_i18n_keys import ATTR_KEY_RE, KEY_LITERAL_RE, SECTION_RE, T_CALL_RE
+from i18n_catalog import I18N_JS, load_catalog, parse_translations, translations_span
+from site_graph import SITE_DIR, js_partials, page_modules, site_url
+
+OUTPUT_DIR = os.path.join(SITE_DIR, 'i18n')
+MANIFEST_NAME = 'manifest.json'
+ALWAYS_SECTIONS = ('common',)
+SKIP_DIRS = {'vendor', 'partials', 'i18n'}
+
+
+def nest(flat):
+    """{'a.b': 'x'} → {'a': {'b': 'x'}}"""
+    tree = {}
+    for key, value in flat.items():
+        node = tree
+        *parents, last = key.split('.')
+        for part in parents:
+            node = node.setdefault(part, {})
+        node[last] = value
+    return tree
+
+
+def encode(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+
+def build_bundles(catalog):
+    """{locale: {sección: bytes JSON}}"""
+    bundles = {}
+    for locale, flat in catalog.items():
+        tree = nest(flat)
+        bundles[locale] = {section: encode(tree[section]) for section in sorted(tree)}
+    return bundles
+
+
+def page_paths(site_dir=SITE_DIR):
+    """Páginas HTML del sitio (sin partials ni vendor)"""
+    pages = []
+    for dirpath, dirnames, filenames in os.walk(site_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        pages.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.endswith('.html'))
+    return pages
+
+
+def _source_keys(source, scripts=True):
+    """Claves y secciones referenciadas en un texto (HTML o JS)"""
+    keys = {m.group(1) for m in ATTR_KEY_RE.finditer(source)}
+    sections = set()
+    if scripts:
+        keys.update(m.group(2) for m in T_CALL_RE.finditer(source))
+        keys.update(m.group(2) for m in KEY_LITERAL_RE.finditer(source))
+        sections.update(m.group(2).split('.')[0] for m in SECTION_RE.finditer(source))
+    return keys, sections
+
+
+def page_sections(html_path, known_sections, site_dir=SITE_DIR):
+    """Secciones de primer nivel que necesita una página"""
+    with open(html_path, 'r', encoding='utf-8') as f:
+        keys, sections = _source_keys(f.read())
+
+    sources = []
+    for module in page_modules(html_path, site_dir, include_dynamic=True):
+        if os.path.normpath(module) == os.path.normpath(I18N_JS):
+            continue
+        with open(module, 'r', encoding='utf-8') as f:
+            source = f.read()
+        sources.append((source, True))
+        for partial in js_partials(module, site_dir, source):
+            if partial and os.path.isfile(partial):
+                with open(partial, 'r', encoding='utf-8') as f:
+                    sources.append((f.read(), False))
+
+    for source, scripts in sources:
+        more_keys, more_sections = _source_keys(source, scripts)
+        keys |= more_keys
+        sections |= more_sections
+
+    sections.update(key.split('.')[0] for key in keys)
+    sections.update(ALWAYS_SECTIONS)
+    return sorted(sections & known_sections)
+
+
+def stripped_runtime(source):
+    """i18n.js con el literal de traducciones vacío"""
+    start, end = translations_span(source)
+    locales = ', '.join(f'{locale}: {{}}' for locale in parse_translations(source))
+    return source[:start] + '{ ' + locales + ' }' + source[end:]
+
+
+def write_outputs(bundles, pages, output_dir=OUTPUT_DIR):
+    """Escribe bundles y manifiesto; borra bundles obsoletos. Devuelve (manifiesto, escritos)"""
+    written = 0
+    manifest = {'version': 1, 'locales': sorted(bundles), 'bundles': {}, 'pages': pages}
+    for locale, sections in bundles.items():
+        folder = os.path.join(output_dir, locale)
+        for section, data in sections.items():
+            path = os.path.join(folder, f'{section}.json')
+            written += atomic_write(path, data)
+            manifest['bundles'].setdefault(locale, {})[section] = {
+                'hash': sha256_bytes(data)[:12],
+                'bytes': len(data),
+            }
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.endswith('.json') and name[:-5] not in sections:
+                    os.remove(os.path.join(folder, name))
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    written += atomic_write_text(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True) + '\n')
+    return manifest, written
+
+
+def page_savings(manifest, full_bytes, runtime_bytes, manifest_bytes):
+    """Por página: (url, nº secciones, bytes antes, bytes después en el peor locale)"""
+    rows = []
+    for url, sections in sorted(manifest['pages'].items()):
+        per_locale = [
+            sum(manifest['bundles'][locale][s]['bytes'] for s in sections if s in manifest['bundles'][locale])
+            for locale in manifest['locales']
+        ]
+        rows.append((url, len(sections), full_bytes, runtime_bytes + manifest_bytes + max(per_locale)))
+    return rows
+
+
+def report(rows, full_bytes, runtime_bytes, written, elapsed):
+    print("=" * 72)
+    print("BUNDLES I18N POR IDIOMA Y SECCIÓN")
+    print("=" * 72)
+    print(f"i18n.js completo: {full_bytes:,} bytes   runtime sin catálogo: {runtime_bytes:,} bytes")
+    print(f"{'Página':<36} {'Secc.':>5} {'Antes':>9} {'Después':>9} {'Ahorro':>8}")
+    for url, count, before, after in rows:
+        saved = 100 * (before - after) / before if before else 0
+        print(f"{url:<36} {count:>5} {before:>9,} {after:>9,} {saved:>7.1f}%")
+    print("=" * 72)
+    print(f"📦 Archivos escritos: {written}   ⏱️  {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera los bundles i18n por idioma y sección")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Carpeta de salida (por defecto site/i18n)")
+    parser.add_argument('--strip', action='store_true',
+                        help="Vacía el literal translations de i18n.js para que cargue los bundles")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with open(I18N_JS, 'r', encoding='utf-8') as f:
+        source = f.read()
+    catalog = load_catalog()
+    if not any(catalog.values()):
+        print(f"❌ {I18N_JS} no tiene traducciones (¿ya se ejecutó con --strip?)")
+        return 1
+    bundles = build_bundles(catalog)
+    known = {section for sections in bundles.values() for section in sections}
+
+    pages = {}
+    for path in page_paths():
+        sections = page_sections(path, known)
+        url = site_url(path)
+        pages[url] = sections
+        if url == '/index.html':
+            pages['/'] = sections
+
+    manifest, written = write_outputs(bundles, pages, args.output)
+    runtime = stripped_runtime(source)
+    if args.strip:
+        written += atomic_write_text(I18N_JS, runtime)
+        print(f"✂️  Catálogo eliminado de {I18N_JS}")
+
+    with open(os.path.join(args.output, MANIFEST_NAME), 'rb') as f:
+        manifest_bytes = len(f.read())
+    full_bytes = len(source.encode('utf-8'))
+    runtime_bytes = len(runtime.encode('utf-8'))
+    rows = page_savings(manifest, full_bytes, runtime_bytes, manifest_bytes)
+    report(rows, full_bytes, runtime_bytes, written, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
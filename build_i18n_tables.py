@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Genera tablas de traducción planas y precompiladas para t() de i18n.js
+
+Uso:
+    python build_i18n_tables.py            # genera site/js/utils/i18n-tables.js
+    python build_i18n_tables.py --link     # además hace que i18n.js lo importe (solo en deploy)
+
+Por cada idioma el módulo exporta los pares [clave, entrada] listos para
+``new Map(...)``, ordenados por clave. La entrada es el texto tal cual o, si
+tiene placeholders, la plantilla ya partida en segmentos:
+
+    'Hola {name}, tienes {count}'  →  ['Hola ', 'name', ', tienes ', 'count', '']
+
+(literales en las posiciones pares y nombres en las impares, lo mismo que
+devuelve text.split(/\\{(\\w+)\\}/) en JS). Así t() resuelve con un Map.get y
+una concatenación: sin split('.'), sin recorrer el árbol y sin new RegExp.
+
+Con --link la línea ``const PRECOMPILED_TABLES = null;`` de i18n.js pasa a
+ser el import del módulo y el literal translations se vacía (las tablas ya
+lo contienen). Sin --link i18n.js aplana el literal la primera vez que se
+usa cada idioma, con el mismo formato.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+from build_cache import atomic_write_text, sha256_bytes
+from build_i18n_bundles import stripped_runtime
+from i18n_catalog import I18N_JS, load_catalog
+
+OUTPUT_PATH = os.path.join(os.path.dirname(I18N_JS), 'i18n-tables.js')
+LINK_LINE = 'const PRECOMPILED_TABLES = null;'
+LINK_IMPORT = "import {{ TABLES as PRECOMPILED_TABLES }} from './{name}';"
+
+# Mismo patrón que PLACEHOLDER_RE en i18n.js
+PLACEHOLDER_RE = re.compile(r'\{([A-Za-z_$][\w$]*)\}')
+
+
+def compile_template(text):
+    """Texto sin placeholders → el mismo texto; con ellos → [literal, nombre, ..., literal]"""
+    segments = PLACEHOLDER_RE.split(text)
+    return text if len(segments) == 1 else segments
+
+
+def build_tables(catalog):
+    """{locale: [(clave, entrada), ...]} ordenado por idioma y clave"""
+    return {locale: [(key, compile_template(flat[key])) for key in sorted(flat)]
+            for locale, flat in sorted(catalog.items())}
+
+
+def load_tables(path=OUTPUT_PATH):
+    """Catálogo plano {locale: {clave: texto}} leído de un módulo generado (las plantillas, recompuestas)"""
+    catalog, locale = {}, None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip().rstrip(',')
+            if line.endswith(': ['):
+                locale = json.loads(line[:-len(': [')])
+                catalog[locale] = {}
+            elif line.startswith('[') and locale is not None:
+                key, entry = json.loads(line)
+                catalog[locale][key] = entry if isinstance(entry, str) else ''.join(
+                    segment if i % 2 == 0 else f'{{{segment}}}' for i, segment in enumerate(entry))
+    return catalog
+
+
+def _js(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def render_module(tables, digest, name=os.path.basename(OUTPUT_PATH)):
+    lines = [
+        f"// {name}: generado por build_i18n_tables.py a partir de i18n.js (sha256 {digest[:12]}), no editar",
+        "// Por idioma, pares [clave, texto | plantilla] listos para new Map();",
+        "// una plantilla es [literal, placeholder, literal, ..., literal]",
+        "export const TABLES = {",
+    ]
+    for locale, entries in tables.items():
+        lines.append(f"  {_js(locale)}: [")
+        lines.extend(f"    {_js([key, entry])}," for key, entry in entries)
+        lines.append("  ],")
+    lines.append("};")
+    return '\n'.join(lines) + '\n'
+
+
+def link_runtime(source, module_name=os.path.basename(OUTPUT_PATH)):
+    """i18n.js importando las tablas generadas y con el literal translations vacío"""
+    if LINK_LINE not in source:
+        raise ValueError(f"No se encontró {LINK_LINE!r} en i18n.js (¿ya se ejecutó con --link?)")
+    source = source.replace(LINK_LINE, LINK_IMPORT.format(name=module_name), 1)
+    return stripped_runtime(source)
+
+
+def report(tables, module, source_bytes, written, linked, elapsed):
+    print("=" * 60)
+    print("TABLAS I18N PRECOMPILADAS")
+    print("=" * 60)
+    print(f"{'Idioma':<8} {'Claves':>7} {'Plantillas':>11}")
+    for locale, entries in tables.items():
+        templates = sum(1 for _, entry in entries if isinstance(entry, list))
+        print(f"{locale:<8} {len(entries):>7} {templates:>11}")
+    data = module.encode('utf-8')
+    print(f"Módulo: {len(data):,} bytes ({len(gzip.compress(data, 9)):,} con gzip)   "
+          f"i18n.js: {source_bytes:,} bytes")
+    print("=" * 60)
+    status = '💾 Escrito' if written else '➖ Sin cambios'
+    print(f"{status}: {OUTPUT_PATH}{'   🔗 i18n.js enlazado' if linked else ''}   ⏱️  {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera las tablas de traducción planas para t()")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="Módulo a generar (junto a i18n.js)")
+    parser.add_argument('--link', action='store_true',
+                        help="Hace que i18n.js importe el módulo y vacía su literal translations")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with open(I18N_JS, 'r', encoding='utf-8') as f:
+        source = f.read()
+    catalog = load_catalog()
+    if not any(catalog.values()):
+        print(f"❌ {I18N_JS} no tiene traducciones (¿ya se ejecutó con --link o --strip?)")
+        return 1
+    if args.link and os.path.dirname(os.path.abspath(args.output)) != os.path.dirname(os.path.abspath(I18N_JS)):
+        print(f"❌ Con --link el módulo tiene que estar junto a {I18N_JS}")
+        return 1
+
+    tables = build_tables(catalog)
+    module = render_module(tables, sha256_bytes(source.encode('utf-8')), os.path.basename(args.output))
+    written = atomic_write_text(args.output, module)
+    if args.link:
+        try:
+            atomic_write_text(I18N_JS, link_runtime(source, os.path.basename(args.output)))
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+
+    report(tables, module, len(source.encode('utf-8')), written, args.link, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
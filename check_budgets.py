@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comprueba el presupuesto de rendimiento de cada página (bytes, peticiones, profundidad)
+
+Uso:
+    python check_budgets.py                          # index.html y site/secciones/*.html
+    python check_budgets.py site/secciones/email.html
+    python check_budgets.py --budgets budgets.json   # sustituye/amplía BUDGETS
+    python check_budgets.py --no-cache
+
+Para cada página resuelve todo lo que descarga (site_graph.page_assets): CSS
+con sus @import, fuentes de @font-face, imágenes, scripts y el grafo de
+módulos con sus partials. Mide:
+
+  - critical_bytes: HTML + CSS + fuentes + scripts + módulos + partials
+  - requests:       peticiones totales (incluye imágenes e iconos)
+  - depth:          idas y vueltas de imports hasta el módulo más profundo
+
+Si una métrica supera su presupuesto, imprime la diferencia, los recursos
+más pesados y lo que ha cambiado desde la última ejecución, y termina con
+código 1. Los resultados se guardan en el manifiesto de build junto con el
+hash de cada archivo implicado: si ninguno cambia, la página no se vuelve a
+analizar.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from build_cache import Manifest, fingerprint, sha256_file
+from site_graph import SITE_DIR, page_assets, section_pages
+
+CACHE_STAGE = 'budgets'
+CRITICAL_KINDS = {'html', 'stylesheet', 'font', 'script', 'module', 'partial'}
+METRICS = ('critical_bytes', 'requests', 'depth')
+TOP_ASSETS = 5
+
+# Presupuesto por página (ruta relativa a site/); 'default' vale para el resto
+BUDGETS = {
+    'default': {'critical_bytes': 850_000, 'requests': 24, 'depth': 3},
+    # Inter-Variable.ttf (854 KiB) hasta que se sirva en woff2/subconjunto
+    'secciones/verify-email.html': {'critical_bytes': 1_450_000},
+}
+
+
+def page_key(path, site_dir=SITE_DIR):
+    return os.path.relpath(path, site_dir).replace(os.sep, '/')
+
+
+def budget_for(path, budgets=BUDGETS):
+    budget = dict(budgets.get('default', {}))
+    budget.update(budgets.get(page_key(path), {}))
+    return budget
+
+
+def measure(path):
+    """Métricas y recursos [(ruta, tipo, profundidad, bytes)] de una página"""
+    assets = [(p, kind, depth, os.path.getsize(p)) for p, kind, depth in page_assets(path)]
+    module_depths = [depth for _, kind, depth, _ in assets if kind == 'module']
+    return {
+        'critical_bytes': sum(size for _, kind, _, size in assets if kind in CRITICAL_KINDS),
+        'requests': len(assets),
+        'depth': max(module_depths, default=0),
+        'assets': assets,
+    }
+
+
+class _Hashes(dict):
+    """SHA-256 por archivo, calculado una sola vez por ejecución (los módulos se comparten)"""
+
+    def __missing__(self, path):
+        self[path] = sha256_file(path) if os.path.isfile(path) else None
+        return self[path]
+
+
+def _inputs_digest(paths, hashes):
+    return fingerprint(sorted((p, hashes[p]) for p in paths))
+
+
+def check_page(path, manifest, hashes, use_cache=True):
+    """Mide la página (o reutiliza el resultado si no ha cambiado ningún archivo)"""
+    entry = manifest.entry(CACHE_STAGE, path)
+    if use_cache and entry and entry.get('input') == _inputs_digest(entry['files'], hashes):
+        return {**entry['metrics'], 'assets': [tuple(a) for a in entry['assets']], 'cached': True,
+                'previous': None}
+
+    result = measure(path)
+    files = [a[0] for a in result['assets']]
+    metrics = {m: result[m] for m in METRICS}
+    manifest.record(CACHE_STAGE, path, _inputs_digest(files, hashes), None, None,
+                    files=files, metrics=metrics, assets=[list(a) for a in result['assets']])
+    result['cached'] = False
+    result['previous'] = [tuple(a) for a in entry['assets']] if entry else None
+    return result
+
+
+def over_budget(result, budget):
+    """[(métrica, real, presupuesto)] de las métricas que se pasan"""
+    return [(m, result[m], budget[m]) for m in METRICS if m in budget and result[m] > budget[m]]
+
+
+def asset_changes(previous, current):
+    """Recursos añadidos, eliminados o que han cambiado de tamaño desde la última ejecución"""
+    before = {p: size for p, _, _, size in previous}
+    after = {p: size for p, _, _, size in current}
+    changes = []
+    for p in sorted(set(before) | set(after)):
+        if before.get(p) != after.get(p):
+            changes.append((p, before.get(p), after.get(p)))
+    return changes
+
+
+def print_failure(path, result, failures):
+    print(f"❌ {page_key(path)}")
+    for metric, actual, limit in failures:
+        delta = actual - limit
+        print(f"   {metric:<15} {actual:>11,} > {limit:>11,}   (+{delta:,}, +{100 * delta / limit:.1f}%)")
+    heaviest = sorted(result['assets'], key=lambda a: -a[3])[:TOP_ASSETS]
+    print("   Recursos más pesados:")
+    for p, kind, depth, size in heaviest:
+        print(f"     {size:>11,}  {kind:<10} nivel {depth}  {page_key(p)}")
+    changes = asset_changes(result['previous'], result['assets']) if result['previous'] else []
+    if changes:
+        print("   Cambios desde la última ejecución:")
+        for p, old, new in changes:
+            if old is None:
+                print(f"     + {page_key(p)} ({new:,} bytes)")
+            elif new is None:
+                print(f"     - {page_key(p)} ({old:,} bytes)")
+            else:
+                print(f"     ~ {page_key(p)} ({old:,} → {new:,} bytes, {new - old:+,})")
+
+
+def load_budgets(path):
+    budgets = {page: dict(values) for page, values in BUDGETS.items()}
+    with open(path, 'r', encoding='utf-8') as f:
+        for page, values in json.load(f).items():
+            budgets.setdefault(page, {}).update(values)
+    return budgets
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comprueba el presupuesto de rendimiento de cada página")
+    parser.add_argument('pages', nargs='*', help="Páginas HTML (por defecto index.html y site/secciones)")
+    parser.add_argument('--budgets', help="JSON {página: {métrica: límite}} que se combina con BUDGETS")
+    parser.add_argument('--no-cache', action='store_true', help="Vuelve a analizar todas las páginas")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    budgets = load_budgets(args.budgets) if args.budgets else BUDGETS
+    pages = args.pages or [os.path.join(SITE_DIR, 'index.html')] + section_pages()
+    manifest = Manifest()
+    hashes = _Hashes()
+
+    print("=" * 72)
+    print("PRESUPUESTO DE RENDIMIENTO POR PÁGINA")
+    print("=" * 72)
+    print(f"{'Página':<40} {'Críticos':>11} {'Petic.':>6} {'Prof.':>5}")
+    failed = []
+    cached = 0
+    for path in pages:
+        result = check_page(path, manifest, hashes, not args.no_cache)
+        cached += result['cached']
+        failures = over_budget(result, budget_for(path, budgets))
+        icon = '❌' if failures else '✅'
+        print(f"{icon} {page_key(path):<38} {result['critical_bytes']:>11,} {result['requests']:>6} {result['depth']:>5}")
+        if failures:
+            failed.append((path, result, failures))
+    manifest.prune(CACHE_STAGE)
+    manifest.save()
+
+    if failed:
+        print("-" * 72)
+        for path, result, failures in failed:
+            print_failure(path, result, failures)
+    print("=" * 72)
+    print(f"Páginas: {len(pages)}  fuera de presupuesto: {len(failed)}  en caché: {cached}  "
+          f"Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Comprueba que lo que firebase.json cachea como inmutable solo se pida con URLs versionadas
+
+Uso:
+    python check_cache_rules.py               # el sitio tal y como queda tras fingerprint_assets.py
+    python check_cache_rules.py --source      # el árbol tal cual (sin el paso de deploy)
+    python check_cache_rules.py --strict      # las diferencias prod/pre también hacen fallar
+
+Para cada archivo de site/ y cada target calcula las cabeceras efectivas con
+el mismo matcher que serve_hosting.py (todas las reglas que coinciden, en
+orden; la última gana en cada cabecera). Un archivo es de caché larga si su
+Cache-Control lleva immutable o un max-age de al menos un día.
+
+Después recorre todas las referencias (HTML, imports JS, literales de ruta en
+JS como avatar.src = '/assets/...', @import y url() de CSS) y marca las que
+apuntan a un archivo de caché larga con una URL:
+
+  - sin versión:  el navegador seguirá usando la copia vieja durante un año
+  - obsoleta:     ?v= distinto del hash actual del contenido (p. ej. ?v=1 fijo)
+  - marcador:     %ASSET_VERSION% sin sustituir (solo con --source)
+
+Por último compara los bloques de prod y pre: cabeceras distintas para el
+mismo archivo y archivos que solo se despliegan en uno de los dos.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from fingerprint_assets import js_literal_refs
+from fingerprint_assets import PLACEHOLDER, VERSION_PARAM, fingerprint_site, scan
+from serve_hosting import FIREBASE_JSON, load_target
+from site_graph import SITE_DIR, site_url
+
+TARGETS = ('prod', 'pre')
+LONG_CACHE_SECONDS = 24 * 3600
+TEXT_EXTENSIONS = ('.html', '.js', '.mjs', '.css')
+SKIP_DIRS = {'i18n', 'localized'}
+MAX_REFERRERS = 3
+
+_MAX_AGE_RE = re.compile(r'max-age=(\d+)')
+
+
+def long_cached(headers):
+    """¿El navegador reutiliza el archivo sin preguntar durante al menos un día?"""
+    cache_control = headers.get('Cache-Control', '').lower()
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return False
+    m = _MAX_AGE_RE.search(cache_control)
+    return 'immutable' in cache_control or bool(m and int(m.group(1)) >= LONG_CACHE_SECONDS)
+
+
+def site_files(site_dir=SITE_DIR):
+    for dirpath, dirnames, filenames in os.walk(site_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name)
+
+
+def effective_headers(hosting, files, site_dir=SITE_DIR):
+    """{ruta: {cabecera: valor}} de los archivos que el target despliega"""
+    headers = {}
+    for path in files:
+        url = site_url(path, site_dir)
+        if hosting.file_for(url):
+            headers[path] = dict(hosting.headers_for(url))
+    return headers
+
+
+def reference_sites(sources, site_dir=SITE_DIR):
+    """[(archivo, url, destino)] de todas las referencias locales"""
+    sites = []
+    for path, source in sources.items():
+        refs = scan(path, source, site_dir)
+        if path.endswith(('.js', '.mjs')):
+            seen = {r[0] for r in refs}
+            refs += [r for r in js_literal_refs(path, source, site_dir) if r[0] not in seen]
+        sites.extend((path, url, target) for _, _, url, target in refs if target and os.path.isfile(target))
+    return sites
+
+
+def url_version(url):
+    params = dict((k.lstrip('?'), v) for k, v in parse_qsl(urlsplit(url).query, keep_blank_values=True))
+    return params.get(VERSION_PARAM)
+
+
+def classify(url, expected):
+    """'ok' | 'sin versión' | 'marcador' | 'obsoleta'"""
+    version = url_version(url)
+    if not version:
+        return 'sin versión'
+    if version == PLACEHOLDER:
+        return 'marcador'
+    return 'ok' if version == expected else 'obsoleta'
+
+
+def unsafe_references(sites, headers, versions):
+    """Referencias a archivos de caché larga con URL sin versión u obsoleta"""
+    problems = []
+    for path, url, target in sites:
+        if target not in headers or not long_cached(headers[target]):
+            continue
+        status = classify(url, versions.get(target))
+        if status != 'ok':
+            problems.append((status, target, path, url))
+    return sorted(problems)
+
+
+def divergence(by_target):
+    """Diferencias entre dos targets: ([(cabecera, valores por target, archivos)], {target: solo allí})"""
+    (a, headers_a), (b, headers_b) = list(by_target.items())[:2]
+    differences = {}
+    for path in sorted(set(headers_a) & set(headers_b)):
+        for key in sorted(set(headers_a[path]) | set(headers_b[path])):
+            values = (headers_a[path].get(key), headers_b[path].get(key))
+            if values[0] != values[1]:
+                differences.setdefault((key, values), []).append(path)
+    only = {a: sorted(set(headers_a) - set(headers_b)), b: sorted(set(headers_b) - set(headers_a))}
+    return [(key, values, paths) for (key, values), paths in differences.items()], only
+
+
+def load_sources(files):
+    sources = {}
+    for path in files:
+        if path.endswith(TEXT_EXTENSIONS):
+            with open(path, 'r', encoding='utf-8') as f:
+                sources[path] = f.read()
+    return sources
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cruza las reglas de caché de firebase.json con las URLs del sitio")
+    parser.add_argument('--config', default=FIREBASE_JSON, help="Ruta de firebase.json")
+    parser.add_argument('--targets', nargs='+', default=list(TARGETS), help="Targets a analizar")
+    parser.add_argument('--source', action='store_true', help="Analiza el árbol sin simular fingerprint_assets.py")
+    parser.add_argument('--strict', action='store_true', help="Falla también si los targets divergen")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    files = list(site_files())
+    versions, outputs, _ = fingerprint_site()
+    sources = load_sources(files)
+    if not args.source:
+        sources.update({path: text for path, text in outputs.items() if path in sources})
+    sites = reference_sites(sources)
+    by_target = {target: effective_headers(load_target(target, args.config), files) for target in args.targets}
+
+    print("=" * 72)
+    print(f"REGLAS DE CACHÉ vs URLs VERSIONADAS ({'árbol actual' if args.source else 'tras fingerprint'})")
+    print("=" * 72)
+    failed = False
+    for target, headers in by_target.items():
+        cached = [p for p, h in headers.items() if long_cached(h)]
+        problems = unsafe_references(sites, headers, versions)
+        failed |= bool(problems)
+        icon = '❌' if problems else '✅'
+        print(f"{icon} {target}: {len(headers)} archivos desplegados, {len(cached)} de caché larga, "
+              f"{len(problems)} referencias inseguras")
+        grouped = {}
+        for status, target_path, path, url in problems:
+            grouped.setdefault((status, target_path), []).append((path, url))
+        for (status, target_path), refs in grouped.items():
+            expected = versions.get(target_path)
+            hint = f"  (esperado ?v={expected})" if status == 'obsoleta' and expected else ''
+            print(f"   - {status:<11} {site_url(target_path)}{hint}")
+            for path, url in refs[:MAX_REFERRERS]:
+                print(f"       ← {path}: {url}")
+            if len(refs) > MAX_REFERRERS:
+                print(f"       … y {len(refs) - MAX_REFERRERS} referencias más")
+
+    if len(by_target) >= 2:
+        differences, only = divergence(by_target)
+        names = list(by_target)[:2]
+        print("-" * 72)
+        if not differences and not any(only.values()):
+            print(f"✅ {names[0]} y {names[1]} sirven las mismas cabeceras")
+        for key, values, paths in differences:
+            print(f"⚠️  {key}: {names[0]}={values[0]!r}  {names[1]}={values[1]!r}  ({len(paths)} archivos, "
+                  f"p. ej. {site_url(paths[0])})")
+        for target, paths in only.items():
+            if paths:
+                print(f"⚠️  Solo se despliegan en {target}: {len(paths)} "
+                      f"({', '.join(site_url(p) for p in paths[:5])}{', …' if len(paths) > 5 else ''})")
+        failed |= args.strict and bool(differences or any(only.values()))
+
+    print("=" * 72)
+    print(f"Referencias analizadas: {len(sites)}  Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
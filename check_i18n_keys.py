@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cruza las claves i18n usadas en el sitio con el catálogo de i18n.js
+
+Uso:
+    python check_i18n_keys.py               # informe completo
+    python check_i18n_keys.py --strict      # también falla con claves huérfanas
+    python check_i18n_keys.py --quiet       # solo el resumen (pre-commit)
+
+Fuentes de uso (una sola pasada por archivo):
+  - HTML y JS: data-i18n, data-i18n-placeholder, data-i18n-title, data-i18n-aria-label
+  - JS: t('clave'), getSection('sección') y literales con forma de clave del catálogo
+  - Tablas de reglas de los scripts de traducción (TRANSLATIONS, INFO_RULES)
+
+Informa de claves inexistentes, claves que faltan en algún locale y claves
+del catálogo que nadie usa. Sale con código 1 si hay claves inexistentes o
+incompletas.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from bisect import bisect_right
+
+from i18n_catalog import I18N_JS, all_keys, load_catalog
+
+SITE_DIR = 'site'
+SKIP_DIRS = {'vendor'}
+
+# Prefijos de claves construidas dinámicamente (p. ej. 'badges.' si se usa t(`badges.${tipo}`))
+DYNAMIC_PREFIXES = []
+
+ATTR_KEY_RE = re.compile(r'''data-i18n(?:-[a-z]+)*\s*=\s*\\?["']([^"'${}<>\s\\]+)\\?["']''')
+T_CALL_RE = re.compile(r'''(?<![\w$.])t\(\s*(["'`])([^"'`$\s]+)\1''')
+SECTION_RE = re.compile(r'''(?<![\w$.])getSection\(\s*(["'`])([^"'`$\s]+)\1''')
+KEY_LITERAL_RE = re.compile(r'''(["'])([a-zA-Z]\w*(?:\.\w+)+)\1''')
+
+
+def _iter_site_files(root=SITE_DIR):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(('.html', '.js')):
+                yield os.path.join(dirpath, name)
+
+
+def _location(line_starts, offset):
+    line = bisect_right(line_starts, offset)
+    return line, offset - line_starts[line - 1] + 1
+
+
+def scan_file(path):
+    """
+    Claves referenciadas en un archivo.
+
+    Devuelve (usos directos [(clave, línea, columna)], secciones, literales).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+
+    uses = []
+    for m in ATTR_KEY_RE.finditer(source):
+        uses.append((m.group(1), *_location(line_starts, m.start(1))))
+
+    sections = set()
+    literals = set()
+    if path.endswith('.js'):
+        for m in T_CALL_RE.finditer(source):
+            uses.append((m.group(2), *_location(line_starts, m.start(2))))
+        sections.update(m.group(2) for m in SECTION_RE.finditer(source))
+        literals.update(m.group(2) for m in KEY_LITERAL_RE.finditer(source))
+    return uses, sections, literals
+
+
+def rule_table_uses():
+    """Claves que inyectan las tablas de reglas de los scripts de traducción"""
+    from translate_info_complete import INFO_RULES
+    from translate_info_html import TRANSLATIONS
+
+    uses = []
+    for new in TRANSLATIONS.values():
+        uses.extend((m.group(1), 'translate_info_html.py:TRANSLATIONS') for m in ATTR_KEY_RE.finditer(new))
+    uses.extend((rule.key, 'translate_info_complete.py:INFO_RULES') for rule in INFO_RULES)
+    return uses
+
+
+def check(catalog, files, include_rules=True):
+    """Cruza usos y catálogo; devuelve un dict con missing / per_locale / orphaned"""
+    keys = all_keys(catalog)
+    locales = sorted(catalog)
+
+    used = {}
+    sections = set()
+    literals = set()
+    for path in files:
+        if os.path.normpath(path) == os.path.normpath(I18N_JS):
+            continue
+        file_uses, file_sections, file_literals = scan_file(path)
+        for key, line, col in file_uses:
+            used.setdefault(key, []).append(f'{path}:{line}:{col}')
+        sections |= file_sections
+        literals |= file_literals
+    if include_rules:
+        for key, where in rule_table_uses():
+            used.setdefault(key, []).append(where)
+
+    missing = {key: where for key, where in used.items() if key not in keys}
+    per_locale = {}
+    for key in sorted(keys):
+        absent = [loc for loc in locales if key not in catalog[loc]]
+        if absent:
+            per_locale[key] = absent
+
+    prefixes = tuple(s + '.' for s in sections) + tuple(DYNAMIC_PREFIXES)
+    orphaned = sorted(
+        key for key in keys
+        if key not in used and key not in literals and not key.startswith(prefixes)
+    )
+    return {
+        'missing': missing,
+        'per_locale': per_locale,
+        'orphaned': orphaned,
+        'used': used,
+        'keys': keys,
+    }
+
+
+def report(result, quiet=False):
+    missing, per_locale, orphaned = result['missing'], result['per_locale'], result['orphaned']
+
+    print("=" * 60)
+    print("CLAVES I18N: USO vs CATÁLOGO")
+    print("=" * 60)
+    if missing:
+        print(f"❌ Claves usadas que no existen en el catálogo: {len(missing)}")
+        if not quiet:
+            for key in sorted(missing):
+                print(f"   - {key}  ({', '.join(missing[key][:3])})")
+    if per_locale:
+        print(f"❌ Claves que faltan en algún locale: {len(per_locale)}")
+        if not quiet:
+            for key, absent in per_locale.items():
+                print(f"   - {key}  (falta en: {', '.join(absent)})")
+    if orphaned:
+        print(f"⚠️  Claves del catálogo sin uso: {len(orphaned)}")
+        if not quiet:
+            for key in orphaned:
+                print(f"   - {key}")
+    if not (missing or per_locale or orphaned):
+        print("✅ Todas las claves usadas existen en todos los locales y no hay huérfanas")
+    print("=" * 60)
+    print(f"Claves en el catálogo: {len(result['keys'])}  claves usadas: {len(result['used'])}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Comprueba las claves i18n del sitio contra i18n.js")
+    parser.add_argument('--strict', action='store_true', help="Falla también si hay claves huérfanas")
+    parser.add_argument('--quiet', action='store_true', help="Solo muestra los totales")
+    parser.add_argument('--no-rules', action='store_true', help="No incluye las tablas de los scripts de traducción")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = check(load_catalog(), list(_iter_site_files()), include_rules=not args.no_rules)
+    report(result, quiet=args.quiet)
+    print(f"Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    failed = result['missing'] or result['per_locale'] or (args.strict and result['orphaned'])
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
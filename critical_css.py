@@ -0,0 +1,721 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inserta en cada página el CSS crítico y carga el resto de hojas de estilo sin bloquear
+
+Uso:
+    python critical_css.py                         # index.html y site/secciones/*.html
+    python critical_css.py site/secciones/email.html
+    python critical_css.py --check                 # solo informa
+    python critical_css.py --no-cache
+
+Para cada página:
+
+  1. Construye su DOM estático (el HTML más los partials que cargan sus
+     módulos, p. ej. el sidebar) y la lista de palabras que aparecen en
+     cadenas de sus módulos JS (clases que se añaden en tiempo de ejecución).
+  2. Marca la primera pantalla: la cabecera (header/nav), el sidebar y el
+     primer bloque de contenido en orden de documento. En los envoltorios
+     (<main>, .main-content, *-container, *-wrapper) baja hasta su primer
+     hijo con contenido, con lo que lleve delante.
+  3. Analiza cada hoja enlazada con un parser CSS pequeño (reglas, @media,
+     @font-face, @keyframes) y cruza cada selector con el DOM:
+       - crítica: coincide con algún elemento visible de la primera pantalla
+         (fuera de [hidden], <template>, <dialog> y contenedores .modal)
+       - usada por JS: coincide solo con elementos ocultos, o todas sus
+         clases/ids aparecen en los módulos
+       - más abajo: coincide con elementos visibles fuera de la primera pantalla
+       - sin usar: el resto
+  4. Escribe las reglas críticas y las usadas por JS (con los @font-face y
+     @keyframes que usan) en un <style> entre marcadores antes de la primera
+     hoja, y cambia cada <link rel=stylesheet> por su versión asíncrona
+     (media=print + onload), con el <link> original dentro de un <noscript>.
+     Las de JS van en línea porque los módulos pintan listas y modales en
+     cuanto cargan, a menudo antes que la hoja diferida: sin ellas se verían
+     un instante sin estilo.
+
+Si el CSS en línea pasa de CRITICAL_MAX_BYTES la página se queda con sus
+<link> bloqueantes de siempre: el HTML se sirve con no-store y ese CSS se
+descargaría en cada visita sin caché, y más allá de la primera ventana TCP
+retrasa el HTML más de lo que adelanta el pintado.
+
+El cruce es conservador: pseudo-clases, :not(), :is() y combinadores de
+hermanos se dan por buenos, así que puede sobrar CSS pero no faltar.
+
+Se ejecuta después de fingerprint_assets.py (las url() del CSS ya llevan su
+?v=) y antes de minify_html.py. Es idempotente: deshace lo que hizo en la
+ejecución anterior antes de volver a calcular. El resultado del cruce
+selector → página se guarda en el manifiesto de build por hoja, con el hash
+de la hoja y del DOM: solo se vuelven a cruzar las hojas o páginas que
+cambian.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+
+from build_cache import Manifest, atomic_write_text, fingerprint, sha256_bytes
+from html_index import build_index
+from site_graph import (CSS_URL_RE, SITE_DIR, is_local, page_assets, section_pages, site_url, split_url,
+                        url_to_path)
+
+CACHE_STAGE = 'critical-css'
+BLOCK_START = '<!-- critical-css:start -->'
+BLOCK_END = '<!-- critical-css:end -->'
+# Tope del CSS en línea por página (≈ la primera ventana de congestión TCP); por encima, <link> bloqueantes
+CRITICAL_MAX_BYTES = 14 * 1024
+# Cambiarlo invalida los cruces guardados en el manifiesto
+CRITICAL_VERSION = 2
+# Tipos de regla que van en el <style> en línea
+INLINE_KINDS = ('critical', 'js')
+HIDDEN_TAGS = {'template', 'dialog', 'noscript', 'script', 'style'}
+GROUPING_AT_RULES = {'media', 'supports', 'layer', 'container', 'document'}
+# Cabecera y navegación: siempre en la primera pantalla
+CHROME_TAGS = {'header', 'nav', 'aside'}
+CHROME_ROLES = {'banner', 'navigation'}
+
+_BLOCK_RE = re.compile(r'[ \t]*' + re.escape(BLOCK_START) + r'.*?' + re.escape(BLOCK_END) + r'\n?', re.S)
+_DEFERRED_RE = re.compile(r'''<link\b[^>]*\bdata-critical=["']?deferred["']?[^>]*>\s*'''
+                          r'''<noscript data-critical>(.*?)</noscript>''', re.S)
+_MODAL_RE = re.compile(r'(?:^|[\s-])modal(?:$|[\s-])')
+_CHROME_NAME_RE = re.compile(r'sidebar|navbar', re.I)
+# Envoltorios del contenido: la primera pantalla es lo que llevan delante de su primer bloque
+_WRAPPER_NAME_RE = re.compile(r'^main(?:-content|Content)?$|(?:^|-)(?:container|wrapper)$', re.I)
+_DISPLAY_NONE_RE = re.compile(r'display\s*:\s*none')
+# Literales de cadena JS (grupo 2: el contenido); subset_fontawesome.py también la usa
+JS_STRING_RE = re.compile(r'''(['"`])((?:\\.|(?!\1)[^\\])*)\1''', re.S)
+_JS_WORD_RE = re.compile(r'[A-Za-z_-][\w-]*')
+_FONT_FAMILY_RE = re.compile(r'font-family\s*:\s*([^;}]*)')
+_KEYFRAMES_NAME_RE = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+_SKIP_RE = re.compile(r'''/\*.*?(?:\*/|$)|"(?:\\.|[^"\\])*"?|'(?:\\.|[^'\\])*'?|[()\[\]{};,]''', re.S)
+_CSS_TOKEN_RE = re.compile(r'''/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\s+|[^\s"'/]+|/''', re.S)
+
+
+# --- parser CSS --------------------------------------------------------------
+
+class Rule:
+    """Regla de estilo o at-rule (con hijos si agrupa, p. ej. @media)"""
+
+    __slots__ = ('kind', 'prelude', 'body', 'children', 'index')
+
+    def __init__(self, kind, prelude, body=None, children=None, index=0):
+        self.kind = kind          # 'style' | nombre de la at-rule ('media', 'font-face'...)
+        self.prelude = prelude    # selector o condición
+        self.body = body          # declaraciones (texto) o None si agrupa
+        self.children = children
+        self.index = index
+
+
+def _skip(source, pos, stop):
+    """Avanza hasta el primer carácter de ``stop`` fuera de comentarios, cadenas, () y []"""
+    depth = 0
+    while True:
+        m = _SKIP_RE.search(source, pos)
+        if not m:
+            return len(source)
+        token = m.group(0)
+        if token in '([':
+            depth += 1
+        elif token in ')]':
+            depth -= 1
+        elif depth <= 0 and token in stop:
+            return m.start()
+        pos = m.end()
+
+
+def _block_end(source, pos):
+    """Posición de la '}' que cierra el bloque que empieza en ``pos`` (tras la '{')"""
+    depth = 1
+    while pos < len(source):
+        pos = _skip(source, pos, '{}')
+        if pos >= len(source):
+            break
+        depth += 1 if source[pos] == '{' else -1
+        if depth == 0:
+            return pos
+        pos += 1
+    return len(source)
+
+
+def parse_css(source, counter=None):
+    """Lista de Rule de una hoja (las @media contienen sus reglas en ``children``)"""
+    counter = counter if counter is not None else [0]
+    rules = []
+    pos = 0
+    n = len(source)
+    while pos < n:
+        while pos < n and (source[pos].isspace() or source.startswith('/*', pos)):
+            if source.startswith('/*', pos):
+                end = source.find('*/', pos + 2)
+                pos = n if end < 0 else end + 2
+            else:
+                pos += 1
+        if pos >= n or source[pos] == '}':
+            pos += 1
+            continue
+        stop = _skip(source, pos, '{;}')
+        prelude = source[pos:stop].strip()
+        if stop >= n or source[stop] in ';}':
+            if prelude.startswith('@'):
+                rules.append(Rule(prelude[1:].split()[0].lower(), prelude, index=counter[0]))
+                counter[0] += 1
+            pos = stop + 1
+            continue
+        end = _block_end(source, stop + 1)
+        body = source[stop + 1:end]
+        if prelude.startswith('@'):
+            name = re.match(r'@([\w-]+)', prelude).group(1).lower()
+            if name in GROUPING_AT_RULES:
+                rules.append(Rule(name, prelude, children=parse_css(body, counter), index=counter[0]))
+            else:
+                rules.append(Rule(name, prelude, body, index=counter[0]))
+        else:
+            rules.append(Rule('style', prelude, body, index=counter[0]))
+        counter[0] += 1
+        pos = end + 1
+    return rules
+
+
+def iter_style_rules(rules):
+    for rule in rules:
+        if rule.kind == 'style':
+            yield rule
+        elif rule.children is not None:
+            yield from iter_style_rules(rule.children)
+
+
+def compact_css(text, selector=False):
+    """Quita comentarios y los espacios que no cambian el significado (nunca dentro de cadenas)"""
+    # En selectores ' :hover' no es lo mismo que ':hover'; en declaraciones ' + ' (calc) tampoco sobra
+    tight = '{};,>+~' if selector else '{};,:'
+    tokens = []
+    for token in _CSS_TOKEN_RE.findall(text):
+        if token.startswith('/*') or (token.isspace() and tokens and tokens[-1].isspace()):
+            continue
+        tokens.append(token)
+    out = []
+    for i, token in enumerate(tokens):
+        if not token.isspace():
+            out.append(token)
+            continue
+        prev = out[-1][-1] if out else ''
+        following = tokens[i + 1][0] if i + 1 < len(tokens) else ''
+        if prev and following and prev not in tight and following not in tight:
+            out.append(' ')
+    return ''.join(out).strip()
+
+
+# --- selectores --------------------------------------------------------------
+
+_COMPOUND_RE = re.compile(r'''
+    (?P<tag>\*|[a-zA-Z][\w-]*)
+  | \#(?P<id>(?:[\w-]|\\[0-9a-fA-F]{1,6}\s?|\\.)+)
+  | \.(?P<cls>(?:[\w-]|\\[0-9a-fA-F]{1,6}\s?|\\.)+)
+  | \[\s*(?P<attr>[\w:-]+)\s*(?:(?P<op>[~|^$*]?=)\s*(?P<val>"[^"]*"|'[^']*'|[^\]\s]+)\s*(?P<flag>[iIsS])?)?\s*\]
+  | ::?(?P<pseudo>[\w-]+)(?:\((?P<arg>(?:[^()]|\([^()]*\))*)\))?
+''', re.X)
+_UNESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6}\s?|.)')
+
+
+def _unescape(ident):
+    """'md\\:flex' → 'md:flex', '\\31 0' → '10'"""
+    def repl(m):
+        s = m.group(1)
+        # Solo el espacio que cierra un escape hexadecimal se descarta: '\\ ' es un espacio
+        return chr(int(s, 16)) if re.fullmatch(r'[0-9a-fA-F]{1,6}\s?', s) else s
+    return _UNESCAPE_RE.sub(repl, ident)
+
+
+def split_selectors(prelude):
+    """'a, b:is(c, d)' → ['a', 'b:is(c, d)']"""
+    parts = []
+    pos = 0
+    while pos <= len(prelude):
+        end = _skip(prelude, pos, ',')
+        parts.append(prelude[pos:end].strip())
+        pos = end + 1
+    return [p for p in parts if p]
+
+
+def parse_selector(selector):
+    """
+    Selector complejo → [(combinador, compuesto)] de izquierda a derecha.
+
+    Un compuesto es un dict con tag, ids, classes, attrs y root; None si no
+    se entiende (se trata como «coincide»).
+    """
+    steps = []
+    combinator = ' '
+    pos = 0
+    n = len(selector)
+    while pos < n:
+        c = selector[pos]
+        if c.isspace():
+            pos += 1
+            continue
+        if c in '>+~':
+            combinator = c
+            pos += 1
+            continue
+        compound = {'tag': None, 'ids': [], 'classes': [], 'attrs': [], 'root': False}
+        while pos < n and not selector[pos].isspace() and selector[pos] not in '>+~':
+            m = _COMPOUND_RE.match(selector, pos)
+            if not m or m.end() == pos:
+                return None
+            if m.group('tag'):
+                compound['tag'] = None if m.group('tag') == '*' else m.group('tag').lower()
+            elif m.group('id'):
+                compound['ids'].append(_unescape(m.group('id')))
+            elif m.group('cls'):
+                compound['classes'].append(_unescape(m.group('cls')))
+            elif m.group('attr'):
+                val = m.group('val')
+                if val and val[0] in '"\'':
+                    val = val[1:-1]
+                compound['attrs'].append((m.group('attr').lower(), m.group('op'), val, bool(m.group('flag'))))
+            elif m.group('pseudo') and m.group('pseudo').lower() == 'root':
+                compound['root'] = True
+            pos = m.end()
+        steps.append((combinator, compound))
+        combinator = ' '
+    return steps
+
+
+class Node:
+    """Elemento del DOM estático con lo necesario para cruzar selectores"""
+
+    __slots__ = ('tag', 'id', 'classes', 'attrs', 'parent', 'children', 'visible', 'first_view')
+
+    def __init__(self, tag, attrs, parent):
+        self.tag = tag
+        self.attrs = attrs
+        self.id = attrs.get('id')
+        self.classes = set((attrs.get('class') or '').split())
+        self.parent = parent
+        self.children = []
+        self.first_view = False
+        if parent is not None:
+            parent.children.append(self)
+        hidden = (tag in HIDDEN_TAGS or 'hidden' in attrs
+                  or _DISPLAY_NONE_RE.search(attrs.get('style') or '')
+                  or any(_MODAL_RE.search(c) for c in self.classes))
+        self.visible = not hidden and (parent is None or parent.visible)
+
+
+def _attr_matches(node, name, op, expected, ignore_case):
+    if name not in node.attrs:
+        return False
+    if op is None:
+        return True
+    value = node.attrs[name] or ''
+    if ignore_case:
+        value, expected = value.lower(), expected.lower()
+    if op == '=':
+        return value == expected
+    if op == '~=':
+        return expected in value.split()
+    if op == '|=':
+        return value == expected or value.startswith(expected + '-')
+    if op == '^=':
+        return bool(expected) and value.startswith(expected)
+    if op == '$=':
+        return bool(expected) and value.endswith(expected)
+    return bool(expected) and expected in value
+
+
+def compound_matches(node, compound):
+    if compound is None:
+        return True
+    if compound['root'] and node.tag != 'html':
+        return False
+    if compound['tag'] and compound['tag'] != node.tag:
+        return False
+    if any(i != node.id for i in compound['ids']):
+        return False
+    if not node.classes.issuperset(compound['classes']):
+        return False
+    return all(_attr_matches(node, *a) for a in compound['attrs'])
+
+
+def selector_matches(node, steps, i=None):
+    """¿``node`` cumple el selector (de derecha a izquierda)?"""
+    i = len(steps) - 1 if i is None else i
+    combinator, compound = steps[i]
+    if not compound_matches(node, compound):
+        return False
+    if i == 0:
+        return True
+    if combinator in '+~':
+        # Hermanos: no se comprueban (el lado izquierdo basta con que exista en algún sitio)
+        return True
+    ancestor = node.parent
+    while ancestor is not None:
+        if selector_matches(ancestor, steps, i - 1):
+            return True
+        if combinator == '>':
+            return False
+        ancestor = ancestor.parent
+    return False
+
+
+class Dom:
+    """Nodos de la página (y sus partials) con índices por id, clase y etiqueta"""
+
+    def __init__(self):
+        self.nodes = []
+        self.by_id, self.by_class, self.by_tag = {}, {}, {}
+
+    def add_source(self, source, root_parent=None):
+        index = build_index(source)
+        nodes = []
+        for el in index.elements:
+            parent = nodes[el.parent] if el.parent is not None else root_parent
+            node = Node(el.tag, {k: v for k, v in el.attrs.items()}, parent)
+            nodes.append(node)
+            self.nodes.append(node)
+            if node.id:
+                self.by_id.setdefault(node.id, []).append(node)
+            for cls in node.classes:
+                self.by_class.setdefault(cls, []).append(node)
+            self.by_tag.setdefault(node.tag, []).append(node)
+        return nodes
+
+    def candidates(self, compound):
+        """Nodos que pueden cumplir el compuesto más a la derecha"""
+        if compound is None:
+            return self.nodes
+        if compound['ids']:
+            return self.by_id.get(compound['ids'][0], [])
+        if compound['classes']:
+            return self.by_class.get(compound['classes'][0], [])
+        if compound['root']:
+            return self.by_tag.get('html', [])
+        if compound['tag']:
+            return self.by_tag.get(compound['tag'], [])
+        return self.nodes
+
+
+def _is_chrome(node):
+    if node.tag in CHROME_TAGS or (node.attrs.get('role') or '') in CHROME_ROLES:
+        return True
+    return any(_CHROME_NAME_RE.search(name) for name in [node.id or '', *node.classes])
+
+
+def _is_wrapper(node):
+    return node.tag == 'main' or any(_WRAPPER_NAME_RE.search(name) for name in [node.id or '', *node.classes])
+
+
+def _mark_subtree(node):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        node.first_view = True
+        stack.extend(node.children)
+
+
+def _mark_first_block(node):
+    """Marca el bloque; si es un envoltorio, solo sus hijos hasta el primero con contenido (y baja por él)"""
+    node.first_view = True
+    if not _is_wrapper(node):
+        _mark_subtree(node)
+        return
+    for child in node.children:
+        if not child.visible:
+            continue
+        if child.children:
+            _mark_first_block(child)
+            return
+        child.first_view = True
+
+
+def mark_first_view(dom):
+    """Marca la primera pantalla: cabecera, sidebar y el primer bloque de contenido del <body>"""
+    body = dom.by_tag.get('body')
+    if not body:
+        # Fragmento sin <body>: no hay forma de saber qué se ve primero
+        for node in dom.nodes:
+            node.first_view = True
+        return
+    ancestor = body[0]
+    while ancestor is not None:
+        ancestor.first_view = True
+        ancestor = ancestor.parent
+    content = False
+    for child in body[0].children:
+        if not child.visible:
+            continue
+        if _is_chrome(child):
+            _mark_subtree(child)
+        elif not content:
+            _mark_first_block(child)
+            content = True
+
+
+def classify_selector(selector, dom, js_words):
+    """'critical' | 'js' | 'below' | 'unused' para un selector simple de la lista"""
+    steps = parse_selector(selector)
+    if not steps:
+        return 'critical'
+    compound = steps[-1][1]
+    candidates = dom.candidates(compound)
+    matched = [node for node in candidates if selector_matches(node, steps)]
+    if any(node.visible and node.first_view for node in matched):
+        return 'critical'
+    if any(node.visible for node in matched):
+        return 'below'
+    if matched:
+        return 'js'
+    names = [n for _, c in steps if c for n in c['classes'] + c['ids']]
+    if names and all(n in js_words for n in names):
+        return 'js'
+    return 'unused'
+
+
+def classify_rules(rules, dom, js_words):
+    """{índice de regla: 'critical' | 'js' | 'below' | 'unused'} de las reglas de estilo"""
+    result = {}
+    for rule in iter_style_rules(rules):
+        kinds = {classify_selector(s, dom, js_words) for s in split_selectors(rule.prelude)}
+        result[rule.index] = next(k for k in ('critical', 'js', 'below', 'unused') if k in kinds)
+    return result
+
+
+# --- página ------------------------------------------------------------------
+
+def undo(source):
+    """Quita el bloque crítico y devuelve los <link> a su forma original"""
+    source = _BLOCK_RE.sub('', source)
+    return _DEFERRED_RE.sub(lambda m: m.group(1), source)
+
+
+class _Words(dict):
+    """Palabras con forma de clase/id que aparecen en cadenas de cada módulo (una lectura por ejecución)"""
+
+    def __missing__(self, path):
+        words = set()
+        with open(path, 'r', encoding='utf-8') as f:
+            for m in JS_STRING_RE.finditer(f.read()):
+                words.update(_JS_WORD_RE.findall(m.group(2)))
+        self[path] = words
+        return words
+
+
+def _rebase_urls(css, css_path, site_dir=SITE_DIR):
+    """url(relativa) → url(/absoluta) para que funcione en línea dentro del HTML"""
+    def repl(m):
+        url = m.group(2) if m.group(2) is not None else m.group(3)
+        target = url_to_path(url, css_path, site_dir) if is_local(url) else None
+        if not target or url.startswith('/'):
+            return m.group(0)
+        _, query = split_url(url)
+        return f'url({site_url(target, site_dir)}{"?" + query if query else ""})'
+    return CSS_URL_RE.sub(repl, css)
+
+
+def render_critical(rules, kinds, css_path, site_dir=SITE_DIR):
+    """CSS de las reglas de INLINE_KINDS (respetando @media) y sus at-rules de apoyo"""
+    def walk(items):
+        out = []
+        for rule in items:
+            if rule.kind == 'style' and kinds.get(rule.index) in INLINE_KINDS:
+                out.append(f'{compact_css(rule.prelude, selector=True)}{{{compact_css(rule.body)}}}')
+            elif rule.children is not None:
+                inner = walk(rule.children)
+                if inner:
+                    out.append(f'{compact_css(rule.prelude)}{{{inner}}}')
+        return ''.join(out)
+
+    css = walk(rules)
+    support = []
+    for rule in rules:
+        if rule.kind == 'font-face':
+            family = _FONT_FAMILY_RE.search(rule.body or '')
+            name = family.group(1).strip().strip('"\'') if family else None
+            if name and name in css:
+                support.append(f'@font-face{{{compact_css(rule.body)}}}')
+        elif rule.kind.endswith('keyframes'):
+            name = _KEYFRAMES_NAME_RE.match(rule.prelude)
+            if name and re.search(r'\b' + re.escape(name.group(1)) + r'\b', css):
+                support.append(f'{compact_css(rule.prelude)}{{{compact_css(rule.body)}}}')
+    return _rebase_urls(''.join(support) + css, css_path, site_dir)
+
+
+def deferred_link(tag):
+    """<link rel=stylesheet> → versión que no bloquea el render, con el original en <noscript>"""
+    media = re.search(r'''\smedia\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', tag)
+    original_media = next((g for g in media.groups() if g is not None), 'all') if media else 'all'
+    body = tag[:-2] if tag.endswith('/>') else tag[:-1]
+    if media:
+        body = body[:media.start()] + body[media.end():]
+    onload = f"this.media='{original_media}'"
+    return (f'{body.rstrip()} media="print" onload="{onload}" data-critical="deferred">'
+            f'<noscript data-critical>{tag}</noscript>')
+
+
+def stylesheet_links(source, index):
+    """[(inicio, fin, ruta)] de los <link rel=stylesheet> de la página"""
+    links = []
+    for el in index.by_tag('link'):
+        rel = (el.attrs.get('rel') or '').lower().split()
+        if 'stylesheet' in rel and el.attrs.get('href'):
+            links.append((el.start, el.start_end, el.attrs['href']))
+    return links
+
+
+def page_sheets(html_path, links, parsed, site_dir=SITE_DIR):
+    """Hojas en orden de cascada: las de cada <link> con sus @import delante"""
+    sheets = []
+
+    def visit(path):
+        if not path or path in sheets or not os.path.isfile(path):
+            return
+        for rule in parsed[path][1]:
+            if rule.kind == 'import':
+                m = re.search(r'''(?:url\(\s*)?['"]?([^'")\s]+)''', rule.prelude[len('@import'):])
+                if m:
+                    visit(url_to_path(m.group(1), path, site_dir))
+        sheets.append(path)
+
+    for _, _, href in links:
+        visit(url_to_path(href, html_path, site_dir))
+    return sheets
+
+
+def build_dom(source, partials):
+    dom = Dom()
+    nodes = dom.add_source(source)
+    body = next((n for n in nodes if n.tag == 'body'), None)
+    for partial in partials:
+        with open(partial, 'r', encoding='utf-8') as f:
+            dom.add_source(f.read(), body)
+    mark_first_view(dom)
+    return dom
+
+
+class _Sheets(dict):
+    """Contenido, hash y reglas de cada hoja, leídos una vez por ejecución"""
+
+    def __missing__(self, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        self[path] = (sha256_bytes(text.encode('utf-8')), parse_css(text))
+        return self[path]
+
+
+def process_page(path, manifest, sheets, module_words, check=False, use_cache=True, site_dir=SITE_DIR):
+    with open(path, 'r', encoding='utf-8') as f:
+        original = f.read()
+    source = undo(original)
+    index = build_index(source)
+    links = stylesheet_links(source, index)
+    result = {'path': path, 'sheets': 0, 'inline': 0, 'total': 0, 'cached': 0, 'matched': 0,
+              'counts': {'critical': 0, 'js': 0, 'below': 0, 'unused': 0}, 'blocking': False, 'written': False}
+    if not links:
+        return result
+
+    assets = page_assets(path, site_dir)
+    partials = [p for p, kind, _ in assets if kind == 'partial']
+    modules = [p for p, kind, _ in assets if kind == 'module']
+    words = set().union(*(module_words[p] for p in modules + partials))
+    dom_digest = fingerprint(CRITICAL_VERSION, sha256_bytes(source.encode('utf-8')),
+                             [(p, sha256_bytes(open(p, 'rb').read())) for p in partials], sorted(words))
+
+    entry = manifest.entry(CACHE_STAGE, path) or {}
+    cached = entry.get('sheets', {}) if use_cache and entry.get('dom') == dom_digest else {}
+    dom = None
+    stored = {}
+    critical_css = []
+    for sheet in page_sheets(path, links, sheets, site_dir):
+        digest, rules = sheets[sheet]
+        hit = cached.get(sheet)
+        if hit and hit[0] == digest:
+            kinds = {i: kind for kind, indices in zip(('critical', 'js', 'below'), hit[1:]) for i in indices}
+            result['cached'] += 1
+        else:
+            dom = dom or build_dom(source, partials)
+            kinds = classify_rules(rules, dom, words)
+            result['matched'] += 1
+        stored[sheet] = [digest] + [sorted(i for i, k in kinds.items() if k == kind)
+                                    for kind in ('critical', 'js', 'below')]
+        total = sum(1 for _ in iter_style_rules(rules))
+        for kind in ('critical', 'js', 'below'):
+            result['counts'][kind] += sum(1 for k in kinds.values() if k == kind)
+        result['counts']['unused'] += total - sum(1 for k in kinds.values() if k != 'unused')
+        result['total'] += os.path.getsize(sheet)
+        critical_css.append(render_critical(rules, kinds, sheet, site_dir))
+    manifest.record(CACHE_STAGE, path, dom_digest, None, None, dom=dom_digest, sheets=stored)
+
+    css = ''.join(critical_css)
+    result['sheets'] = len(stored)
+    result['inline'] = len(css.encode('utf-8'))
+    if result['inline'] > CRITICAL_MAX_BYTES:
+        # Demasiado CSS para ir en línea: la página se queda con sus <link> bloqueantes
+        result['blocking'] = True
+        result['written'] = not check and source != original and atomic_write_text(path, source)
+        return result
+
+    out = []
+    pos = 0
+    first = links[0][0]
+    line_start = source.rfind('\n', 0, first) + 1
+    indent = source[line_start:first] if not source[line_start:first].strip() else ''
+    for start, end, _ in links:
+        out.append(source[pos:start])
+        if start == first:
+            out.append(f'{BLOCK_START}<style>{css}</style>{BLOCK_END}\n{indent}')
+        out.append(deferred_link(source[start:end]))
+        pos = end
+    out.append(source[pos:])
+    output = ''.join(out)
+    result['written'] = not check and output != original and atomic_write_text(path, output)
+    return result
+
+
+def report(results, elapsed, check):
+    print("=" * 78)
+    print("CSS CRÍTICO POR PÁGINA")
+    print("=" * 78)
+    print(f"{'Página':<40} {'Hojas':>5} {'En línea':>9} {'CSS total':>10} {'Crít.':>6} {'JS':>5} "
+          f"{'Abajo':>6} {'Sin usar':>8}")
+    for r in results:
+        if not r['sheets']:
+            continue
+        icon = '⚠️ ' if r['blocking'] else '✅' if r['written'] else '➖'
+        c = r['counts']
+        print(f"{icon} {os.path.relpath(r['path'], SITE_DIR):<38} {r['sheets']:>5} {r['inline']:>9,} "
+              f"{r['total']:>10,} {c['critical']:>6} {c['js']:>5} {c['below']:>6} {c['unused']:>8}")
+    blocking = [r for r in results if r['blocking']]
+    if blocking:
+        print(f"⚠️  Más de {CRITICAL_MAX_BYTES // 1024} KiB en línea, se quedan con <link> bloqueantes: "
+              f"{', '.join(os.path.relpath(r['path'], SITE_DIR) for r in blocking)}")
+    print("=" * 78)
+    matched = sum(r['matched'] for r in results)
+    cached = sum(r['cached'] for r in results)
+    print(f"{'Modo consulta: no se ha escrito nada. ' if check else ''}"
+          f"Hojas cruzadas: {matched}  en caché: {cached}  Tiempo total: {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inserta el CSS crítico y difiere las hojas de estilo")
+    parser.add_argument('pages', nargs='*', help="Páginas HTML (por defecto index.html y site/secciones)")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    parser.add_argument('--no-cache', action='store_true', help="Vuelve a cruzar todos los selectores")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    pages = args.pages or [os.path.join(SITE_DIR, 'index.html')] + section_pages()
+    manifest = Manifest()
+    sheets = _Sheets()
+    module_words = _Words()
+    results = [process_page(path, manifest, sheets, module_words, args.check, not args.no_cache) for path in pages]
+    if not args.check:
+        manifest.prune(CACHE_STAGE)
+        manifest.save()
+    report(results, time.perf_counter() - start, args.check)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecta archivos duplicados en site/ y unifica sus referencias en una sola ruta
+
+Uso:
+    python dedupe_assets.py            # reescribe las referencias (deploy / en local)
+    python dedupe_assets.py --check    # solo informa; falla si hay duplicados nuevos
+
+Índice por tamaño → hash de los primeros 64 KiB → SHA-256 completo: solo se
+lee entero lo que coincide en tamaño y cabecera. En cada grupo de archivos
+idénticos se elige una ruta canónica (la más referenciada; a igualdad, la
+más corta) y todas las referencias HTML/JS/CSS pasan a apuntar a ella, así
+el navegador descarga y cachea el archivo una sola vez.
+
+Los grupos ya conocidos se listan en KNOWN_DUPLICATES; cualquier otro hace
+que el script termine con código 1.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+from build_cache import atomic_write_text, sha256_file
+from fingerprint_assets import js_literal_refs, scan
+from site_graph import SITE_DIR, site_url
+
+SKIP_DIRS = {'i18n', 'localized'}
+HEAD_BYTES = 64 * 1024
+TEXT_EXTENSIONS = ('.html', '.js', '.mjs', '.css')
+
+# Grupos de duplicados aceptados (rutas relativas a site/)
+KNOWN_DUPLICATES = [
+    {'js/vendor/dompurify.min.js', 'js/vendor/purify.min.js'},
+]
+
+
+def _walk(root):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name)
+
+
+def _head_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read(HEAD_BYTES)).hexdigest()
+
+
+def duplicate_groups(root=SITE_DIR):
+    """Grupos de archivos con contenido idéntico (tamaño → cabecera → hash completo)"""
+    by_size = {}
+    for path in _walk(root):
+        size = os.path.getsize(path)
+        if size:
+            by_size.setdefault(size, []).append(path)
+
+    groups = []
+    for size, paths in by_size.items():
+        if len(paths) < 2:
+            continue
+        by_head = {}
+        for path in paths:
+            by_head.setdefault(_head_digest(path), []).append(path)
+        for same_head in by_head.values():
+            if len(same_head) < 2:
+                continue
+            if size <= HEAD_BYTES:
+                groups.append(sorted(same_head))
+                continue
+            by_hash = {}
+            for path in same_head:
+                by_hash.setdefault(sha256_file(path), []).append(path)
+            groups.extend(sorted(g) for g in by_hash.values() if len(g) > 1)
+    return sorted(groups)
+
+
+def collect_refs(root=SITE_DIR):
+    """{archivo: (contenido, [(inicio, fin, url, destino)])} de los archivos de texto"""
+    refs = {}
+    for path in _walk(root):
+        if not path.endswith(TEXT_EXTENSIONS):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        file_refs = scan(path, source, root)
+        if path.endswith(('.js', '.mjs')):
+            seen = {start for start, *_ in file_refs}
+            file_refs += [r for r in js_literal_refs(path, source, root) if r[0] not in seen]
+        refs[path] = (source, sorted(file_refs))
+    return refs
+
+
+def choose_canonical(group, counts):
+    """La ruta más referenciada; a igualdad, la más corta y luego alfabética"""
+    return min(group, key=lambda path: (-counts.get(path, 0), len(path), path))
+
+
+def canonical_url(url, canonical, site_dir=SITE_DIR):
+    """Cambia la ruta de ``url`` por la canónica conservando query y fragmento"""
+    parts = urlsplit(url)
+    return urlunsplit(('', '', site_url(canonical, site_dir), parts.query, parts.fragment))
+
+
+def dedupe(root=SITE_DIR, check=False):
+    groups = duplicate_groups(root)
+    refs = collect_refs(root)
+
+    counts = {}
+    for _, file_refs in refs.values():
+        for *_, target in file_refs:
+            if target:
+                counts[target] = counts.get(target, 0) + 1
+
+    replacements = {}
+    canonicals = []
+    for group in groups:
+        canonical = choose_canonical(group, counts)
+        canonicals.append((canonical, group))
+        for path in group:
+            if path != canonical:
+                replacements[path] = canonical
+
+    rewritten = {}
+    for path, (source, file_refs) in refs.items():
+        hits = [r for r in file_refs if r[3] in replacements]
+        if not hits:
+            continue
+        out = []
+        pos = 0
+        for start, end, url, target in hits:
+            out.append(source[pos:start])
+            out.append(canonical_url(url, replacements[target], root))
+            pos = end
+        out.append(source[pos:])
+        rewritten[path] = len(hits)
+        if not check:
+            atomic_write_text(path, ''.join(out))
+
+    known = [{os.path.join(root, p) for p in g} for g in KNOWN_DUPLICATES]
+    new = [group for _, group in canonicals if not any(set(group) <= k for k in known)]
+    return canonicals, rewritten, new
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Unifica las referencias a archivos duplicados de site/")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    canonicals, rewritten, new = dedupe(check=args.check)
+
+    print("=" * 60)
+    print("ASSETS DUPLICADOS")
+    print("=" * 60)
+    if not canonicals:
+        print("✅ No hay archivos duplicados")
+    for canonical, group in canonicals:
+        size = os.path.getsize(canonical)
+        print(f"📎 {canonical}  ({size:,} bytes × {len(group)})")
+        for path in group:
+            if path != canonical:
+                print(f"   - {path}")
+    for path, hits in sorted(rewritten.items()):
+        print(f"{'📝' if args.check else '✅'} {path}: {hits} referencias → ruta canónica")
+    if new:
+        print(f"❌ Duplicados nuevos (no están en KNOWN_DUPLICATES): {len(new)}")
+        for group in new:
+            print(f"   - {', '.join(group)}")
+    print("=" * 60)
+    wasted = sum(os.path.getsize(c) * (len(g) - 1) for c, g in canonicals)
+    print(f"Grupos: {len(canonicals)}  bytes duplicados: {wasted:,}  "
+          f"Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 1 if new else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
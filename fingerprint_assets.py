@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Versiona cada asset con el hash de su contenido (sustituye a %ASSET_VERSION%)
+
+Uso:
+    python fingerprint_assets.py            # reescribe site/ en el sitio (deploy)
+    python fingerprint_assets.py --check    # solo informa, no escribe nada
+
+Construye el grafo real del sitio:
+  - páginas HTML: <script src>, <link href>, <img src> e <script type=module> inline
+  - módulos JS:   import / export ... from / import() con literal, y literales
+                   '/ruta.png' a imágenes y fuentes (JS_LITERAL_EXTENSIONS)
+  - hojas CSS:    @import y url(...)
+
+y reescribe cada referencia local como <ruta>?v=<hash>, donde el hash es el
+del contenido del archivo ya reescrito, es decir, incluye las versiones de
+sus dependencias. Un cambio en api.js cambia la URL de api.js y la de los
+módulos que lo importan, pero no la de email.css ni la del resto.
+
+Todas las formas de escribir la misma URL (config.js?v=1, base.css??v=...,
+%ASSET_VERSION%) acaban siendo idénticas, así que el navegador descarga e
+instancia cada módulo una sola vez.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from build_cache import atomic_write, sha256_bytes
+from html_index import build_index
+from site_graph import SITE_DIR, css_imports, is_local, js_imports, site_url, url_to_path
+
+VERSION_PARAM = 'v'
+HASH_LENGTH = 10
+PLACEHOLDER = '%ASSET_VERSION%'
+TEXT_EXTENSIONS = {'.js', '.mjs', '.css'}
+SKIP_DIRS = {'localized'}
+
+# (etiqueta, atributo) de las referencias HTML que se versionan
+HTML_REF_ATTRS = {('script', 'src'), ('link', 'href'), ('img', 'src'), ('source', 'src')}
+# Literales de JS que se versionan: los tipos que firebase.json sirve como immutable
+# (**/*.{png,webp,svg,woff2,ttf}); las rutas a páginas son navegación y no se tocan
+JS_LITERAL_EXTENSIONS = ('.png', '.webp', '.svg', '.woff2', '.ttf')
+
+# Literales con forma de ruta en JS (p. ej. avatar.src = '/assets/icons/image.png')
+_JS_PATH_LITERAL_RE = re.compile(r'''(['"`])(/[\w./-]+\.\w+(?:\?[^'"`\s]*)?)\1''')
+
+
+def versioned_url(url, version):
+    """'/css/base.css??v=x#a' → '/css/base.css?v=<version>#a' (conserva otros parámetros)"""
+    parts = urlsplit(url)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+              if k.lstrip('?') != VERSION_PARAM]
+    if version:
+        params.append((VERSION_PARAM, version))
+    return urlunsplit(('', '', parts.path, urlencode(params, safe='/%'), parts.fragment))
+
+
+def _attr_span(source, element, attr):
+    """(inicio, fin) del valor de ``attr`` dentro de la etiqueta de apertura"""
+    tag = source[element.start:element.start_end]
+    m = re.search(r'\s' + re.escape(attr) + r'''\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))''', tag, re.I)
+    if not m:
+        return None
+    group = next(g for g in (1, 2, 3) if m.group(g) is not None)
+    return element.start + m.start(group), element.start + m.end(group)
+
+
+def _refs_from_imports(imports, base=0):
+    return [(base + imp.offset, base + imp.offset + len(imp.specifier), imp.specifier, imp.path)
+            for imp in imports if is_local(imp.specifier)]
+
+
+def js_literal_refs(path, source, site_dir=SITE_DIR):
+    """Literales con forma de ruta local en JS: [(inicio, fin, url, destino)]"""
+    refs = []
+    for m in _JS_PATH_LITERAL_RE.finditer(source):
+        refs.append((m.start(2), m.end(2), m.group(2), url_to_path(m.group(2), path, site_dir)))
+    return refs
+
+
+def scan(path, source, site_dir=SITE_DIR):
+    """Referencias locales de un archivo: [(inicio, fin, url, ruta destino)]"""
+    if path.endswith('.css'):
+        return _refs_from_imports(css_imports(path, site_dir, source))
+    if path.endswith(('.js', '.mjs')):
+        refs = _refs_from_imports(js_imports(path, site_dir, source))
+        refs += [r for r in js_literal_refs(path, source, site_dir)
+                 if r[3] and r[3].endswith(JS_LITERAL_EXTENSIONS) and os.path.isfile(r[3])]
+        return sorted(refs)
+
+    refs = []
+    index = build_index(source)
+    for el in index.elements:
+        for tag, attr in HTML_REF_ATTRS:
+            if el.tag != tag or attr not in el.attrs:
+                continue
+            span = _attr_span(source, el, attr)
+            url = source[span[0]:span[1]] if span else None
+            if url and is_local(url):
+                refs.append((*span, url, url_to_path(url, path, site_dir)))
+        inner = source[el.start_end:el.end]
+        if el.tag == 'script' and 'src' not in el.attrs and el.attrs.get('type') == 'module':
+            refs.extend(_refs_from_imports(js_imports(path, site_dir, inner), el.start_end))
+        elif el.tag == 'style':
+            refs.extend(_refs_from_imports(css_imports(path, site_dir, inner), el.start_end))
+    refs.sort()
+    return refs
+
+
+def rewrite(source, refs, versions):
+    """Sustituye cada referencia por su URL versionada"""
+    out = []
+    pos = 0
+    for start, end, url, target in refs:
+        out.append(source[pos:start])
+        out.append(versioned_url(url, versions.get(target)))
+        pos = end
+    out.append(source[pos:])
+    return ''.join(out)
+
+
+def _digest(data):
+    return sha256_bytes(data)[:HASH_LENGTH]
+
+
+def collect_files(site_dir=SITE_DIR):
+    """Páginas HTML y assets de texto (JS/CSS) del sitio"""
+    pages, assets = [], []
+    for dirpath, dirnames, filenames in os.walk(site_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            ext = os.path.splitext(name)[1]
+            if ext == '.html':
+                pages.append(path)
+            elif ext in TEXT_EXTENSIONS:
+                assets.append(path)
+    return pages, assets
+
+
+def _components(nodes, deps):
+    """Componentes fuertemente conexos (Tarjan), dependencias antes que dependientes"""
+    index, low, on_stack, stack, order = {}, {}, set(), [], []
+
+    def visit(node):
+        index[node] = low[node] = len(index)
+        stack.append(node)
+        on_stack.add(node)
+        for dep in sorted(deps[node]):
+            if dep not in deps:
+                continue
+            if dep not in index:
+                visit(dep)
+                low[node] = min(low[node], low[dep])
+            elif dep in on_stack:
+                low[node] = min(low[node], index[dep])
+        if low[node] == index[node]:
+            component = []
+            while True:
+                member = stack.pop()
+                on_stack.discard(member)
+                component.append(member)
+                if member == node:
+                    break
+            order.append(sorted(component))
+
+    for node in nodes:
+        if node not in index:
+            visit(node)
+    return order
+
+
+def fingerprint_site(site_dir=SITE_DIR):
+    """
+    Calcula versiones y contenido reescrito de todo el sitio.
+
+    Devuelve (versiones {ruta: hash}, salidas {ruta: texto}, referencias {ruta: [...]}).
+    """
+    pages, assets = collect_files(site_dir)
+    sources, refs = {}, {}
+    for path in pages + assets:
+        with open(path, 'r', encoding='utf-8') as f:
+            sources[path] = f.read()
+        refs[path] = scan(path, sources[path], site_dir)
+
+    deps = {path: {r[3] for r in refs[path] if r[3]} for path in assets}
+    versions = {}
+
+    def binary_version(target):
+        if target not in versions and target not in deps and os.path.isfile(target):
+            with open(target, 'rb') as f:
+                versions[target] = _digest(f.read())
+
+    outputs = {}
+    for component in _components(assets, deps):
+        for path in component:
+            for dep in deps[path]:
+                binary_version(dep)
+        if len(component) == 1 and component[0] not in deps[component[0]]:
+            path = component[0]
+            outputs[path] = rewrite(sources[path], refs[path], versions)
+            versions[path] = _digest(outputs[path].encode('utf-8'))
+            continue
+        # Ciclo: todos los miembros comparten una versión calculada sin sus refs internas
+        members = set(component)
+        external = {k: v for k, v in versions.items() if k not in members}
+        combined = ''.join(path + '\0' + rewrite(sources[path], refs[path], external) for path in component)
+        version = _digest(combined.encode('utf-8'))
+        for path in component:
+            versions[path] = version
+        for path in component:
+            outputs[path] = rewrite(sources[path], refs[path], versions)
+
+    for path in pages:
+        for r in refs[path]:
+            if r[3]:
+                binary_version(r[3])
+        outputs[path] = rewrite(sources[path], refs[path], versions)
+    return versions, outputs, refs
+
+
+def url_variants(refs, versions=None):
+    """{destino: {URLs distintas con las que se pide}} antes (o después, con ``versions``)"""
+    variants = {}
+    for file_refs in refs.values():
+        for _, _, url, target in file_refs:
+            if not target or not os.path.isfile(target):
+                continue
+            if versions is not None:
+                url = versioned_url(url, versions.get(target))
+            query = urlsplit(url).query
+            variants.setdefault(target, set()).add(site_url(target) + ('?' + query if query else ''))
+    return variants
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Versiona los assets del sitio por hash de contenido")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    parser.add_argument('--manifest', help="Guarda {ruta: versión} en este JSON")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    versions, outputs, refs = fingerprint_site()
+
+    written = []
+    for path, text in outputs.items():
+        with open(path, 'r', encoding='utf-8') as f:
+            original = f.read()
+        if text != original:
+            written.append(path)
+            if not args.check:
+                atomic_write(path, text.encode('utf-8'))
+
+    broken = sorted({(path, url) for path, file_refs in refs.items()
+                     for _, _, url, target in file_refs if not target or not os.path.isfile(target)})
+    before = url_variants(refs)
+    after = url_variants(refs, versions=versions)
+    duplicated = {target: urls for target, urls in before.items() if len(urls) > 1}
+    leftovers = [path for path, text in outputs.items() if PLACEHOLDER in text]
+
+    print("=" * 60)
+    print("VERSIONADO DE ASSETS POR CONTENIDO")
+    print("=" * 60)
+    print(f"🔑 Assets versionados: {len(versions)}   referencias: {sum(len(r) for r in refs.values())}")
+    print(f"{'📝 Se reescribirían' if args.check else '✅ Reescritos'}: {len(written)} archivos")
+    if duplicated:
+        print(f"🔀 Archivos que se pedían con varias URLs: {len(duplicated)}")
+        for target, urls in sorted(duplicated.items()):
+            print(f"   - {target}: {len(urls)} → {len(after[target])}  ({', '.join(sorted(urls))})")
+    if broken:
+        print(f"⚠️  Referencias a archivos inexistentes: {len(broken)}")
+        for path, url in broken:
+            print(f"   - {path}: {url}")
+    if leftovers:
+        print(f"❌ Quedan {PLACEHOLDER} en: {', '.join(leftovers)}")
+    print("=" * 60)
+    print(f"Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.manifest:
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            json.dump({os.path.relpath(p, SITE_DIR).replace(os.sep, '/'): v for p, v in sorted(versions.items())},
+                      f, indent=2)
+            f.write('\n')
+    return 1 if leftovers else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
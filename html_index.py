@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice posicional de una página HTML construido en una sola pasada
+
+Tokeniza el documento con html.parser y guarda, para cada elemento, su
+etiqueta, atributos, texto directo y posición exacta (offset, línea y columna
+calculadas con una tabla de inicios de línea).
+"""
+
+import re
+from bisect import bisect_right
+from html.parser import HTMLParser
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+RAW_TEXT_TAGS = {'script', 'style'}
+
+
+class Element:
+    """Elemento del índice (posiciones en offsets del texto original)"""
+
+    __slots__ = ('tag', 'attrs', 'start', 'start_end', 'end', 'parent',
+                 'texts', 'children', 'index')
+
+    def __init__(self, tag, attrs, start, start_end, parent, index):
+        self.tag = tag
+        self.attrs = attrs
+        self.start = start
+        self.start_end = start_end
+        self.end = start_end
+        self.parent = parent
+        self.texts = []
+        self.children = 0
+        self.index = index
+
+    @property
+    def text(self):
+        """Texto directo del elemento (sin el de sus hijos)"""
+        return ''.join(self.texts)
+
+    def has(self, attr):
+        return attr in self.attrs
+
+    def __repr__(self):
+        return f'<{self.tag} @{self.start}>'
+
+
+class PageIndex:
+    """Elementos, nodos de texto y tabla de líneas de un documento"""
+
+    def __init__(self, source):
+        self.source = source
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+        self.elements = []
+        # (offset, texto, elemento padre o None)
+        self.text_nodes = []
+
+    def position(self, offset):
+        """Offset → (línea, columna), ambas empezando en 1"""
+        line = bisect_right(self.line_starts, offset)
+        return line, offset - self.line_starts[line - 1] + 1
+
+    def location(self, offset):
+        line, col = self.position(offset)
+        return f'{line}:{col}'
+
+    def by_tag(self, tag):
+        return [el for el in self.elements if el.tag == tag]
+
+    def with_attr(self, attr):
+        return [el for el in self.elements if attr in el.attrs]
+
+    def inner_html(self, element):
+        return self.source[element.start_end:element.end]
+
+    def ancestors(self, element):
+        while element.parent is not None:
+            element = self.elements[element.parent]
+            yield element
+
+
+class _Indexer(HTMLParser):
+
+    def __init__(self, index):
+        super().__init__(convert_charrefs=True)
+        self.index = index
+        self.stack = []
+
+    def _offset(self):
+        line, col = self.getpos()
+        return self.index.line_starts[line - 1] + col
+
+    def _open(self, tag, attrs, void):
+        start = self._offset()
+        text = self.get_starttag_text()
+        parent = self.stack[-1] if self.stack else None
+        element = Element(tag, dict(attrs), start, start + len(text),
+                          parent.index if parent else None, len(self.index.elements))
+        self.index.elements.append(element)
+        if parent:
+            parent.children += 1
+        if not void and tag not in VOID_TAGS:
+            self.stack.append(element)
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, void=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, void=True)
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth].tag == tag:
+                break
+        else:
+            return
+        end = self._offset()
+        for element in self.stack[depth:]:
+            element.end = end
+        del self.stack[depth:]
+
+    def handle_data(self, data):
+        parent = self.stack[-1] if self.stack else None
+        if parent is not None:
+            parent.texts.append(data)
+        if data.strip() and (parent is None or parent.tag not in RAW_TEXT_TAGS):
+            self.index.text_nodes.append((self._offset(), data, parent))
+
+
+def build_index(source):
+    """Tokeniza ``source`` una vez y devuelve su PageIndex"""
+    index = PageIndex(source)
+    parser = _Indexer(index)
+    parser.feed(source)
+    parser.close()
+    end = len(source)
+    for element in parser.stack:
+        element.end = end
+    return index
+
+
+def load_index(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return build_index(f.read())
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Anotador i18n de una sola pasada basado en el tokenizador de html.parser
+
+Recorre el documento una vez y añade data-i18n, data-i18n-placeholder,
+data-i18n-aria-label y data-i18n-title a partir de una tabla declarativa de
+reglas. Todo lo que no son los atributos (o spans) inyectados queda byte a byte
+igual que en el original. Los elementos que ya tienen el atributo se saltan,
+así que se puede ejecutar varias veces sobre la misma página.
+"""
+
+import html
+import json
+import re
+from bisect import bisect_right
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# tag:        etiqueta del elemento ('#text' = nodo de texto que se envuelve en <span>)
+# match:      texto del elemento (espacios normalizados) o tupla (atributo, valor)
+# key:        clave de traducción
+# occurrence: si se indica, solo se anota la n-ésima coincidencia (1 = primera)
+Rule = namedtuple('Rule', 'tag match key occurrence', defaults=(None,))
+
+TEXT_NODE = '#text'
+
+# Atributo traducible → atributo data-i18n que lo acompaña
+ATTR_TARGETS = {
+    'placeholder': 'data-i18n-placeholder',
+    'aria-label': 'data-i18n-aria-label',
+    'title': 'data-i18n-title',
+}
+
+VOID_TAGS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+RAW_TEXT_TAGS = {'script', 'style'}
+
+# Puntuación final que queda fuera del <span> al envolver un nodo de texto
+TRAILING_PUNCTUATION = '.,;:'
+
+
+def normalize(text):
+    """Colapsa los espacios en blanco para comparar textos"""
+    return ' '.join(text.split())
+
+
+class RuleTable:
+    """Índices de búsqueda construidos una vez a partir de la lista de reglas"""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.by_text = {}
+        self.by_attr = {}
+        self.wraps = {}
+        for index, rule in enumerate(self.rules):
+            if isinstance(rule.match, tuple):
+                attr, value = rule.match
+                if attr not in ATTR_TARGETS:
+                    raise ValueError(f"Atributo no traducible en la regla {rule.key}: {attr}")
+                target = self.by_attr
+                lookup = (rule.tag, attr, value)
+            elif rule.tag == TEXT_NODE:
+                target = self.wraps
+                lookup = normalize(rule.match)
+            else:
+                target = self.by_text
+                lookup = (rule.tag, normalize(rule.match))
+            if lookup in target:
+                raise ValueError(f"Regla duplicada: {lookup!r}")
+            target[lookup] = index
+
+        self.text_tags = {tag for tag, _ in self.by_text}
+        self.min_text_len = {}
+        for tag, text in self.by_text:
+            self.min_text_len[tag] = min(len(text), self.min_text_len.get(tag, len(text)))
+
+
+class _Annotator(HTMLParser):
+
+    def __init__(self, source, table):
+        super().__init__(convert_charrefs=False)
+        self.source = source
+        self.table = table
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+        self.stack = []
+        self.cursor = 0
+        self.seen = [0] * len(table.rules)
+        self.inserts = []
+        self.applied = []
+
+    # --- posiciones ---------------------------------------------------------
+
+    def _offset(self):
+        line, col = self.getpos()
+        return self.line_starts[line - 1] + col
+
+    def _take(self, index):
+        """Cuenta la coincidencia y dice si la regla aplica en esta posición"""
+        self.seen[index] += 1
+        occurrence = self.table.rules[index].occurrence
+        return occurrence is None or occurrence == self.seen[index]
+
+    def _insert(self, offset, text, index=None, line=None):
+        self.inserts.append((offset, len(self.inserts), text))
+        if index is not None:
+            self.applied.append((line, self.table.rules[index]))
+
+    def _commit(self, pending):
+        for left, right, index, line in pending:
+            key = html.escape(self.table.rules[index].key)
+            self._insert(left, f'<span data-i18n="{key}">', index, line)
+            self._insert(right, '</span>')
+
+    # --- nodos de texto -----------------------------------------------------
+
+    def _flush_text(self, end):
+        start, self.cursor = self.cursor, end
+        if start >= end or not self.table.wraps:
+            return
+        if self.stack and self.stack[-1]['tag'] in RAW_TEXT_TAGS:
+            return
+        if self.stack and self.stack[-1]['i18n']:
+            return
+
+        raw = self.source[start:end]
+        stripped = raw.strip()
+        if not stripped:
+            return
+        left = start + (len(raw) - len(raw.lstrip()))
+        right = left + len(stripped)
+
+        index = self.table.wraps.get(normalize(stripped))
+        if index is None and stripped[-1] in TRAILING_PUNCTUATION:
+            index = self.table.wraps.get(normalize(stripped[:-1]))
+            right -= 1
+        if index is None or not self._take(index):
+            return
+
+        # Si el padre acaba anotado entero, el span sobra: se decide al cerrarlo
+        wrap = (left, right, index, bisect_right(self.line_starts, left))
+        if self.stack:
+            self.stack[-1]['pending'].append(wrap)
+        else:
+            self._commit([wrap])
+
+    # --- etiquetas ----------------------------------------------------------
+
+    def _open(self, tag, attrs, void):
+        start = self._offset()
+        self._flush_text(start)
+        text = self.get_starttag_text()
+        end = start + len(text)
+        self.cursor = end
+        attrs = dict(attrs)
+        line = self.getpos()[0]
+
+        for attr, target in ATTR_TARGETS.items():
+            value = attrs.get(attr)
+            if value is None or target in attrs:
+                continue
+            index = self.table.by_attr.get((tag, attr, value))
+            if index is None:
+                index = self.table.by_attr.get(('*', attr, value))
+            if index is None or not self._take(index):
+                continue
+            m = re.search(r'(?<=\s)' + re.escape(attr) + r'\s*=', text)
+            key = html.escape(self.table.rules[index].key)
+            self._insert(start + m.start(), f'{target}="{key}" ', index, line)
+
+        if not void and tag not in VOID_TAGS:
+            self.stack.append({
+                'tag': tag, 'start': start, 'end': end, 'line': line,
+                'text': text, 'i18n': 'data-i18n' in attrs, 'pending': [],
+            })
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, void=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, void=True)
+
+    def handle_endtag(self, tag):
+        start = self._offset()
+        self._flush_text(start)
+        self.cursor = self.source.index('>', start) + 1
+
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth]['tag'] == tag:
+                break
+        else:
+            return
+        frame = self.stack[depth]
+        for unclosed in self.stack[depth + 1:]:
+            self._commit(unclosed['pending'])
+        del self.stack[depth:]
+
+        index = None
+        if (not frame['i18n'] and tag in self.table.text_tags
+                and start - frame['end'] >= self.table.min_text_len[tag]):
+            index = self.table.by_text.get((tag, normalize(self.source[frame['end']:start])))
+        if index is None or not self._take(index):
+            self._commit(frame['pending'])
+            return
+
+        text = frame['text']
+        close = len(text) - (2 if text.endswith('/>') else 1)
+        close = len(text[:close].rstrip())
+        key = html.escape(self.table.rules[index].key)
+        self._insert(frame['start'] + close, f' data-i18n="{key}"', index, frame['line'])
+
+    # --- resto de construcciones --------------------------------------------
+
+    def _skip(self, terminator):
+        start = self._offset()
+        self._flush_text(start)
+        self.cursor = self.source.index(terminator, start) + len(terminator)
+
+    def handle_comment(self, data):
+        self._skip('-->')
+
+    def handle_decl(self, decl):
+        self._skip('>')
+
+    def handle_pi(self, data):
+        self._skip('>')
+
+    def unknown_decl(self, data):
+        self._skip('>')
+
+    # --- resultado ----------------------------------------------------------
+
+    def run(self):
+        self.feed(self.source)
+        self.close()
+        self._flush_text(len(self.source))
+        for frame in self.stack:
+            self._commit(frame['pending'])
+
+        parts = []
+        last = 0
+        for offset, _, text in sorted(self.inserts):
+            parts.append(self.source[last:offset])
+            parts.append(text)
+            last = offset
+        parts.append(self.source[last:])
+        return ''.join(parts)
+
+
+def annotate(content, rules):
+    """
+    Anota ``content`` con la tabla ``rules`` (lista de Rule o RuleTable).
+
+    Devuelve (contenido anotado, [(línea, regla aplicada), ...]).
+    """
+    table = rules if isinstance(rules, RuleTable) else RuleTable(rules)
+    annotator = _Annotator(content, table)
+    return annotator.run(), annotator.applied
+
+
+def load_rules(path):
+    """Reglas de un catálogo de candidatas generado por i18n_extract.py"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    rules = []
+    for c in data['candidates']:
+        match = tuple(c['match']) if isinstance(c['match'], list) else c['match']
+        rules.append(Rule(c['tag'], match, c['key'], c.get('occurrence')))
+    return rules
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cargador del catálogo de traducciones de site/js/utils/i18n.js
+
+Parsea el literal ``const translations = { es: {...}, en: {...} }`` a un
+índice plano {locale: {clave.con.puntos: texto}}. El resultado se cachea en
+.build-cache/ por mtime/tamaño y, si estos cambian, por SHA-256 del archivo.
+"""
+
+import json
+import os
+import re
+
+from build_cache import atomic_write_text, sha256_bytes
+
+I18N_JS = os.path.join('site', 'js', 'utils', 'i18n.js')
+CACHE_DIR = '.build-cache'
+CACHE_PATH = os.path.join(CACHE_DIR, 'i18n-catalog.json')
+CACHE_VERSION = 1
+
+_TOKEN_RE = re.compile(r'''
+    (?P<ws>\s+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*.*?\*/)
+  | (?P<string>'(?:[^'\\\n]|\\.)*'|"(?:[^"\\\n]|\\.)*"|`(?:[^`\\$]|\\.|\$(?!\{))*`)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<number>-?\d+(?:\.\d+)?)
+  | (?P<punct>[{}:,])
+''', re.VERBOSE | re.DOTALL)
+
+_ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0'}
+
+
+class CatalogError(ValueError):
+    pass
+
+
+def _unquote(literal):
+    """Valor de un literal de cadena JS ('...', "..." o `...` sin interpolación)"""
+    body = literal[1:-1]
+    out = []
+    i = 0
+    while i < len(body):
+        ch = body[i]
+        if ch != '\\':
+            out.append(ch)
+            i += 1
+            continue
+        nxt = body[i + 1]
+        if nxt == 'u' and body[i + 2] == '{':
+            end = body.index('}', i)
+            out.append(chr(int(body[i + 3:end], 16)))
+            i = end + 1
+        elif nxt == 'u':
+            out.append(chr(int(body[i + 2:i + 6], 16)))
+            i += 6
+        elif nxt == 'x':
+            out.append(chr(int(body[i + 2:i + 4], 16)))
+            i += 4
+        elif nxt == '\n':
+            i += 2
+        else:
+            out.append(_ESCAPES.get(nxt, nxt))
+            i += 2
+    return ''.join(out)
+
+
+def _tokens(source, pos):
+    """Tokens significativos del literal desde ``pos`` (sin espacios ni comentarios)"""
+    while pos < len(source):
+        m = _TOKEN_RE.match(source, pos)
+        if not m:
+            raise CatalogError(f"Token inesperado en el offset {pos}: {source[pos:pos + 20]!r}")
+        pos = m.end()
+        kind = m.lastgroup
+        if kind in ('ws', 'line_comment', 'block_comment'):
+            continue
+        yield kind, m.group(), m.start()
+
+
+def _parse_object(tokens, prefix, flat):
+    """Parsea ``{ clave: valor, ... }`` (la llave de apertura ya consumida)"""
+    expect_key = True
+    for kind, text, offset in tokens:
+        if kind == 'punct' and text == '}':
+            return
+        if kind == 'punct' and text == ',':
+            expect_key = True
+            continue
+        if not expect_key or kind not in ('ident', 'string', 'number'):
+            raise CatalogError(f"Se esperaba una clave en el offset {offset}, hay {text!r}")
+        key = _unquote(text) if kind == 'string' else text
+        kind, colon, offset = next(tokens)
+        if colon != ':':
+            raise CatalogError(f"Se esperaba ':' en el offset {offset}")
+        kind, value, offset = next(tokens)
+        path = f'{prefix}.{key}' if prefix else key
+        if kind == 'punct' and value == '{':
+            _parse_object(tokens, path, flat)
+        elif kind == 'string':
+            flat[path] = _unquote(value)
+        elif kind in ('number', 'ident'):
+            flat[path] = value
+        else:
+            raise CatalogError(f"Valor no soportado para {path} en el offset {offset}: {value!r}")
+        expect_key = False
+    raise CatalogError("Fin de archivo dentro del objeto translations")
+
+
+def _parse_literal(source):
+    """Parsea el literal ``translations``; devuelve (plano, offset de '{', offset tras '}')"""
+    m = re.search(r'\bconst\s+translations\s*=\s*\{', source)
+    if not m:
+        raise CatalogError("No se encontró 'const translations = {' en i18n.js")
+    end = [m.end()]
+
+    def tracked():
+        for kind, text, offset in _tokens(source, m.end()):
+            end[0] = offset + len(text)
+            yield kind, text, offset
+
+    flat = {}
+    _parse_object(tracked(), '', flat)
+    return flat, m.end() - 1, end[0]
+
+
+def translations_span(source):
+    """(inicio, fin) del literal ``{ es: {...}, en: {...} }`` dentro de i18n.js"""
+    _, start, end = _parse_literal(source)
+    return start, end
+
+
+def parse_translations(source):
+    """
+    Parsea el literal ``translations`` de i18n.js.
+
+    Devuelve {locale: {clave.plana: texto}}.
+    """
+    flat, _, _ = _parse_literal(source)
+
+    catalog = {}
+    for path, value in flat.items():
+        locale, _, key = path.partition('.')
+        catalog.setdefault(locale, {})[key] = value
+    return catalog
+
+
+def _read_cache(cache_path):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return cache if cache.get('version') == CACHE_VERSION else None
+
+
+def load_catalog(path=I18N_JS, cache_path=CACHE_PATH):
+    """
+    Catálogo plano de ``path``, reutilizando la caché si el archivo no cambió.
+
+    Primero compara mtime y tamaño; si difieren, compara el SHA-256 antes de
+    volver a parsear.
+    """
+    st = os.stat(path)
+    cache = _read_cache(cache_path) if cache_path else None
+    if cache and cache['source'] == path and cache['mtime_ns'] == st.st_mtime_ns and cache['size'] == st.st_size:
+        return cache['catalog']
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = sha256_bytes(data)
+    if cache and cache['source'] == path and cache['sha256'] == digest:
+        catalog = cache['catalog']
+    else:
+        catalog = parse_translations(data.decode('utf-8'))
+
+    if cache_path:
+        atomic_write_text(cache_path, json.dumps({
+            'version': CACHE_VERSION,
+            'source': path,
+            'mtime_ns': st.st_mtime_ns,
+            'size': st.st_size,
+            'sha256': digest,
+            'catalog': catalog,
+        }, ensure_ascii=False))
+    return catalog
+
+
+def all_keys(catalog):
+    """Unión de las claves de todos los locales"""
+    keys = set()
+    for entries in catalog.values():
+        keys.update(entries)
+    return keys
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extrae los textos sin traducir del sitio a un catálogo de claves candidatas
+
+Uso:
+    python i18n_extract.py                          # todo site/ → i18n-candidates.json
+    python i18n_extract.py site/secciones/email.html
+    python i18n_extract.py --output - --quiet       # JSON por stdout
+
+Una sola pasada por página con el tokenizador de html.parser. Recoge:
+  - elementos hoja con texto y sin data-i18n          → Rule(tag, texto, clave)
+  - texto suelto junto a otros elementos (iconos...)  → Rule('#text', texto, clave)
+  - placeholder, title y aria-label sin data-i18n-*   → Rule(tag, (atributo, valor), clave)
+
+Si el texto ya existe en el catálogo (es) se propone esa clave; si no, una
+nueva en la sección del catálogo dominante en la página (o la que se llama
+como el archivo). Las páginas sin ninguna se listan aparte, sin inventar
+secciones. El JSON resultante se carga con
+i18n_annotator.load_rules() y translate_batch.py lo aplica con la regla
+'candidates'.
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from bisect import bisect_right
+from collections import Counter
+from html.parser import HTMLParser
+
+from build_cache import atomic_write_text
+from i18n_annotator import ATTR_TARGETS, RAW_TEXT_TAGS, TEXT_NODE, TRAILING_PUNCTUATION, VOID_TAGS, normalize
+from i18n_catalog import load_catalog
+
+SITE_DIR = 'site'
+SKIP_DIRS = {'vendor', 'i18n', 'localized'}
+CANDIDATES_PATH = 'i18n-candidates.json'
+SOURCE_LOCALE = 'es'
+
+# Etiquetas cuyo contenido no se traduce
+SKIP_TAGS = RAW_TEXT_TAGS | {'noscript', 'code', 'pre', 'svg', 'template'}
+
+# Palabras que no aportan al nombre de la clave
+STOPWORDS = {
+    'a', 'al', 'con', 'de', 'del', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'o', 'para', 'por', 'que', 'se', 'su', 'sus', 'tu', 'tus', 'un', 'una', 'y',
+}
+KEY_WORDS = 4
+
+# Sufijo del nombre de clave según el atributo
+ATTR_SUFFIX = {'placeholder': 'Placeholder', 'title': 'Title', 'aria-label': 'Label'}
+
+_LETTER_RE = re.compile(r'[^\W\d_]')
+_NOT_TEXT_RE = re.compile(r'^(?:https?://\S+|\S+@\S+\.\S+|[\w.-]+\.(?:html|js|css|png|svg))$|\$\{|\{\{')
+
+
+def is_translatable(text):
+    """¿Parece texto visible para el usuario (y no una URL, un email o una plantilla)?"""
+    text = text.strip()
+    return bool(text) and bool(_LETTER_RE.search(text)) and not _NOT_TEXT_RE.search(text)
+
+
+class _Extractor(HTMLParser):
+    """Recorre una página y acumula (tipo, etiqueta, match, texto, offset)"""
+
+    def __init__(self, source):
+        super().__init__(convert_charrefs=False)
+        self.source = source
+        self.line_starts = [0] + [m.end() for m in re.finditer('\n', source)]
+        self.stack = []
+        self.cursor = 0
+        self.found = []
+        self.sections = Counter()
+
+    def _offset(self):
+        line, col = self.getpos()
+        return self.line_starts[line - 1] + col
+
+    def _blocked(self):
+        """Dentro de script/style, de un elemento con data-i18n o de translate="no" """
+        return bool(self.stack) and self.stack[-1]['blocked']
+
+    def _flush_text(self, end):
+        start, self.cursor = self.cursor, end
+        if start >= end or not self.stack or self._blocked():
+            return
+        raw = self.source[start:end]
+        if is_translatable(html.unescape(raw)):
+            left = start + len(raw) - len(raw.lstrip())
+            self.stack[-1]['texts'].append((left, raw.strip()))
+
+    def _open(self, tag, attrs, void):
+        start = self._offset()
+        self._flush_text(start)
+        text = self.get_starttag_text()
+        self.cursor = start + len(text)
+        attrs = dict(attrs)
+
+        for attr in ('data-i18n', *ATTR_TARGETS.values()):
+            key = attrs.get(attr)
+            if key and '.' in key:
+                self.sections[key.split('.')[0]] += 1
+
+        blocked = self._blocked()
+        if not blocked:
+            for attr, target in ATTR_TARGETS.items():
+                value = attrs.get(attr)
+                if value and target not in attrs and is_translatable(value) and not value.isdigit():
+                    self.found.append(('attr', tag, (attr, value), value, start))
+
+        if self.stack:
+            self.stack[-1]['children'] += 1
+        if not void and tag not in VOID_TAGS:
+            self.stack.append({
+                'tag': tag, 'start': start, 'end': self.cursor, 'texts': [], 'children': 0,
+                'blocked': (blocked or tag in SKIP_TAGS or 'data-i18n' in attrs
+                            or attrs.get('translate') == 'no' or 'notranslate' in (attrs.get('class') or '').split()),
+            })
+
+    def handle_starttag(self, tag, attrs):
+        self._open(tag, attrs, void=False)
+
+    def handle_startendtag(self, tag, attrs):
+        self._open(tag, attrs, void=True)
+
+    def _close(self, frame, end):
+        if frame['blocked'] or not frame['texts']:
+            return
+        if not frame['children'] and len(frame['texts']) == 1:
+            inner = normalize(self.source[frame['end']:end])
+            self.found.append(('text', frame['tag'], inner, html.unescape(inner), frame['end']))
+            return
+        for offset, raw in frame['texts']:
+            text = normalize(raw)
+            if text[-1] in TRAILING_PUNCTUATION:
+                text = text[:-1].rstrip()
+            self.found.append(('wrap', TEXT_NODE, text, html.unescape(text), offset))
+
+    def handle_endtag(self, tag):
+        start = self._offset()
+        self._flush_text(start)
+        self.cursor = self.source.index('>', start) + 1
+        for depth in range(len(self.stack) - 1, -1, -1):
+            if self.stack[depth]['tag'] == tag:
+                break
+        else:
+            return
+        frames = self.stack[depth:]
+        del self.stack[depth:]
+        for frame in reversed(frames):
+            self._close(frame, start)
+
+    def _skip(self, terminator):
+        start = self._offset()
+        self._flush_text(start)
+        self.cursor = self.source.index(terminator, start) + len(terminator)
+
+    def handle_comment(self, data):
+        self._skip('-->')
+
+    def handle_decl(self, decl):
+        self._skip('>')
+
+    def handle_pi(self, data):
+        self._skip('>')
+
+    def unknown_decl(self, data):
+        self._skip('>')
+
+    def run(self):
+        self.feed(self.source)
+        self.close()
+        end = len(self.source)
+        self._flush_text(end)
+        while self.stack:
+            self._close(self.stack.pop(), end)
+        return self
+
+
+def scan_page(path):
+    """
+    Textos sin traducir de una página.
+
+    Devuelve ([(tipo, etiqueta, match, texto, 'ruta:línea:col')], Counter de secciones).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    extractor = _Extractor(source).run()
+    found = []
+    for kind, tag, match, text, offset in sorted(extractor.found, key=lambda item: item[4]):
+        line = bisect_right(extractor.line_starts, offset)
+        col = offset - extractor.line_starts[line - 1] + 1
+        found.append((kind, tag, match, text, f'{path}:{line}:{col}'))
+    return found, extractor.sections
+
+
+def key_name(text, suffix=''):
+    """'Guardar cambios de la tienda' → 'guardarCambiosTienda'"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    words = [w.lower() for w in re.findall(r'[A-Za-z0-9]+', ascii_text)]
+    words = [w for w in words if w not in STOPWORDS] or words or ['text']
+    words = words[:KEY_WORDS]
+    name = words[0] + ''.join(w.capitalize() for w in words[1:]) + suffix
+    return name if name[0].isalpha() else 'text' + name[0].upper() + name[1:]
+
+
+def page_section(path, sections, known):
+    """
+    Sección del catálogo para las claves nuevas de la página, o None.
+
+    La dominante entre las que ya usa la página y existen en el catálogo; si
+    no usa ninguna, la que se llama como el archivo (plans.html → plans).
+    """
+    for section, _ in sections.most_common():
+        if section in known:
+            return section
+    name = os.path.splitext(os.path.basename(path))[0]
+    return name if name in known else None
+
+
+def build_candidates(pages, catalog):
+    """
+    Agrupa los hallazgos de ``pages`` ({ruta: (hallazgos, secciones)}) en candidatas.
+
+    Una misma regla (tipo, etiqueta, match) aparece una sola vez con todas sus
+    ubicaciones; así el resultado nunca tiene reglas duplicadas. Los textos
+    nuevos de páginas sin sección en el catálogo no reciben clave: se
+    devuelven aparte como {ruta: nº de textos} para añadirlos a mano.
+
+    Devuelve (candidatas, omitidos).
+    """
+    source = catalog.get(SOURCE_LOCALE, {})
+    known = {key.split('.')[0] for key in source}
+    by_text = {}
+    for key, value in source.items():
+        by_text.setdefault(normalize(value), key)
+    taken = set(source)
+    # El mismo texto en otra etiqueta o página reutiliza la clave nueva
+    new_keys = {}
+
+    candidates = {}
+    skipped = Counter()
+    for path, (found, sections) in pages.items():
+        section = page_section(path, sections, known)
+        for kind, tag, match, text, location in found:
+            lookup = (tag, *match) if kind == 'attr' else (tag, match)
+            if lookup in candidates:
+                candidates[lookup]['locations'].append(location)
+                continue
+
+            suffix = ATTR_SUFFIX.get(match[0], '') if kind == 'attr' else ''
+            existing = by_text.get(normalize(text))
+            if existing:
+                key = existing
+            elif (text, suffix) in new_keys:
+                key = new_keys[(text, suffix)]
+            elif section is None:
+                skipped[path] += 1
+                continue
+            else:
+                base = f'{section}.{key_name(text, suffix)}'
+                key, n = base, 2
+                while key in taken:
+                    key, n = f'{base}{n}', n + 1
+                taken.add(key)
+                new_keys[(text, suffix)] = key
+            candidates[lookup] = {
+                'key': key,
+                'tag': tag,
+                'match': list(match) if kind == 'attr' else match,
+                'kind': kind,
+                'text': text,
+                'existing': bool(existing),
+                'locations': [location],
+            }
+    return list(candidates.values()), dict(skipped)
+
+
+def iter_pages(root=SITE_DIR):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith('.html'):
+                yield os.path.join(dirpath, name)
+
+
+def extract(paths):
+    """Escanea ``paths`` y devuelve el catálogo de candidatas listo para serializar"""
+    pages = {path: scan_page(path) for path in paths}
+    candidates, skipped = build_candidates(pages, load_catalog())
+    return {
+        'version': 1,
+        'locale': SOURCE_LOCALE,
+        'candidates': candidates,
+        'skipped': skipped,
+    }
+
+
+def report(result, elapsed, quiet=False):
+    candidates = result['candidates']
+    print("=" * 60)
+    print("TEXTOS SIN TRADUCIR")
+    print("=" * 60)
+    if not quiet:
+        for c in candidates:
+            icon = '♻️ ' if c['existing'] else '🆕'
+            print(f"{icon} {c['key']:<40} {c['text'][:50]!r}")
+            for location in c['locations'][:3]:
+                print(f"      {location}")
+    kinds = Counter(c['kind'] for c in candidates)
+    reused = sum(1 for c in candidates if c['existing'])
+    print("=" * 60)
+    print(f"Candidatas: {len(candidates)}  (textos: {kinds['text']}, sueltos: {kinds['wrap']}, "
+          f"atributos: {kinds['attr']})  con clave existente: {reused}")
+    for path, count in result['skipped'].items():
+        print(f"⚠️  {path}: {count} textos sin sección del catálogo (no se propone clave nueva)")
+    print(f"Tiempo total: {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extrae los textos sin traducir a un catálogo de claves")
+    parser.add_argument('pages', nargs='*', help="Páginas HTML (por defecto todo site/)")
+    parser.add_argument('--output', default=CANDIDATES_PATH, help="JSON de salida ('-' para stdout)")
+    parser.add_argument('--quiet', action='store_true', help="Solo muestra los totales")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = extract(args.pages or list(iter_pages()))
+    text = json.dumps(result, ensure_ascii=False, indent=2) + '\n'
+    if args.output == '-':
+        sys.stdout.write(text)
+        return 0
+    atomic_write_text(args.output, text)
+    report(result, time.perf_counter() - start, args.quiet)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
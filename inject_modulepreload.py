@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inyecta <link rel="modulepreload"> con el grafo completo de módulos de cada página
+
+Uso:
+    python inject_modulepreload.py             # todas las páginas de site/
+    python inject_modulepreload.py --check     # solo informa (profundidad y bytes)
+
+Para cada página resuelve sus <script type="module"> (y los import de los
+módulos inline), recorre los import estáticos y los import(/* eager */ ...)
+y escribe en el <head>, en orden de dependencias, un modulepreload por
+módulo. Así el navegador pide todo el grafo en la primera vuelta en lugar
+de descubrir un nivel de imports por cada ida y vuelta.
+
+Las URLs se copian tal y como las importa el código (con su ?v=), porque un
+modulepreload solo se aprovecha si la URL coincide exactamente: en deploy
+se ejecuta después de fingerprint_assets.py. El bloque va entre marcadores y
+se sustituye en cada ejecución.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import urlsplit
+
+from build_cache import atomic_write_text
+from html_index import build_index
+from site_graph import SITE_DIR, follows, js_imports, site_url
+
+BLOCK_START = '<!-- modulepreload:start -->'
+BLOCK_END = '<!-- modulepreload:end -->'
+SKIP_DIRS = {'vendor', 'partials', 'i18n', 'localized'}
+
+_BLOCK_RE = re.compile(r'[ \t]*' + re.escape(BLOCK_START) + r'.*?' + re.escape(BLOCK_END) + r'\n?', re.S)
+
+
+def module_url(spec, path):
+    """URL absoluta con la que se pide el módulo (conserva la query del especificador)"""
+    query = urlsplit(spec).query
+    return site_url(path) + ('?' + query if query else '')
+
+
+def page_entries(html_path, source, site_dir=SITE_DIR):
+    """Módulos de entrada de la página: [(url, ruta)] y URLs ya precargadas"""
+    index = build_index(source)
+    entries = []
+    preloaded = set()
+    for el in index.elements:
+        if el.tag == 'script' and el.attrs.get('type') == 'module':
+            src = el.attrs.get('src')
+            if src:
+                imports = js_imports(html_path, site_dir, f'import {src!r};')
+            else:
+                imports = [imp for imp in js_imports(html_path, site_dir, index.inner_html(el)) if follows(imp)]
+            entries.extend((module_url(imp.specifier, imp.path), imp.path) for imp in imports if imp.path)
+        elif el.tag == 'link' and 'modulepreload' in (el.attrs.get('rel') or '').split():
+            preloaded.add(el.attrs.get('href'))
+    return entries, preloaded
+
+
+def preload_plan(entries, site_dir=SITE_DIR):
+    """
+    Recorre el grafo desde ``entries``.
+
+    Devuelve (orden [(url, ruta)] con dependencias primero, profundidad,
+    URLs distintas por módulo).
+    """
+    imports = {}
+    urls = {}
+    order = []
+    depth = {}
+    visiting = set()
+
+    def visit(url, path):
+        urls.setdefault(path, set()).add(url)
+        if path in depth or path in visiting or not os.path.isfile(path):
+            return depth.get(path, 0)
+        visiting.add(path)
+        imports[path] = [imp for imp in js_imports(path, site_dir) if imp.path and follows(imp)]
+        deepest = 0
+        for imp in imports[path]:
+            deepest = max(deepest, visit(module_url(imp.specifier, imp.path), imp.path))
+        visiting.discard(path)
+        depth[path] = deepest + 1
+        order.append((url, path))
+        return depth[path]
+
+    max_depth = 0
+    for url, path in entries:
+        max_depth = max(max_depth, visit(url, path))
+    return order, max_depth, urls
+
+
+def render_block(order, preloaded, indent='  '):
+    links = [f'{indent}<link rel="modulepreload" href="{url}">' for url, _ in order if url not in preloaded]
+    if not links:
+        return ''
+    return f'{indent}{BLOCK_START}\n' + '\n'.join(links) + f'\n{indent}{BLOCK_END}\n'
+
+
+def inject(source, block):
+    """Sustituye el bloque anterior (si lo hay) y coloca el nuevo antes de </head>"""
+    source = _BLOCK_RE.sub('', source)
+    if not block:
+        return source
+    m = re.search(r'[ \t]*</head>', source, re.I)
+    if not m:
+        return source
+    return source[:m.start()] + block + source[m.start():]
+
+
+def process_page(path, check=False, site_dir=SITE_DIR):
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    entries, preloaded = page_entries(path, _BLOCK_RE.sub('', source), site_dir)
+    order, depth, urls = preload_plan(entries, site_dir)
+    written = False
+    if entries:
+        output = inject(source, render_block(order, preloaded))
+        written = not check and atomic_write_text(path, output)
+    return {
+        'path': path,
+        'modules': len(order),
+        'depth': depth,
+        'bytes': sum(os.path.getsize(p) for _, p in order),
+        'written': written,
+        'conflicts': {p: sorted(u) for p, u in urls.items() if len(u) > 1},
+    }
+
+
+def iter_pages(root=SITE_DIR):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith('.html'):
+                yield os.path.join(dirpath, name)
+
+
+def report(results, elapsed, check):
+    print("=" * 72)
+    print("MODULEPRELOAD POR PÁGINA")
+    print("=" * 72)
+    print(f"{'Página':<44} {'Módulos':>7} {'Prof.':>5} {'Bytes':>10}")
+    for r in results:
+        if not r['modules']:
+            continue
+        icon = '✅' if r['written'] else '➖'
+        print(f"{icon} {r['path']:<42} {r['modules']:>7} {r['depth']:>5} {r['bytes']:>10,}")
+    conflicts = {p: u for r in results for p, u in r['conflicts'].items()}
+    if conflicts:
+        print(f"⚠️  Módulos importados con URLs distintas (¿falta fingerprint_assets.py?): {len(conflicts)}")
+        for path, urls in sorted(conflicts.items()):
+            print(f"   - {path}: {', '.join(urls)}")
+    print("=" * 72)
+    deepest = max((r['depth'] for r in results), default=0)
+    print(f"{'Modo consulta: no se ha escrito nada. ' if check else ''}"
+          f"Ida y vuelta de módulos en la página más profunda: {deepest} → 1   "
+          f"Tiempo total: {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inyecta modulepreload a partir del grafo de imports")
+    parser.add_argument('pages', nargs='*', help="Páginas HTML (por defecto todas las de site/)")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = [process_page(path, args.check) for path in (args.pages or list(iter_pages()))]
+    report(results, time.perf_counter() - start, args.check)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
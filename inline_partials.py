@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Inserta en el HTML de cada sección los partials que hoy se descargan con fetch()
+
+Uso:
+    python inline_partials.py                        # todas las páginas de site/secciones
+    python inline_partials.py site/secciones/inbox.html
+    python inline_partials.py --check                # solo informa
+    python inline_partials.py --no-cache
+
+sidebar.js pide /partials/sidebar.html en cada navegación y el HTML se sirve
+con no-store: es un viaje de ida y vuelta más, sin caché, antes de poder
+pintar el sidebar. En deploy este paso mete el partial dentro de su
+contenedor en cada página que lo usa:
+
+    <div id="sidebarContainer" data-partial="sidebar"> ...sidebar.html... </div>
+
+Una página usa un partial de PARTIALS si alguno de sus módulos lo descarga
+(fetch('/partials/...')) y tiene el contenedor. El módulo comprueba
+data-partial y solo hace el fetch si el contenedor no viene relleno, así
+que las páginas sin este paso funcionan igual.
+
+Antes de insertarlo se anota el partial con i18n_annotator: los textos y
+atributos sin data-i18n* que coinciden exactamente con una traducción en
+español de las secciones que el partial ya usa reciben su clave, para que
+translatePage() y prerender_locales.py también los traduzcan. Necesita el
+catálogo completo de i18n.js, así que en deploy va antes de
+prune_i18n_keys.py y de build_i18n_tables.py --link (con el literal vacío
+termina con error en vez de incrustar el partial sin anotar).
+
+El manifiesto de build guarda para cada página el hash de cada partial que
+contiene y el de la página ya incrustada: solo se reescriben las páginas
+cuyo HTML o cuyos partials han cambiado. Una página con el HTML original
+(sin incrustar) siempre se procesa, aunque el manifiesto venga de otra
+ejecución. Es idempotente: vuelve a rellenar el contenedor desde cero.
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import namedtuple
+
+from build_cache import Manifest, atomic_write_text, sha256_bytes
+from html_index import build_index
+from i18n_annotator import ATTR_TARGETS, Rule, annotate, normalize
+from i18n_catalog import I18N_JS, load_catalog
+from site_graph import SITE_DIR, follows, js_partials, module_graph, page_refs, section_pages
+
+# name: valor de data-partial; container: id del elemento que rellena su módulo
+Partial = namedtuple('Partial', 'name path container')
+
+PARTIALS = (
+    Partial('sidebar', os.path.join(SITE_DIR, 'partials', 'sidebar.html'), 'sidebarContainer'),
+)
+CACHE_STAGE = 'inline-partials'
+# Cambiarlo fuerza a rehacer todas las páginas
+INLINE_VERSION = 1
+MARK_ATTR = 'data-partial'
+SOURCE_LOCALE = 'es'
+
+
+def annotation_rules(markup, catalog):
+    """Reglas para los textos/atributos del partial que coinciden con una traducción de sus secciones"""
+    index = build_index(markup)
+    keys = [v for el in index.elements for k, v in el.attrs.items() if k.startswith('data-i18n') and v]
+    sections = {key.split('.')[0] + '.' for key in keys}
+    by_text = {}
+    for key, text in catalog.get(SOURCE_LOCALE, {}).items():
+        if key.startswith(tuple(sections)):
+            by_text.setdefault(normalize(text), []).append(key)
+
+    rules = {}
+    for el in index.elements:
+        text = normalize(el.text)
+        matches = by_text.get(text, [])
+        if text and el.children == 0 and 'data-i18n' not in el.attrs and len(matches) == 1:
+            rules[(el.tag, text)] = Rule(el.tag, text, matches[0])
+        for attr, target in ATTR_TARGETS.items():
+            value = el.attrs.get(attr)
+            matches = by_text.get(normalize(value or ''), [])
+            if value and target not in el.attrs and len(matches) == 1:
+                rules[(el.tag, attr, value)] = Rule(el.tag, (attr, value), matches[0])
+    return list(rules.values())
+
+
+def load_partials(partials, catalog):
+    """{nombre: (Partial, marcado anotado, hash, nº de anotaciones)}"""
+    loaded = {}
+    for partial in partials:
+        with open(partial.path, 'r', encoding='utf-8') as f:
+            markup = f.read()
+        markup, applied = annotate(markup, annotation_rules(markup, catalog))
+        markup = markup.strip()
+        loaded[partial.name] = (partial, markup, sha256_bytes(markup.encode('utf-8')), len(applied))
+    return loaded
+
+
+def partial_users(pages, partials, site_dir=SITE_DIR):
+    """{página: [Partial, ...]} con los partials que descarga alguno de sus módulos"""
+    entries = {page: [ref.path for ref in page_refs(page, site_dir) if ref.kind == 'module' and ref.path]
+               for page in pages}
+    # Un solo grafo para todas las páginas: cada módulo compartido se lee una vez
+    graph = module_graph([path for paths in entries.values() for path in paths], site_dir, include_dynamic=True)
+    fetched = {path: {os.path.normpath(p) for p in js_partials(path, site_dir) if p} for path in graph}
+    users = {}
+    for page, stack in entries.items():
+        seen, found = set(), set()
+        while stack:
+            path = stack.pop()
+            if path in seen or path not in graph:
+                continue
+            seen.add(path)
+            found |= fetched[path]
+            stack.extend(imp.path for imp in graph[path] if imp.path and follows(imp, include_dynamic=True))
+        users[page] = [p for p in partials if os.path.normpath(p.path) in found]
+    return users
+
+
+def inline(source, partial, markup):
+    """Rellena el contenedor del partial; devuelve (HTML, ¿había contenedor?)"""
+    index = build_index(source)
+    container = next((el for el in index.elements if el.attrs.get('id') == partial.container), None)
+    if container is None:
+        return source, False
+    tag = source[container.start:container.start_end]
+    if MARK_ATTR not in container.attrs:
+        close = len(tag) - (2 if tag.endswith('/>') else 1)
+        tag = f'{tag[:close].rstrip()} {MARK_ATTR}="{partial.name}"{tag[close:]}'
+    return source[:container.start] + tag + markup + source[container.end:], True
+
+
+def process_page(path, used, loaded, manifest, check=False, use_cache=True):
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    digest = sha256_bytes(source.encode('utf-8'))
+    rules = [INLINE_VERSION, sorted([p.name, loaded[p.name][2]] for p in used)]
+    result = {'path': path, 'partials': [p.name for p in used], 'missing': [], 'status': 'skip'}
+    if not used:
+        return result
+    entry = manifest.entry(CACHE_STAGE, path)
+    # Solo vale la salida: con el hash de entrada la página está sin incrustar (p. ej. recién clonada)
+    if use_cache and entry and entry['rules'] == rules and digest == entry['output']:
+        result['status'] = 'fresh'
+        return result
+
+    output = source
+    for partial in used:
+        output, found = inline(output, partial, loaded[partial.name][1])
+        if not found:
+            result['missing'].append(partial.container)
+    result['status'] = 'changed' if output != source else 'same'
+    if not check:
+        atomic_write_text(path, output)
+        manifest.record(CACHE_STAGE, path, digest, sha256_bytes(output.encode('utf-8')), rules)
+    return result
+
+
+def report(results, loaded, check, elapsed):
+    print("=" * 60)
+    print("PARTIALS INCRUSTADOS EN LAS SECCIONES")
+    print("=" * 60)
+    for partial, markup, digest, applied in loaded.values():
+        print(f"📝 {partial.name}: {len(markup.encode('utf-8')):,} bytes, {applied} anotaciones i18n nuevas "
+              f"(#{partial.container})")
+    icons = {'changed': '✅', 'same': '➖', 'fresh': '➖'}
+    for r in results:
+        if not r['partials']:
+            continue
+        state = {'changed': 'incrustado', 'same': 'sin cambios', 'fresh': 'al día, desde la caché'}[r['status']]
+        if r['missing']:
+            print(f"⚠️  {r['path']}: no tiene #{', #'.join(r['missing'])}")
+        else:
+            print(f"{icons[r['status']]} {r['path']}: {', '.join(r['partials'])} ({state})")
+    with_partials = [r for r in results if r['partials'] and not r['missing']]
+    rebuilt = sum(1 for r in with_partials if r['status'] == 'changed')
+    print("=" * 60)
+    print(f"{'Modo consulta: no se ha escrito nada. ' if check else ''}"
+          f"Páginas con partials: {len(with_partials)}  reescritas: {rebuilt}  "
+          f"peticiones ahorradas por navegación: 1 por partial   ⏱️  {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Incrusta los partials en el HTML de las secciones")
+    parser.add_argument('pages', nargs='*', help="Páginas HTML (por defecto site/secciones/*.html)")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    parser.add_argument('--no-cache', action='store_true', help="Reprocesa todas las páginas")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    catalog = load_catalog()
+    if not any(catalog.values()):
+        # Sin catálogo no sale ninguna anotación y el partial se incrustaría sin traducir
+        print(f"❌ {I18N_JS} no tiene traducciones (¿ya se ejecutó build_i18n_tables.py --link, "
+              f"o --apply/--strip?): ejecuta inline_partials.py antes")
+        return 1
+    loaded = load_partials(PARTIALS, catalog)
+    manifest = Manifest()
+    users = partial_users(args.pages or section_pages(), PARTIALS)
+    results = [process_page(path, used, loaded, manifest, args.check, not args.no_cache)
+               for path, used in users.items()]
+    if not args.check:
+        manifest.prune(CACHE_STAGE)
+        manifest.save()
+    report(results, loaded, args.check, time.perf_counter() - start)
+    return 1 if any(r['missing'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Minifica el HTML de site/secciones sin tocar lo que usa i18n
+
+Uso:
+    python minify_html.py                         # todas las páginas de site/secciones
+    python minify_html.py site/secciones/info.html
+    python minify_html.py --check                 # solo informa de lo que se ahorraría
+
+Las páginas se sirven con no-store, así que cada navegación vuelve a bajar
+el HTML entero. El minificador es de una pasada y trabaja por tokens
+(html.parser alimentado por trozos):
+
+  - quita los comentarios (salvo los condicionales y los marcadores
+    nombre:start / nombre:end que usan otras etapas, p. ej. modulepreload)
+  - elimina el espacio entre etiquetas de bloque y reduce a un solo espacio
+    cualquier otra secuencia de espacios; nunca borra el último espacio junto
+    a texto (' días.' sigue empezando por espacio)
+  - deja <pre>, <textarea>, <script> y <style> tal cual
+  - quita las comillas de los valores de atributo que no las necesitan,
+    excepto en data-i18n*, que se copian literalmente
+
+Después compara el índice de elementos (etiquetas, atributos y texto
+normalizado) del original y del resultado y no escribe nada si difieren.
+"""
+
+import argparse
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+
+from build_cache import atomic_write_text
+from html_index import VOID_TAGS, build_index
+from site_graph import section_pages
+
+CHUNK_SIZE = 16 * 1024
+PRESERVE_TAGS = {'pre', 'textarea', 'script', 'style'}
+# El espacio junto a estas etiquetas no se ve: se puede quitar entero
+BLOCK_TAGS = {
+    'html', 'head', 'body', 'title', 'meta', 'link', 'script', 'style', 'base', 'noscript', 'template',
+    'div', 'p', 'section', 'article', 'aside', 'header', 'footer', 'nav', 'main', 'figure', 'figcaption',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'ul', 'ol', 'li', 'dl', 'dt', 'dd', 'blockquote',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'td', 'th', 'caption', 'colgroup', 'col',
+    # select es inline-block: el espacio a su lado se ve (option/optgroup no se pintan fuera de él)
+    'form', 'fieldset', 'legend', 'option', 'optgroup', 'dialog', 'details', 'summary', 'pre',
+    # Dentro de un <svg> el espacio entre formas no se pinta
+    'g', 'path', 'line', 'polyline', 'polygon', 'circle', 'ellipse', 'rect', 'defs', 'use', 'symbol',
+}
+KEEP_COMMENT_RE = re.compile(r'^\s*(?:\[if\b|<!\[endif|[\w-]+:(?:start|end)\s*$)')
+
+_ATTR_RE = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*("[^"]*"|'[^']*'|[^\s>]+))?''')
+_TAG_NAME_RE = re.compile(r'<([^\s/>]+)')
+_SAFE_UNQUOTED_RE = re.compile(r'''^[^\s"'=<>`]+$''')
+_WS_RE = re.compile(r'\s+')
+
+
+def minify_tag(raw, tag):
+    """Etiqueta de apertura con espacios mínimos y comillas solo donde hacen falta"""
+    name_match = _TAG_NAME_RE.match(raw)
+    body = raw[name_match.end():].rstrip()
+    body = body[:-1].rstrip()  # '>'
+    self_closing = body.endswith('/')
+    if self_closing:
+        body = body[:-1]
+    attrs = [(m.group(1), m.group(2)) for m in _ATTR_RE.finditer(body)]
+
+    out = ['<', name_match.group(1)]
+    keep_slash = self_closing and tag not in VOID_TAGS
+    for i, (name, value) in enumerate(attrs):
+        out.append(' ' + name)
+        if value is None:
+            continue
+        if (value[0] in '"\'' and not name.lower().startswith('data-i18n')
+                and _SAFE_UNQUOTED_RE.match(value[1:-1])
+                and not (keep_slash and i == len(attrs) - 1)):
+            value = value[1:-1]
+        out.append('=' + value)
+    out.append('/>' if keep_slash else '>')
+    return ''.join(out)
+
+
+class Minifier(HTMLParser):
+    """Minificador por tokens: se alimenta con feed() y va dejando la salida en ``out``"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.text = []
+        self.preserve = []
+        # ¿El último token emitido fue una etiqueta de bloque (o el inicio)?
+        self.after_block = True
+
+    # El texto se acumula hasta conocer la etiqueta siguiente
+    def flush_text(self, next_is_block):
+        if not self.text:
+            return
+        text = ''.join(self.text)
+        self.text = []
+        if self.preserve:
+            self.out.append(text)
+        elif not text.strip():
+            if not (self.after_block or next_is_block):
+                self.out.append(' ')
+        else:
+            self.out.append(_WS_RE.sub(' ', text))
+        self.after_block = False
+
+    def _tag(self, tag, text):
+        is_block = tag in BLOCK_TAGS
+        self.flush_text(is_block)
+        self.out.append(text)
+        self.after_block = is_block
+
+    def handle_starttag(self, tag, attrs):
+        raw = self.get_starttag_text()
+        self._tag(tag, raw if self.preserve else minify_tag(raw, tag))
+        if tag in PRESERVE_TAGS:
+            self.preserve.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        raw = self.get_starttag_text()
+        self._tag(tag, raw if self.preserve else minify_tag(raw, tag))
+
+    def handle_endtag(self, tag):
+        if self.preserve and self.preserve[-1] == tag:
+            self.flush_text(False)
+            self.preserve.pop()
+        self._tag(tag, f'</{tag}>')
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+    def handle_entityref(self, name):
+        self.text.append(f'&{name};')
+
+    def handle_charref(self, name):
+        self.text.append(f'&#{name};')
+
+    def handle_comment(self, data):
+        if self.preserve or KEEP_COMMENT_RE.match(data):
+            self.flush_text(False)
+            self.out.append(f'<!--{data}-->')
+            self.after_block = False
+
+    def handle_decl(self, decl):
+        self._tag('!doctype', f'<!{decl}>')
+        self.after_block = True
+
+    def handle_pi(self, data):
+        self._tag('?', f'<?{data}>')
+
+    def unknown_decl(self, data):
+        self._tag('!', f'<![{data}]>')
+
+    def result(self):
+        self.close()
+        self.flush_text(True)
+        return ''.join(self.out)
+
+
+def minify(source, chunk_size=CHUNK_SIZE):
+    minifier = Minifier()
+    for pos in range(0, len(source), chunk_size):
+        minifier.feed(source[pos:pos + chunk_size])
+    return minifier.result()
+
+
+def _structure(source):
+    """Etiquetas, atributos y texto (espacios normalizados) de cada elemento"""
+    index = build_index(source)
+    return [(el.tag, sorted(el.attrs.items()), _WS_RE.sub(' ', el.text).strip()) for el in index.elements]
+
+
+def process_page(path, check=False):
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    output = minify(source)
+    same = _structure(source) == _structure(output)
+    written = same and not check and atomic_write_text(path, output)
+    return {'path': path, 'before': len(source.encode('utf-8')), 'after': len(output.encode('utf-8')),
+            'same': same, 'written': written}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Minifica el HTML de las secciones respetando i18n")
+    parser.add_argument('pages', nargs='*', help="Páginas HTML (por defecto site/secciones/*.html)")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    parser.add_argument('--jobs', type=int, default=None, help="Número de procesos (por defecto, uno por núcleo)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    pages = args.pages or section_pages()
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(process_page, pages, [args.check] * len(pages)))
+
+    print("=" * 72)
+    print("MINIFICACIÓN DE HTML")
+    print("=" * 72)
+    print(f"{'Página':<44} {'Antes':>8} {'Después':>8} {'Ahorro':>7}")
+    for r in results:
+        icon = '❌' if not r['same'] else ('✅' if r['written'] else '➖')
+        saved = 100 * (1 - r['after'] / r['before']) if r['before'] else 0
+        print(f"{icon} {r['path']:<42} {r['before']:>8,} {r['after']:>8,} {saved:>6.1f}%")
+    broken = [r['path'] for r in results if not r['same']]
+    if broken:
+        print(f"❌ El resultado cambia la estructura (no se ha escrito): {', '.join(broken)}")
+    before = sum(r['before'] for r in results)
+    after = sum(r['after'] for r in results if r['same']) + sum(r['before'] for r in results if not r['same'])
+    print("=" * 72)
+    print(f"{'Modo consulta: no se ha escrito nada. ' if args.check else ''}"
+          f"Bytes ahorrados: {before - after:,} de {before:,}  Tiempo total: {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 1 if broken else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
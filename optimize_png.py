@@ -0,0 +1,521 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Recomprime sin pérdidas los PNG del sitio y avisa de las imágenes sin width/height
+
+Uso:
+    python optimize_png.py                     # image.png y los PNG de site/ (sin vendor)
+    python optimize_png.py site/assets/badges/*.png
+    python optimize_png.py --check             # solo informa: no reescribe nada
+    python optimize_png.py --strip-color --jobs 4 --force
+
+Para cada PNG, solo con la biblioteca estándar:
+
+  1. Lee los chunks (comprobando el CRC) y descomprime los IDAT.
+  2. Deshace los filtros de cada fila para tener los píxeles.
+  3. Vuelve a filtrar con cada estrategia (ninguno, Sub, Up, Average, Paeth,
+     la adaptativa por suma mínima de diferencias y la del archivo original)
+     y comprime con zlib a varios niveles y estrategias (TRIALS).
+  4. Se queda con el más pequeño cuyos píxeles, al decodificarlo, son
+     idénticos byte a byte a los originales.
+
+Se descartan los chunks auxiliares (tEXt, iTXt, tIME, pHYs, bKGD, sBIT...)
+salvo tRNS, que es transparencia, y los de color (sRGB, gAMA, cHRM, iCCP,
+cICP), que cambian cómo se ve la imagen; --strip-color quita también estos.
+Los entrelazados se recomprimen sin tocar sus filtros; los animados (acTL)
+se dejan tal cual.
+
+Los archivos se procesan en paralelo, uno por proceso, y solo se reescriben
+los que encogen. El manifiesto de build guarda el hash del original y del
+optimizado, y la versión optimizada se copia en .build-cache/png/: en la
+siguiente pasada (o en un checkout limpio con la caché restaurada) los que
+no han cambiado se saltan o se copian sin volver a comprimir.
+
+Además revisa los <img> de las páginas: las imágenes de más de
+LAYOUT_SHIFT_BYTES sin width y height explícitos desplazan el contenido al
+cargar (CLS); se listan con sus dimensiones reales para copiarlas.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate
+
+from build_cache import Manifest, atomic_write, fingerprint, sha256_bytes
+from build_i18n_bundles import page_paths
+from html_index import build_index
+from site_graph import SITE_DIR, is_local, url_to_path
+
+CACHE_STAGE = 'png'
+# Cambiarlo obliga a reoptimizar todos los PNG
+OPTIMIZER_VERSION = 1
+ROOT_IMAGES = ('image.png',)
+SKIP_DIRS = {'vendor', 'i18n', 'localized'}
+# Copias de los PNG optimizados, para restaurarlas sin recomprimir
+STORE_DIR = os.path.join('.build-cache', 'png')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+KEEP_ANCILLARY = {'tRNS'}
+COLOR_CHUNKS = {'sRGB', 'gAMA', 'cHRM', 'iCCP', 'cICP'}
+STRATEGIES = {
+    'default': zlib.Z_DEFAULT_STRATEGY,
+    'filtered': zlib.Z_FILTERED,
+    'rle': zlib.Z_RLE,
+}
+# (nivel, estrategia) que se prueban con cada filtrado; Z_RLE no depende del nivel
+TRIALS = ((9, 'default'), (9, 'filtered'), (6, 'default'), (6, 'filtered'), (9, 'rle'))
+# Bytes de píxeles por bloque al filtrar (acota la memoria de los enteros grandes)
+BAND_BYTES = 256 * 1024
+# Canales por tipo de color (0 gris, 2 RGB, 3 paleta, 4 gris+alfa, 6 RGBA)
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.gif', '.avif')
+LAYOUT_SHIFT_BYTES = 10 * 1024
+
+Chunk = namedtuple('Chunk', 'type data')
+Header = namedtuple('Header', 'width height bit_depth color_type compression filter_method interlace')
+
+
+class PNGError(ValueError):
+    pass
+
+
+def read_chunks(data):
+    """[Chunk, ...] de un PNG; comprueba la firma y el CRC de cada chunk"""
+    if not data.startswith(PNG_SIGNATURE):
+        raise PNGError("no es un PNG (firma incorrecta)")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        if pos + 12 > len(data):
+            raise PNGError("chunk truncado")
+        length, kind = struct.unpack('>I4s', data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        crc, = struct.unpack('>I', data[pos + 8 + length:pos + 12 + length])
+        if len(body) != length or zlib.crc32(kind + body) != crc:
+            raise PNGError(f"CRC incorrecto en {kind.decode('latin-1')}")
+        chunks.append(Chunk(kind.decode('latin-1'), body))
+        pos += 12 + length
+        if kind == b'IEND':
+            break
+    if not chunks or chunks[0].type != 'IHDR' or chunks[-1].type != 'IEND':
+        raise PNGError("falta IHDR o IEND")
+    return chunks
+
+
+def write_chunks(chunks):
+    out = [PNG_SIGNATURE]
+    for chunk in chunks:
+        kind = chunk.type.encode('latin-1')
+        out.append(struct.pack('>I4s', len(chunk.data), kind) + chunk.data
+                   + struct.pack('>I', zlib.crc32(kind + chunk.data)))
+    return b''.join(out)
+
+
+def parse_header(chunk):
+    header = Header(*struct.unpack('>IIBBBBB', chunk.data))
+    if header.color_type not in CHANNELS or header.compression or header.filter_method:
+        raise PNGError(f"IHDR no soportado: {header}")
+    return header
+
+
+def geometry(header):
+    """(bytes por píxel para los filtros, bytes por fila sin el byte de filtro)"""
+    bits = CHANNELS[header.color_type] * header.bit_depth
+    return max(1, bits // 8), (header.width * bits + 7) // 8
+
+
+# Los filtros se calculan sobre enteros grandes con un byte en cada carril de
+# 16 bits (SWAR): una resta o un AND recorre miles de píxeles en C en lugar
+# de un bucle de Python por byte. Con 16 bits caben a+b y 2c (≤ 510) y el
+# bit alto de cada carril sirve de signo para comparar.
+def _lanes(count, value):
+    return int.from_bytes(value.to_bytes(2, 'big') * count, 'big')
+
+
+def _spread(data):
+    """bytes → entero con un byte por carril de 16 bits"""
+    wide = bytearray(2 * len(data))
+    wide[1::2] = data
+    return int.from_bytes(wide, 'big')
+
+
+def _narrow(value, count):
+    return value.to_bytes(2 * count, 'big')[1::2]
+
+
+class _Lanes:
+    """Constantes por carril para bloques de ``count`` bytes"""
+
+    def __init__(self, count):
+        self.count = count
+        self.sign = _lanes(count, 0x8000)
+        self.low15 = _lanes(count, 0x7FFF)
+        self.full = _lanes(count, 0xFFFF)
+        self.byte = _lanes(count, 0x00FF)
+        self.carry = _lanes(count, 0x0100)
+
+    def ge(self, x, y):
+        """Máscara 0xFFFF en los carriles donde x >= y"""
+        return ((((x | self.sign) - y) & self.sign) >> 15) * 0xFFFF
+
+    def absdiff(self, x, y):
+        mask = self.ge(x, y)
+        return ((mask & ((x | self.sign) - y)) | ((mask ^ self.full) & ((y | self.sign) - x))) & self.low15
+
+    def paeth(self, a, b, c):
+        pa, pb, pc = self.absdiff(b, c), self.absdiff(a, c), self.absdiff(a + b, c + c)
+        first = self.ge(pb, pa) & self.ge(pc, pa)
+        second = self.ge(pc, pb)
+        return (first & a) | ((first ^ self.full) & ((second & b) | ((second ^ self.full) & c)))
+
+
+@lru_cache(maxsize=8)
+def lanes_for(count):
+    return _Lanes(count)
+
+
+def predictor(kind, lanes, a, b, c):
+    """Predicción del filtro ``kind`` (1-4) a partir de izquierda, arriba y arriba-izquierda"""
+    if kind == 1:
+        return a
+    if kind == 2:
+        return b
+    if kind == 3:
+        return ((a + b) >> 1) & lanes.byte
+    return lanes.paeth(a, b, c)
+
+
+def _shifted(lines, bpp):
+    """Cada fila desplazada ``bpp`` bytes a la derecha (el vecino de la izquierda)"""
+    return b''.join(bytes(bpp) + line[:-bpp] for line in lines)
+
+
+def filter_rows(kind, rows, bpp, stride):
+    """Filas filtradas con el filtro ``kind`` (0-4), sin el byte de tipo"""
+    if kind == 0:
+        return list(rows)
+    band = max(1, BAND_BYTES // max(1, stride))
+    out = []
+    for y in range(0, len(rows), band):
+        lines = rows[y:y + band]
+        prevs = [rows[y - 1] if y else bytes(stride)] + lines[:-1]
+        lanes = lanes_for(len(lines) * stride)
+        pred = predictor(kind, lanes, _spread(_shifted(lines, bpp)), _spread(b''.join(prevs)),
+                         _spread(_shifted(prevs, bpp)) if kind == 4 else 0)
+        flat = _narrow(((_spread(b''.join(lines)) | lanes.carry) - pred) & lanes.byte, lanes.count)
+        out.extend(flat[i:i + stride] for i in range(0, len(flat), stride))
+    return out
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def unfilter(raw, header):
+    """Datos de IDAT descomprimidos → filas de píxeles"""
+    bpp, stride = geometry(header)
+    if len(raw) != header.height * (stride + 1):
+        raise PNGError("tamaño de IDAT inesperado")
+    lanes = lanes_for(stride)
+    rows = []
+    prev = bytes(stride)
+    for y in range(header.height):
+        start = y * (stride + 1)
+        kind = raw[start]
+        line = raw[start + 1:start + 1 + stride]
+        if kind == 1:
+            # Cada canal es una suma acumulada módulo 256
+            line = bytearray(line)
+            for channel in range(bpp):
+                line[channel::bpp] = bytes(accumulate(line[channel::bpp], lambda x, v: (x + v) & 0xFF))
+        elif kind == 2:
+            line = _narrow((_spread(line) + _spread(prev)) & lanes.byte, stride)
+        elif kind == 3:
+            line = bytearray(line)
+            for i in range(stride):
+                left = line[i - bpp] if i >= bpp else 0
+                line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            line = bytearray(line)
+            for i in range(stride):
+                if i >= bpp:
+                    line[i] = (line[i] + _paeth(line[i - bpp], prev[i], prev[i - bpp])) & 0xFF
+                else:
+                    line[i] = (line[i] + prev[i]) & 0xFF
+        elif kind:
+            raise PNGError(f"filtro desconocido {kind} en la fila {y}")
+        rows.append(bytes(line))
+        prev = rows[-1]
+    return rows
+
+
+# Heurística de libpng: suma de los bytes filtrados vistos como enteros con signo
+_COST = bytes(min(v, 256 - v) for v in range(256))
+
+
+def filtered_streams(rows, raw, header):
+    """{estrategia de filtrado: datos listos para comprimir}"""
+    bpp, stride = geometry(header)
+    fixed = {'none': 0, 'sub': 1, 'up': 2, 'average': 3, 'paeth': 4}
+    if header.bit_depth < 8 or header.color_type == 3:
+        # Con paleta o menos de 8 bits los filtros casi nunca ayudan (recomendación de la especificación)
+        fixed = {'none': 0}
+    per_kind = {kind: filter_rows(kind, rows, bpp, stride) for kind in fixed.values()}
+    streams = {name: b''.join(bytes([kind]) + f for f in per_kind[kind]) for name, kind in fixed.items()}
+    if len(per_kind) > 1:
+        adaptive = []
+        for y in range(len(rows)):
+            kind = min(per_kind, key=lambda k: sum(per_kind[k][y].translate(_COST)))
+            adaptive.append(bytes([kind]) + per_kind[kind][y])
+        streams['adaptive'] = b''.join(adaptive)
+    streams['original'] = raw
+    return streams
+
+
+def deflate(data, level, strategy):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def keep_chunk(chunk, strip_color):
+    if chunk.type[0].isupper():
+        return chunk.type != 'IDAT'
+    return chunk.type in KEEP_ANCILLARY or (chunk.type in COLOR_CHUNKS and not strip_color)
+
+
+def optimize(data, strip_color=False):
+    """
+    PNG más pequeño con los mismos píxeles.
+
+    Devuelve (bytes, descripción del ganador o None si se deja igual, [chunks descartados]).
+    """
+    chunks = read_chunks(data)
+    if any(c.type == 'acTL' for c in chunks):
+        # APNG: los fcTL/fdAT dependen del orden de los chunks; se deja tal cual
+        return data, None, []
+    header = parse_header(chunks[0])
+    raw = zlib.decompress(b''.join(c.data for c in chunks if c.type == 'IDAT'))
+    if header.interlace:
+        # Entrelazado (Adam7): se conserva el flujo filtrado y solo se recomprime
+        streams, expected = {'original': raw}, raw
+    else:
+        expected = unfilter(raw, header)
+        streams = filtered_streams(expected, raw, header)
+
+    candidates = []
+    tried = []
+    for name, stream in streams.items():
+        if stream in tried:
+            continue  # p. ej. 'original' igual a 'up': mismo resultado
+        tried.append(stream)
+        for level, strategy in TRIALS:
+            idat = deflate(stream, level, STRATEGIES[strategy])
+            candidates.append((len(idat), name, level, strategy, idat))
+    candidates.sort(key=lambda c: c[:4])
+
+    first_idat = next(i for i, c in enumerate(chunks) if c.type == 'IDAT')
+    head = [c for c in chunks[:first_idat] if keep_chunk(c, strip_color)]
+    tail = [c for c in chunks[first_idat:] if keep_chunk(c, strip_color)]
+    dropped = list(dict.fromkeys(c.type for c in chunks if c.type != 'IDAT' and not keep_chunk(c, strip_color)))
+    for size, name, level, strategy, idat in candidates:
+        out = write_chunks(head + [Chunk('IDAT', idat)] + tail)
+        if same_pixels(out, expected, header):
+            label = strategy if strategy == 'rle' else f'{level}/{strategy}'
+            return out, f'{name}, zlib {label}', dropped
+    return data, None, []
+
+
+def same_pixels(candidate, expected, header):
+    """¿Decodifica ``candidate`` a los mismos píxeles (al mismo flujo filtrado si es bytes)?"""
+    chunks = read_chunks(candidate)
+    if parse_header(chunks[0]) != header:
+        return False
+    raw = zlib.decompress(b''.join(c.data for c in chunks if c.type == 'IDAT'))
+    if isinstance(expected, bytes):
+        return raw == expected
+    return unfilter(raw, header) == expected
+
+
+def stored_path(path):
+    """Copia del PNG optimizado en la caché de build"""
+    return os.path.join(STORE_DIR, os.path.normpath(path))
+
+
+def optimize_file(path, strip_color, write):
+    """Optimiza un archivo (se ejecuta en el pool)"""
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    digest = sha256_bytes(data)
+    result = {'path': path, 'input': digest, 'output': digest, 'before': len(data), 'after': len(data),
+              'winner': None, 'dropped': [], 'error': None, 'cached': False}
+    try:
+        out, winner, dropped = optimize(data, strip_color)
+    except (PNGError, zlib.error) as e:
+        result['error'] = str(e)
+        return result
+    if len(out) < len(data):
+        result.update(output=sha256_bytes(out), after=len(out), winner=winner, dropped=dropped)
+        if write:
+            atomic_write(path, out)
+            atomic_write(stored_path(path), out)
+    result['ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def restore(path, entry, write):
+    """
+    Resultado de la caché para un PNG que sigue igual que en la última pasada.
+
+    Si el archivo es el original (p. ej. recién clonado) se copia la versión
+    optimizada guardada; devuelve None si no está o no coincide su hash.
+    """
+    with open(path, 'rb') as f:
+        digest = sha256_bytes(f.read())
+    if digest != entry['output']:
+        try:
+            with open(stored_path(path), 'rb') as f:
+                out = f.read()
+        except FileNotFoundError:
+            return None
+        if sha256_bytes(out) != entry['output']:
+            return None
+        if write:
+            atomic_write(path, out)
+    return {'path': path, 'before': entry['before'], 'after': entry['after'], 'winner': entry['winner'],
+            'dropped': entry['dropped'], 'error': None, 'cached': True}
+
+
+def png_targets(root=SITE_DIR):
+    paths = [path for path in ROOT_IMAGES if os.path.isfile(path)]
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        paths.extend(os.path.join(dirpath, name) for name in sorted(filenames) if name.lower().endswith('.png'))
+    return paths
+
+
+def run(paths, jobs=None, strip_color=False, write=True, force=False):
+    """{ruta: resultado} optimizando solo lo que cambió desde la última pasada"""
+    rules = [OPTIMIZER_VERSION, fingerprint(TRIALS), strip_color]
+    manifest = Manifest()
+    results, pending = {}, []
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest = sha256_bytes(f.read())
+        cached = None
+        if not force and manifest.is_fresh(CACHE_STAGE, path, digest, rules):
+            cached = restore(path, manifest.entry(CACHE_STAGE, path), write)
+        if cached:
+            results[path] = cached
+        else:
+            pending.append(path)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(optimize_file, path, strip_color, write) for path in pending]
+            for future in futures:
+                r = future.result()
+                results[r['path']] = r
+                if write and not r['error']:
+                    manifest.record(CACHE_STAGE, r['path'], r['input'], r['output'], rules,
+                                    before=r['before'], after=r['after'], winner=r['winner'], dropped=r['dropped'])
+    if write:
+        manifest.prune(CACHE_STAGE)
+        manifest.save()
+    return [results[path] for path in paths]
+
+
+def image_size(path):
+    """(ancho, alto) de un PNG leyendo su IHDR, o None"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(24)
+    except OSError:
+        return None
+    if head[:8] != PNG_SIGNATURE or head[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', head[16:24])
+
+
+def layout_shift_images(pages, min_bytes=LAYOUT_SHIFT_BYTES, site_dir=SITE_DIR):
+    """[(página, línea, url, bytes, (ancho, alto) | None)] de <img> grandes sin width/height"""
+    found = []
+    for page in pages:
+        with open(page, 'r', encoding='utf-8') as f:
+            index = build_index(f.read())
+        for el in index.by_tag('img'):
+            src = el.attrs.get('src') or ''
+            if not is_local(src) or 'width' in el.attrs and 'height' in el.attrs:
+                continue
+            path = url_to_path(src, page, site_dir)
+            if not path or not path.lower().endswith(IMAGE_EXTENSIONS) or not os.path.isfile(path):
+                continue
+            size = os.path.getsize(path)
+            if size >= min_bytes:
+                found.append((page, index.position(el.start)[0], src, size, image_size(path)))
+    return found
+
+
+def report(results, shifts, write, elapsed):
+    print("=" * 72)
+    print("RECOMPRESIÓN DE PNG")
+    print("=" * 72)
+    print(f"{'Archivo':<44} {'Antes':>9} {'Después':>9} {'Ahorro':>7}")
+    for r in results:
+        if r['error']:
+            print(f"❌ {r['path']}: {r['error']}")
+            continue
+        saved = 100 * (r['before'] - r['after']) / r['before'] if r['before'] else 0
+        icon = '✅' if r['after'] < r['before'] else '➖'
+        print(f"{icon} {r['path']:<41} {r['before']:>9,} {r['after']:>9,} {saved:>6.1f}%"
+              f"{'  (caché)' if r['cached'] else ''}")
+        if r['winner']:
+            extra = f"; fuera: {', '.join(r['dropped'])}" if r['dropped'] else ''
+            print(f"     {r['winner']}{extra}")
+    before = sum(r['before'] for r in results)
+    after = sum(r['after'] for r in results)
+    print("=" * 72)
+    print("IMÁGENES SIN width/height (desplazan el contenido al cargar)")
+    print("=" * 72)
+    if not shifts:
+        print("✅ Todas las imágenes grandes tienen width y height")
+    for page, line, src, size, dims in shifts:
+        hint = f'  → width="{dims[0]}" height="{dims[1]}"' if dims else ''
+        print(f"⚠️  {page}:{line} {src} ({size:,} bytes){hint}")
+    print("=" * 72)
+    verb = 'ahorrados' if write else 'que se ahorrarían'
+    print(f"{'Modo consulta: no se ha escrito nada. ' if not write else ''}"
+          f"PNG: {len(results)}  bytes {verb}: {before - after:,} de {before:,}   "
+          f"⏱️  {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recomprime sin pérdidas los PNG del sitio")
+    parser.add_argument('paths', nargs='*', help="PNG a optimizar (por defecto image.png y los de site/)")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    parser.add_argument('--strip-color', action='store_true', help="Quita también sRGB, gAMA, cHRM, iCCP y cICP")
+    parser.add_argument('--jobs', type=int, default=None, help="Número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--force', action='store_true', help="Reprocesa aunque el manifiesto diga que no hay cambios")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run(args.paths or png_targets(), args.jobs, args.strip_color, not args.check, args.force)
+    pages = page_paths() + [os.path.join(SITE_DIR, 'partials', name)
+                            for name in sorted(os.listdir(os.path.join(SITE_DIR, 'partials')))
+                            if name.endswith('.html')]
+    report(results, layout_shift_images(pages), not args.check, time.perf_counter() - start)
+    return 1 if any(r['error'] for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
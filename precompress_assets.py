@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Genera variantes precomprimidas (.gz y, si hay módulo brotli, .br) de los assets de texto
+
+Uso:
+    python precompress_assets.py                    # site/ → .build-cache/precompressed/
+    python precompress_assets.py --in-place         # x.js.gz junto a x.js
+    python precompress_assets.py --jobs 4 --force
+
+gzip a nivel 9 (sin mtime, salida reproducible) y brotli a calidad 11 con el
+modo adecuado a cada tipo. Se comprime en paralelo y se saltan los archivos
+cuyo SHA-256 coincide con el del manifiesto de build. Al final imprime, por
+página, los bytes que descarga sin comprimir, con gzip y con brotli.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import Manifest, atomic_write, sha256_bytes
+from site_graph import SITE_DIR, page_assets
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo se generan los .gz
+    brotli = None
+
+OUTPUT_DIR = os.path.join('.build-cache', 'precompressed')
+CACHE_STAGE = 'precompress'
+SKIP_DIRS = {'i18n', 'localized'}
+TEXT_EXTENSIONS = {'.html', '.js', '.mjs', '.css', '.svg', '.json', '.txt', '.xml', '.ttf', '.ico'}
+# Por debajo de este tamaño la cabecera de compresión no compensa
+MIN_BYTES = 256
+
+
+SUFFIX = {'gzip': '.gz', 'br': '.br'}
+
+
+def encodings():
+    return ['gzip', 'br'] if brotli else ['gzip']
+
+
+def variant_path(path, encoding, output_dir=OUTPUT_DIR, site_dir=SITE_DIR):
+    """Ruta de la variante comprimida (junto al archivo si output_dir es None)"""
+    if output_dir is None:
+        return path + SUFFIX[encoding]
+    return os.path.join(output_dir, os.path.relpath(path, site_dir)) + SUFFIX[encoding]
+
+
+def compress(data, encoding, path=''):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    mode = brotli.MODE_FONT if path.endswith('.ttf') else brotli.MODE_TEXT
+    return brotli.compress(data, quality=11, mode=mode)
+
+
+def compress_file(path, encs, output_dir):
+    """Comprime un archivo con cada codificación (se ejecuta en el pool)"""
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    sizes = {'identity': len(data)}
+    for encoding in encs:
+        out = compress(data, encoding, path)
+        sizes[encoding] = len(out)
+        atomic_write(variant_path(path, encoding, output_dir), out)
+    return {'path': path, 'input': sha256_bytes(data), 'sizes': sizes,
+            'cached': False, 'ms': (time.perf_counter() - start) * 1000}
+
+
+def text_assets(root=SITE_DIR):
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if os.path.splitext(name)[1] in TEXT_EXTENSIONS and os.path.getsize(path) >= MIN_BYTES:
+                yield path
+
+
+def remove_stale(sources, output_dir):
+    """Borra las variantes de la carpeta de salida cuyo original ya no existe"""
+    expected = {variant_path(path, e, output_dir) for path in sources for e in SUFFIX}
+    removed = 0
+    for dirpath, _, filenames in os.walk(output_dir):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            if path not in expected:
+                os.remove(path)
+                removed += 1
+    return removed
+
+
+def run(jobs=None, force=False, output_dir=OUTPUT_DIR):
+    """Comprime lo que cambió y devuelve {ruta: resultado con los bytes por codificación}"""
+    encs = encodings()
+    rules = [encs, output_dir]
+    manifest = Manifest()
+    results = {}
+    pending = []
+    sources = list(text_assets())
+    for path in sources:
+        with open(path, 'rb') as f:
+            digest = sha256_bytes(f.read())
+        outputs_exist = all(os.path.exists(variant_path(path, e, output_dir)) for e in encs)
+        if not force and outputs_exist and manifest.is_fresh(CACHE_STAGE, path, digest, rules):
+            results[path] = {'path': path, 'sizes': manifest.entry(CACHE_STAGE, path)['sizes'], 'cached': True}
+        else:
+            pending.append(path)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(compress_file, path, encs, output_dir) for path in pending]
+            for future in futures:
+                r = future.result()
+                results[r['path']] = r
+                manifest.record(CACHE_STAGE, r['path'], r['input'], r['input'], rules, sizes=r['sizes'])
+    if output_dir is not None and os.path.isdir(output_dir):
+        remove_stale(sources, output_dir)
+    manifest.prune(CACHE_STAGE)
+    manifest.save()
+    return results
+
+
+def page_table(results, pages):
+    """Por página: bytes sin comprimir y transferidos con cada codificación"""
+    rows = []
+    for page in pages:
+        totals = {}
+        for path, _, _ in page_assets(page):
+            sizes = results.get(path, {}).get('sizes')
+            raw = os.path.getsize(path)
+            totals['identity'] = totals.get('identity', 0) + raw
+            for encoding in encodings():
+                # Binarios ya comprimidos (png, woff2) viajan tal cual
+                totals[encoding] = totals.get(encoding, 0) + (sizes[encoding] if sizes else raw)
+        rows.append((page, totals))
+    return rows
+
+
+def report(results, rows, elapsed):
+    encs = encodings()
+    compressed = [r for r in results.values() if not r['cached']]
+    print("=" * 72)
+    print("PRECOMPRESIÓN DE ASSETS")
+    print("=" * 72)
+    if not brotli:
+        print("ℹ️  Módulo brotli no disponible: solo se generan variantes .gz")
+    header = f"{'Página':<38} {'Sin comprimir':>13}" + ''.join(f" {e:>10}" for e in encs) + f" {'Ahorro':>7}"
+    print(header)
+    for page, totals in rows:
+        best = min(totals[e] for e in encs)
+        saved = 100 * (1 - best / totals['identity']) if totals['identity'] else 0
+        print(f"{os.path.relpath(page, SITE_DIR):<38} {totals['identity']:>13,}"
+              + ''.join(f" {totals[e]:>10,}" for e in encs) + f" {saved:>6.1f}%")
+    print("=" * 72)
+    print(f"Archivos: {len(results)}  comprimidos ahora: {len(compressed)}  "
+          f"en caché: {len(results) - len(compressed)}  Tiempo total: {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera variantes .gz/.br de los assets de texto")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Carpeta de salida (por defecto .build-cache/precompressed)")
+    parser.add_argument('--in-place', action='store_true', help="Escribe x.gz / x.br junto a cada archivo")
+    parser.add_argument('--jobs', type=int, default=None, help="Número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--force', action='store_true', help="Recomprime aunque el manifiesto diga que no hay cambios")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    output_dir = None if args.in_place else args.output
+    results = run(args.jobs, args.force, output_dir)
+    pages = sorted(os.path.join(SITE_DIR, 'secciones', name)
+                   for name in os.listdir(os.path.join(SITE_DIR, 'secciones')) if name.endswith('.html'))
+    report(results, page_table(results, [os.path.join(SITE_DIR, 'index.html')] + pages),
+           time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
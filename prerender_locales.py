@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pre-renderiza las páginas de site/secciones ya traducidas a cada idioma
+
+Uso:
+    python prerender_locales.py                     # todas las páginas, todos los idiomas
+    python prerender_locales.py --locales en --jobs 4
+    python prerender_locales.py --force             # ignora la caché
+
+Hace en build lo mismo que translatePage() en el navegador: sustituye el
+contenido de [data-i18n] y los atributos placeholder/title de
+[data-i18n-placeholder] y [data-i18n-title]. Los atributos data-i18n se
+conservan para que el cambio de idioma en caliente siga funcionando, y
+<html> recibe lang y data-i18n-prerendered para que initI18n() no repita el
+trabajo si el idioma coincide.
+
+La salida sigue la estructura de Firebase Hosting i18n
+(site/localized/<locale>_ALL/secciones/<página>.html): con
+"i18n": {"root": "/localized"} en firebase.json, Hosting sirve cada variante
+en la misma URL que la original según la cookie firebase-language-override o
+Accept-Language.
+
+En deploy es la última etapa que toca el HTML (después de minify_html.py),
+para que las variantes lleven las mismas ?v=, modulepreload y CSS crítico
+que las páginas originales. Para entonces i18n.js ya está enlazado a
+i18n-tables.js (--link) y su literal está vacío, así que el catálogo se lee
+de las tablas.
+"""
+
+import argparse
+import glob
+import html
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import Manifest, atomic_write_text, fingerprint, sha256_bytes
+from build_i18n_tables import OUTPUT_PATH as TABLES_PATH, load_tables
+from html_index import build_index
+from i18n_catalog import load_catalog
+
+SITE_DIR = 'site'
+PAGES_GLOB = os.path.join(SITE_DIR, 'secciones', '*.html')
+OUTPUT_DIR = os.path.join(SITE_DIR, 'localized')
+CACHE_STAGE = 'prerender'
+
+# Atributo data-i18n-* → atributo que rellena translatePage()
+ATTR_SOURCES = {
+    'data-i18n-placeholder': 'placeholder',
+    'data-i18n-title': 'title',
+}
+
+_TAG_END_RE = re.compile(r'\s*/?>$')
+
+
+def output_path(path, locale, output_dir=OUTPUT_DIR, site_dir=SITE_DIR):
+    rel = os.path.relpath(path, site_dir)
+    return os.path.join(output_dir, f'{locale}_ALL', rel)
+
+
+def _attr_re(name):
+    return re.compile(r'(\s' + re.escape(name) + r')(\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>]+))?', re.I)
+
+
+_ATTR_RES = {name: _attr_re(name) for name in ['lang', 'data-i18n-prerendered', *ATTR_SOURCES.values()]}
+
+
+def _set_attrs(tag_text, values):
+    """Devuelve la etiqueta de apertura con ``values`` {atributo: valor} aplicados"""
+    for name, value in values.items():
+        quoted = '="' + html.escape(value, quote=True) + '"'
+        pattern = _ATTR_RES[name]
+        if pattern.search(tag_text):
+            tag_text = pattern.sub(lambda m: m.group(1) + quoted, tag_text, count=1)
+        else:
+            end = _TAG_END_RE.search(tag_text).start()
+            tag_text = f'{tag_text[:end]} {name}{quoted}{tag_text[end:]}'
+    return tag_text
+
+
+def render(source, locale, entries):
+    """
+    Traduce ``source`` al idioma ``locale`` con el catálogo plano ``entries``.
+
+    Devuelve (html, nº de sustituciones, [claves sin traducción]).
+    """
+    index = build_index(source)
+    edits = []
+    missing = []
+    replaced = 0
+    # Fin del último elemento cuyo contenido se sustituyó: lo anidado desaparece con él
+    covered_until = -1
+
+    for el in index.elements:
+        if el.start < covered_until:
+            continue
+        attrs = {}
+        for data_attr, target in ATTR_SOURCES.items():
+            key = el.attrs.get(data_attr)
+            if not key:
+                continue
+            value = entries.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                attrs[target] = value
+                replaced += 1
+        if el.tag == 'html':
+            attrs['lang'] = locale
+            attrs['data-i18n-prerendered'] = locale
+        if attrs:
+            edits.append((el.start, el.start_end, _set_attrs(source[el.start:el.start_end], attrs)))
+
+        key = el.attrs.get('data-i18n')
+        if key:
+            value = entries.get(key)
+            if value is None:
+                missing.append(key)
+            else:
+                edits.append((el.start_end, el.end, value))
+                covered_until = el.end
+                replaced += 1
+
+    out = []
+    pos = 0
+    for start, end, text in sorted(edits):
+        out.append(source[pos:start])
+        out.append(text)
+        pos = end
+    out.append(source[pos:])
+    return ''.join(out), replaced, missing
+
+
+def render_file(path, locale, entries, target):
+    """Pre-renderiza una página en un idioma (se ejecuta en el pool)"""
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        data = f.read()
+    content, replaced, missing = render(data.decode('utf-8'), locale, entries)
+    written = atomic_write_text(target, content)
+    return {
+        'path': path,
+        'locale': locale,
+        'target': target,
+        'input': sha256_bytes(data),
+        'output': sha256_bytes(content.encode('utf-8')),
+        'replaced': replaced,
+        'missing': missing,
+        'written': written,
+        'cached': False,
+        'bytes': len(content.encode('utf-8')),
+        'ms': (time.perf_counter() - start) * 1000,
+    }
+
+
+def run(pages, locales=None, jobs=None, force=False, output_dir=OUTPUT_DIR):
+    """Pre-renderiza ``pages`` × ``locales`` en paralelo, saltando lo que no cambió"""
+    catalog = load_catalog()
+    if not any(catalog.values()) and os.path.exists(TABLES_PATH):
+        # En deploy va después de build_i18n_tables.py --link: el catálogo está en las tablas
+        catalog = load_tables()
+    if not any(catalog.values()):
+        raise ValueError("i18n.js no tiene traducciones y no hay tablas generadas")
+    locales = locales or sorted(catalog)
+    unknown = set(locales) - set(catalog)
+    if unknown:
+        raise ValueError(f"Idiomas sin catálogo: {', '.join(sorted(unknown))}")
+    catalog_fp = {locale: fingerprint(catalog[locale]) for locale in locales}
+
+    manifest = Manifest()
+    results = {}
+    pending = []
+    for path in pages:
+        with open(path, 'rb') as f:
+            digest = sha256_bytes(f.read())
+        for locale in locales:
+            target = output_path(path, locale, output_dir)
+            entry = manifest.entry(CACHE_STAGE, target)
+            if (not force and os.path.exists(target) and entry
+                    and entry.get('input') == digest and entry.get('rules') == catalog_fp[locale]):
+                results[(path, locale)] = {'path': path, 'locale': locale, 'target': target,
+                                           'cached': True, 'missing': entry.get('missing', [])}
+            else:
+                pending.append((path, locale, target))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(render_file, path, locale, catalog[locale], target)
+                       for path, locale, target in pending]
+            for future in futures:
+                r = future.result()
+                results[(r['path'], r['locale'])] = r
+                manifest.record(CACHE_STAGE, r['target'], r['input'], r['output'],
+                                catalog_fp[r['locale']], missing=sorted(set(r['missing'])))
+
+    manifest.prune(CACHE_STAGE)
+    manifest.save()
+    return [results[(path, locale)] for path in pages for locale in locales]
+
+
+def print_summary(results, elapsed):
+    print("=" * 60)
+    print("PRE-RENDER POR IDIOMA")
+    print("=" * 60)
+    for r in results:
+        if r['cached']:
+            print(f"💾 {r['target']}  sin cambios (caché)")
+            continue
+        icon = '✅' if r['written'] else '➖'
+        print(f"{icon} {r['target']}  {r['replaced']} textos  {r['bytes']} bytes  {r['ms']:.1f} ms")
+    missing = {(r['locale'], key) for r in results for key in r['missing']}
+    if missing:
+        print(f"⚠️  Claves sin traducción (se deja el texto original): {len(missing)}")
+        for locale, key in sorted(missing):
+            print(f"   - [{locale}] {key}")
+    print("=" * 60)
+    cached = sum(1 for r in results if r['cached'])
+    print(f"Variantes: {len(results)}  en caché: {cached}  Tiempo total: {elapsed * 1000:.1f} ms")
+    print("=" * 60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera las páginas de secciones ya traducidas")
+    parser.add_argument('pages', nargs='*', help="Páginas a pre-renderizar (por defecto site/secciones/*.html)")
+    parser.add_argument('--locales', nargs='+', help="Idiomas (por defecto, todos los del catálogo)")
+    parser.add_argument('--output', default=OUTPUT_DIR, help="Carpeta de salida (por defecto site/localized)")
+    parser.add_argument('--jobs', type=int, default=None, help="Número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--force', action='store_true', help="Regenera aunque el manifiesto diga que no hay cambios")
+    args = parser.parse_args(argv)
+
+    pages = args.pages or sorted(glob.glob(PAGES_GLOB))
+    start = time.perf_counter()
+    try:
+        results = run(pages, args.locales, args.jobs, args.force, args.output)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    print_summary(results, time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Elimina del catálogo de i18n.js las claves que no usa ninguna página
+
+Uso:
+    python prune_i18n_keys.py                  # informe: claves sin uso y bytes por idioma
+    python prune_i18n_keys.py --list           # además lista las claves sin uso por sección
+    python prune_i18n_keys.py --keep badges.   # conserva también un prefijo dinámico
+    python prune_i18n_keys.py --apply          # reescribe i18n.js con el catálogo podado (solo en deploy)
+
+Índice de uso: para cada página HTML del sitio, ella misma, los scripts y
+módulos que carga (también los import() dinámicos) y los partials que esos
+módulos descargan. De cada archivo se recogen:
+
+  - data-i18n, data-i18n-placeholder, data-i18n-title... (HTML y plantillas en JS)
+  - t('clave') y literales con forma de clave del catálogo (t(opt.key), mapas de claves)
+  - getSection('sección') y t(`prefijo.${...}`): se conserva el prefijo entero
+
+A eso se suman DYNAMIC_PREFIXES de check_i18n_keys.py, los --keep y las
+claves que inyectan las tablas de reglas de los scripts de traducción.
+Los JS que no carga ninguna página (p. ej. plans-old.js) no cuentan: se
+listan aparte en el informe.
+
+El índice es incremental: lo extraído de cada archivo se guarda en el
+manifiesto de build por SHA-256, así que en una segunda pasada solo se
+vuelven a leer los archivos que han cambiado.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from build_cache import Manifest, atomic_write_text, sha256_bytes
+from build_i18n_bundles import nest, page_paths
+from check_i18n_keys import (ATTR_KEY_RE, DYNAMIC_PREFIXES, KEY_LITERAL_RE, SECTION_RE, T_CALL_RE,
+                             rule_table_uses)
+from html_index import build_index
+from i18n_catalog import I18N_JS, all_keys, load_catalog, translations_span
+from site_graph import SITE_DIR, js_imports, js_partials, page_refs
+
+STAGE = 'i18n-usage'
+# Cambiarlo invalida el índice (p. ej. si cambian las expresiones de abajo)
+INDEX_VERSION = 1
+SCRIPT_KINDS = ('module', 'script')
+
+T_TEMPLATE_RE = re.compile(r'''(?<![\w$.])t\(\s*`([\w.]*\.)\$\{''')
+_IDENT_RE = re.compile(r'^[A-Za-z_$][\w$]*$')
+
+
+def file_usage(path, source):
+    """{'keys', 'literals', 'prefixes'} referenciados en un archivo (listas ordenadas)"""
+    keys = {m.group(1) for m in ATTR_KEY_RE.finditer(source)}
+    literals = set()
+    prefixes = set()
+    if path.endswith(('.js', '.mjs')):
+        keys.update(m.group(2) for m in T_CALL_RE.finditer(source))
+        literals.update(m.group(2) for m in KEY_LITERAL_RE.finditer(source))
+        prefixes.update(m.group(2) + '.' for m in SECTION_RE.finditer(source))
+        prefixes.update(m.group(1) for m in T_TEMPLATE_RE.finditer(source))
+    return {'keys': sorted(keys), 'literals': sorted(literals), 'prefixes': sorted(prefixes)}
+
+
+def file_deps(path, source, site_dir=SITE_DIR):
+    """Lo que carga un archivo: scripts y módulos de un HTML; imports, import() y partials de un JS"""
+    if path.endswith('.html'):
+        refs = page_refs(path, site_dir, build_index(source))
+        return [ref.path for ref in refs if ref.kind in SCRIPT_KINDS and ref.path]
+    deps = [imp.path for imp in js_imports(path, site_dir, source) if imp.path]
+    return deps + [partial for partial in js_partials(path, site_dir, source) if partial]
+
+
+def usage_index(pages, manifest, use_cache=True, site_dir=SITE_DIR):
+    """
+    Recorre páginas → scripts → imports → partials y une el uso de cada archivo.
+
+    Devuelve (uso, archivos recorridos, nº de archivos leídos de la caché).
+    """
+    usage = {'keys': set(), 'literals': set(), 'prefixes': set()}
+    runtime = os.path.normpath(I18N_JS)
+    rules = [INDEX_VERSION]
+    visited = []
+    seen = set()
+    cached = 0
+    stack = list(reversed(pages))
+    while stack:
+        path = stack.pop()
+        if os.path.normpath(path) in seen or not os.path.isfile(path):
+            continue
+        seen.add(os.path.normpath(path))
+        visited.append(path)
+        with open(path, 'rb') as f:
+            data = f.read()
+        digest = sha256_bytes(data)
+        if use_cache and manifest.is_fresh(STAGE, path, digest, rules):
+            entry = manifest.entry(STAGE, path)
+            found, deps = {name: entry[name] for name in usage}, entry['deps']
+            cached += 1
+        else:
+            source = data.decode('utf-8')
+            found, deps = file_usage(path, source), file_deps(path, source, site_dir)
+            manifest.record(STAGE, path, digest, None, rules, deps=deps, **found)
+        if os.path.normpath(path) != runtime:
+            for name, values in found.items():
+                usage[name].update(values)
+        stack.extend(reversed(deps))
+    return usage, visited, cached
+
+
+def unreachable_scripts(reached, site_dir=SITE_DIR):
+    """JS de site/js que no carga ninguna página"""
+    reached = {os.path.normpath(p) for p in reached}
+    orphans = []
+    for dirpath, dirnames, filenames in os.walk(os.path.join(site_dir, 'js')):
+        dirnames.sort()
+        orphans.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                       if name.endswith(('.js', '.mjs')) and os.path.normpath(os.path.join(dirpath, name)) not in reached)
+    return orphans
+
+
+def used_keys(catalog, usage, prefixes):
+    """Claves del catálogo que se conservan"""
+    prefixes = tuple(prefixes)
+    return {key for key in all_keys(catalog)
+            if key in usage['keys'] or key in usage['literals'] or key.startswith(prefixes)}
+
+
+def render_js(node, indent=0):
+    """Árbol anidado como literal de objeto JS (claves sin comillas si son identificadores)"""
+    pad = '  ' * (indent + 1)
+    lines = ['{']
+    for key, value in node.items():
+        name = key if _IDENT_RE.match(key) else json.dumps(key, ensure_ascii=False)
+        rendered = render_js(value, indent + 1) if isinstance(value, dict) else json.dumps(value, ensure_ascii=False)
+        lines.append(f'{pad}{name}: {rendered},')
+    lines.append('  ' * indent + '}')
+    return '\n'.join(lines)
+
+
+def pruned_catalog(catalog, keep):
+    """{locale: {clave: texto}} solo con las claves de ``keep``, en el orden del original"""
+    return {locale: {key: text for key, text in flat.items() if key in keep} for locale, flat in catalog.items()}
+
+
+def locale_bytes(catalog):
+    return {locale: len(render_js(nest(flat)).encode('utf-8')) for locale, flat in catalog.items()}
+
+
+def report(catalog, pruned, usage, prefixes, files, cached, orphans, list_keys):
+    before, after = locale_bytes(catalog), locale_bytes(pruned)
+    print("=" * 72)
+    print("CLAVES I18N SIN USO")
+    print("=" * 72)
+    print(f"Archivos indexados: {len(files)} ({cached} desde la caché)   "
+          f"claves referenciadas: {len(usage['keys'])}")
+    if prefixes:
+        print(f"Prefijos conservados enteros: {', '.join(sorted(prefixes))}")
+    if orphans:
+        print(f"➖ JS que no carga ninguna página (no cuentan): {', '.join(orphans)}")
+    print(f"{'Idioma':<8} {'Claves':>7} {'Sin uso':>8} {'Bytes antes':>12} {'Después':>10} {'Ahorro':>8}")
+    for locale in catalog:
+        unused = len(catalog[locale]) - len(pruned[locale])
+        saved = 100 * (before[locale] - after[locale]) / before[locale] if before[locale] else 0
+        print(f"{locale:<8} {len(catalog[locale]):>7} {unused:>8} {before[locale]:>12,} {after[locale]:>10,} "
+              f"{saved:>7.1f}%")
+    if list_keys:
+        dropped = sorted(all_keys(catalog) - all_keys(pruned))
+        by_section = {}
+        for key in dropped:
+            by_section.setdefault(key.split('.')[0], []).append(key)
+        for section, keys in by_section.items():
+            print(f"   - {section} ({len(keys)}): {', '.join(k[len(section) + 1:] for k in keys)}")
+    print("=" * 72)
+    return sum(before.values()) - sum(after.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poda las claves de i18n.js que no usa ninguna página")
+    parser.add_argument('--apply', action='store_true', help="Reescribe el literal translations de i18n.js")
+    parser.add_argument('--keep', action='append', default=[], metavar='PREFIJO',
+                        help="Prefijo de claves construidas en tiempo de ejecución (repetible)")
+    parser.add_argument('--list', action='store_true', help="Lista las claves sin uso")
+    parser.add_argument('--no-rules', action='store_true', help="No incluye las tablas de los scripts de traducción")
+    parser.add_argument('--no-cache', action='store_true', help="Vuelve a leer todos los archivos")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    catalog = load_catalog()
+    if not any(catalog.values()):
+        print(f"❌ {I18N_JS} no tiene traducciones (¿ya se ejecutó con --apply, --link o --strip?)")
+        return 1
+
+    manifest = Manifest()
+    usage, files, cached = usage_index(page_paths(), manifest, use_cache=not args.no_cache)
+    manifest.prune(STAGE)
+    manifest.save()
+    if not args.no_rules:
+        usage['keys'].update(key for key, _ in rule_table_uses())
+
+    prefixes = usage['prefixes'] | set(DYNAMIC_PREFIXES) | set(args.keep)
+    pruned = pruned_catalog(catalog, used_keys(catalog, usage, prefixes))
+    saved = report(catalog, pruned, usage, prefixes, files, cached, unreachable_scripts(files), args.list)
+
+    if args.apply:
+        with open(I18N_JS, 'r', encoding='utf-8') as f:
+            source = f.read()
+        span_start, span_end = translations_span(source)
+        literal = render_js({locale: nest(flat) for locale, flat in pruned.items()})
+        atomic_write_text(I18N_JS, source[:span_start] + literal + source[span_end:])
+        print(f"✂️  Catálogo podado en {I18N_JS}")
+    print(f"Bytes ahorrados: {saved:,}   ⏱️  {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
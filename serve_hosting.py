@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor local que reproduce Firebase Hosting (cabeceras, rewrites y caché) de firebase.json
+
+Uso:
+    python serve_hosting.py                              # target prod en http://127.0.0.1:5000
+    python serve_hosting.py --target pre --port 5002
+    python serve_hosting.py --backend http://127.0.0.1:8081  # /api/** → backend local
+    python serve_hosting.py --stub-backend --stub-latency 30  # backend de pega incluido
+
+Compila los ``headers``, ``redirects`` y ``rewrites`` del target elegido en
+un matcher de rutas: cada glob se convierte una vez en una expresión regular
+con prefijo/sufijo literal para descartar rápido, y el resultado por ruta se
+memoriza. Como en Hosting, todas las reglas de cabeceras que coinciden se
+aplican en orden y, si dos definen la misma cabecera, gana la última.
+
+Orden de resolución (el de Hosting): redirects → archivo estático exacto →
+rewrites → 404.html. Las respuestas llevan ETag (SHA-256 del contenido) y
+responden 304 a If-None-Match; la conexión se mantiene abierta (HTTP/1.1).
+Si el cliente acepta br/gzip y existe la variante de precompress_assets.py
+(y es más reciente que el original), se sirve esa.
+
+Los rewrites ``run``/``function`` se envían por proxy a --backend.
+"""
+
+import argparse
+import hashlib
+import http.client
+import json
+import mimetypes
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from precompress_assets import OUTPUT_DIR as PRECOMPRESSED_DIR, SUFFIX
+
+FIREBASE_JSON = 'firebase.json'
+DEFAULT_TARGET = 'prod'
+DEFAULT_PORT = 5000
+DEFAULT_BACKEND = 'http://127.0.0.1:8081'
+# Lo que Hosting no despliega aunque no aparezca en "ignore"
+DEFAULT_IGNORE = ['firebase.json', '**/.*', '**/node_modules/**']
+ENCODINGS = (('br', 'br'), ('gzip', 'gzip'))
+HOP_BY_HOP = {'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'te', 'trailers',
+              'transfer-encoding', 'upgrade', 'host'}
+# Del backend no se copian: send_response() ya escribe las suyas
+PROXY_SKIP_HEADERS = HOP_BY_HOP | {'content-length', 'server', 'date'}
+# Rutas memorizadas por HostingConfig en cada consulta; al llenarse se vacía
+PATH_CACHE_SIZE = 4096
+
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('text/javascript', '.mjs')
+mimetypes.add_type('font/woff2', '.woff2')
+mimetypes.add_type('font/ttf', '.ttf')
+mimetypes.add_type('image/webp', '.webp')
+
+
+# --- globs de firebase.json --------------------------------------------------
+
+def glob_to_regex(pattern):
+    """Glob de Hosting ('**/*.{png,svg}', '/secciones/*.html') → regex de ruta completa"""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '{':
+            end = pattern.index('}', i)
+            out.append('(?:' + '|'.join(re.escape(alt) for alt in pattern[i + 1:end].split(',')) + ')')
+            i = end
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return re.compile(''.join(out))
+
+
+class Rule:
+    """Regla compilada: glob o regex más prefijo/sufijo literal para el descarte rápido"""
+
+    def __init__(self, config):
+        self.config = config
+        if 'regex' in config:
+            self.regex = re.compile(config['regex'])
+            self.prefix = self.suffix = ''
+            return
+        source = config['source']
+        if not source.startswith('/'):
+            source = '/' + source
+        self.regex = glob_to_regex(source)
+        self.prefix = re.match(r'[^*?{]*', source).group(0)
+        self.suffix = re.search(r'[^*?}]*$', source).group(0)
+
+    def matches(self, path):
+        if not path.startswith(self.prefix) or not path.endswith(self.suffix):
+            return False
+        return self.regex.fullmatch(path) is not None
+
+
+class HostingConfig:
+    """headers / redirects / rewrites / ignore de un target de firebase.json"""
+
+    def __init__(self, config, root='.'):
+        self.public = os.path.normpath(os.path.join(root, config.get('public', '.')))
+        self.header_rules = [Rule(r) for r in config.get('headers', [])]
+        self.redirect_rules = [Rule(r) for r in config.get('redirects', [])]
+        self.rewrite_rules = [Rule(r) for r in config.get('rewrites', [])]
+        self.ignore_rules = [Rule({'source': g}) for g in config.get('ignore', DEFAULT_IGNORE)]
+        # Una caché por consulta y por instancia (lru_cache en un método retendría self)
+        self._cache = {name: {} for name in ('headers', 'redirect', 'rewrite', 'file')}
+
+    def _cached(self, name, path, compute):
+        cache = self._cache[name]
+        if path not in cache:
+            if len(cache) >= PATH_CACHE_SIZE:
+                cache.clear()
+            cache[path] = compute(path)
+        return cache[path]
+
+    def headers_for(self, path):
+        """Cabeceras de todas las reglas que coinciden (la última gana en cada clave)"""
+        return self._cached('headers', path, self._headers_for)
+
+    def _headers_for(self, path):
+        headers = {}
+        for rule in self.header_rules:
+            if rule.matches(path):
+                for h in rule.config['headers']:
+                    headers[h['key']] = h['value']
+        return tuple(headers.items())
+
+    def redirect_for(self, path):
+        return self._cached('redirect', path, self._redirect_for)
+
+    def _redirect_for(self, path):
+        rule = next((r for r in self.redirect_rules if r.matches(path)), None)
+        return (rule.config['destination'], rule.config.get('type', 301)) if rule else None
+
+    def rewrite_for(self, path):
+        return self._cached('rewrite', path, self._rewrite_for)
+
+    def _rewrite_for(self, path):
+        return next((r.config for r in self.rewrite_rules if r.matches(path)), None)
+
+    def file_for(self, path):
+        """Archivo desplegado que sirve ``path`` exactamente (o su index.html), o None"""
+        return self._cached('file', path, self._file_for)
+
+    def _file_for(self, path):
+        rel = path.lstrip('/')
+        candidate = os.path.normpath(os.path.join(self.public, rel))
+        if not (candidate == self.public or candidate.startswith(self.public + os.sep)):
+            return None
+        if os.path.isdir(candidate):
+            candidate = os.path.join(candidate, 'index.html')
+        if not os.path.isfile(candidate):
+            return None
+        deployed = '/' + os.path.relpath(candidate, self.public).replace(os.sep, '/')
+        if any(r.matches(deployed) for r in self.ignore_rules):
+            return None
+        return candidate
+
+
+def load_target(target, path=FIREBASE_JSON):
+    with open(path, 'r', encoding='utf-8') as f:
+        hosting = json.load(f)['hosting']
+    configs = hosting if isinstance(hosting, list) else [hosting]
+    for config in configs:
+        if config.get('target', target) == target:
+            return HostingConfig(config, os.path.dirname(os.path.abspath(path)))
+    raise SystemExit(f"❌ No hay target '{target}' en {path} "
+                     f"(disponibles: {', '.join(c.get('target', '?') for c in configs)})")
+
+
+# --- archivos ----------------------------------------------------------------
+
+class FileCache:
+    """Contenido y ETag por archivo, validados por mtime y tamaño"""
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def get(self, path):
+        st = os.stat(path)
+        key = (st.st_mtime_ns, st.st_size)
+        entry = self.entries.get(path)
+        if entry and entry[0] == key:
+            return entry[1], entry[2]
+        with open(path, 'rb') as f:
+            data = f.read()
+        etag = '"' + hashlib.sha256(data).hexdigest()[:32] + '"'
+        with self.lock:
+            self.entries[path] = (key, data, etag)
+        return data, etag
+
+
+def precompressed_variant(path, public, encoding, precompressed_dir):
+    """Variante .br/.gz (junto al archivo o en la carpeta de precompress) si está al día"""
+    rel = os.path.relpath(path, public)
+    for candidate in (path + SUFFIX[encoding], os.path.join(precompressed_dir, rel) + SUFFIX[encoding]):
+        try:
+            if os.stat(candidate).st_mtime_ns >= os.stat(path).st_mtime_ns:
+                return candidate
+        except FileNotFoundError:
+            continue
+    return None
+
+
+def accepted_encodings(header):
+    """Codificaciones de Accept-Encoding con q > 0"""
+    accepted = set()
+    for part in (header or '').split(','):
+        name, *params = [p.strip() for p in part.split(';')]
+        q = next((p[2:] for p in params if p.startswith('q=')), '1')
+        try:
+            if name and float(q) > 0:
+                accepted.add(name.lower())
+        except ValueError:
+            continue
+    return accepted
+
+
+# --- servidor ----------------------------------------------------------------
+
+class HostingHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'HostingEmulator'
+    # Cabeceras y cuerpo van en dos write(): sin TCP_NODELAY, Nagle + ACK retardado suman ~40 ms
+    disable_nagle_algorithm = True
+    hosting = None
+    files = None
+    backend = None
+    precompressed_dir = PRECOMPRESSED_DIR
+    quiet = False
+    _backend_local = threading.local()
+
+    def do_GET(self):
+        self.handle_request(head=False)
+
+    def do_HEAD(self):
+        self.handle_request(head=True)
+
+    def do_POST(self):
+        self.handle_request(head=False)
+
+    do_PUT = do_PATCH = do_DELETE = do_OPTIONS = do_POST
+
+    def handle_request(self, head):
+        path = unquote(urlsplit(self.path).path) or '/'
+        redirect = self.hosting.redirect_for(path)
+        if redirect:
+            return self.send_simple(redirect[1], path, b'', {'Location': redirect[0]}, head)
+
+        if self.command in ('GET', 'HEAD'):
+            target = self.hosting.file_for(path)
+            if target:
+                return self.send_file(path, target, 200, head)
+
+        rewrite = self.hosting.rewrite_for(path)
+        if rewrite:
+            if 'run' in rewrite or 'function' in rewrite:
+                return self.proxy(path)
+            if 'destination' in rewrite:
+                target = self.hosting.file_for(rewrite['destination'])
+                if target:
+                    return self.send_file(path, target, 200, head)
+
+        not_found = self.hosting.file_for('/404.html')
+        if not_found:
+            return self.send_file(path, not_found, 404, head)
+        return self.send_simple(404, path, b'Not Found', {'Content-Type': 'text/plain'}, head)
+
+    def send_file(self, path, target, status, head):
+        headers = dict(self.hosting.headers_for(path))
+        content_type = mimetypes.guess_type(target)[0] or 'application/octet-stream'
+        if content_type.startswith('text/') or content_type in ('application/json', 'image/svg+xml'):
+            content_type += '; charset=utf-8'
+        headers['Content-Type'] = content_type
+        headers['Vary'] = 'Accept-Encoding'
+
+        body_path = target
+        accepted = accepted_encodings(self.headers.get('Accept-Encoding'))
+        for encoding, token in ENCODINGS:
+            variant = token in accepted and precompressed_variant(target, self.hosting.public, encoding,
+                                                                  self.precompressed_dir)
+            if variant:
+                body_path = variant
+                headers['Content-Encoding'] = token
+                break
+        data, etag = self.files.get(body_path)
+        headers['ETag'] = etag
+
+        if status == 200 and etag in [t.strip() for t in (self.headers.get('If-None-Match') or '').split(',')]:
+            headers = {k: v for k, v in headers.items() if k not in ('Content-Type', 'Content-Encoding')}
+            return self.send_simple(304, path, b'', headers, head=True)
+        self.send_simple(status, path, data, headers, head)
+
+    def send_simple(self, status, path, body, headers, head):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        if status != 304:
+            self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head and body:
+            self.wfile.write(body)
+
+    def _backend_connection(self):
+        conn = getattr(self._backend_local, 'conn', None)
+        if conn is None:
+            parts = urlsplit(self.backend)
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            self._backend_local.conn = conn
+        return conn
+
+    def proxy(self, path):
+        """Reenvía la petición al backend local (conexión persistente por hilo)"""
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else None
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+        headers['X-Forwarded-Host'] = self.headers.get('Host', '')
+        for attempt in (1, 2):
+            conn = self._backend_connection()
+            try:
+                conn.request(self.command, self.path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+                break
+            except (ConnectionError, http.client.HTTPException, OSError) as e:
+                conn.close()
+                self._backend_local.conn = None
+                if attempt == 2:
+                    message = f'Backend no disponible en {self.backend}: {e}'.encode('utf-8')
+                    return self.send_simple(502, path, message, {'Content-Type': 'text/plain; charset=utf-8'},
+                                            self.command == 'HEAD')
+        out = {k: v for k, v in response.getheaders() if k.lower() not in PROXY_SKIP_HEADERS}
+        out.update(self.hosting.headers_for(path))
+        self.send_simple(response.status, path, data, out, self.command == 'HEAD')
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class HostingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Con la cola de escucha por defecto (5) las ráfagas de conexiones nuevas
+    # pierden SYN y esperan un segundo a la retransmisión
+    request_queue_size = 128
+
+
+class StubBackendHandler(BaseHTTPRequestHandler):
+    """Backend de pega: responde JSON con el método y la ruta tras ``latency`` segundos"""
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0.0
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            self.rfile.read(length)
+        if self.latency:
+            time.sleep(self.latency)
+        body = json.dumps({'ok': True, 'method': self.command, 'path': self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _reply
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_backend(port, latency_ms=0):
+    handler = type('StubBackend', (StubBackendHandler,), {'latency': latency_ms / 1000})
+    server = HostingServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_server(hosting, host='127.0.0.1', port=DEFAULT_PORT, backend=DEFAULT_BACKEND,
+                precompressed_dir=PRECOMPRESSED_DIR, quiet=False):
+    handler = type('Hosting', (HostingHandler,), {
+        'hosting': hosting,
+        'files': FileCache(),
+        'backend': backend,
+        'precompressed_dir': precompressed_dir,
+        'quiet': quiet,
+        '_backend_local': threading.local(),
+    })
+    return HostingServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Emula Firebase Hosting a partir de firebase.json")
+    parser.add_argument('--target', default=DEFAULT_TARGET, help="Target de firebase.json (prod, pre)")
+    parser.add_argument('--config', default=FIREBASE_JSON, help="Ruta de firebase.json")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--backend', default=DEFAULT_BACKEND, help="URL del backend para /api/**")
+    parser.add_argument('--precompressed', default=PRECOMPRESSED_DIR,
+                        help="Carpeta de variantes de precompress_assets.py")
+    parser.add_argument('--stub-backend', action='store_true', help="Arranca un backend de pega en --backend")
+    parser.add_argument('--stub-latency', type=float, default=0, help="Latencia del backend de pega (ms)")
+    parser.add_argument('--quiet', action='store_true', help="No registra cada petición")
+    args = parser.parse_args(argv)
+
+    hosting = load_target(args.target, args.config)
+    if args.stub_backend:
+        start_stub_backend(urlsplit(args.backend).port or 80, args.stub_latency)
+    server = make_server(hosting, args.host, args.port, args.backend, args.precompressed, args.quiet)
+
+    print("=" * 60)
+    print(f"FIREBASE HOSTING LOCAL ({args.target})")
+    print("=" * 60)
+    print(f"📁 Sirviendo {hosting.public} en http://{args.host}:{args.port}")
+    print(f"🔀 Reglas: {len(hosting.header_rules)} de cabeceras, {len(hosting.rewrite_rules)} rewrites, "
+          f"{len(hosting.redirect_rules)} redirects")
+    print(f"🔌 /api/** → {args.backend}{' (backend de pega)' if args.stub_backend else ''}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Servidor detenido")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,18 +6,20 @@ import { initI18n } from '/js/utils/i18n.js';
 export function initSidebar(containerSelector, opts={}) {
   const container = document.querySelector(containerSelector);
   if (!container) return console.warn("No existe " + containerSelector);
-  return fetch("/partials/sidebar.html")
-    .then((r) => {
-      if (!r.ok) throw new Error("Error cargando sidebar: " + r.status);
-      return r.text();
-    })
+  // En deploy inline_partials.py ya mete el partial en el HTML (data-partial="sidebar"): sin fetch
+  const markup = container.dataset.partial === 'sidebar'
+    ? Promise.resolve(null)
+    : fetch("/partials/sidebar.html").then((r) => {
+        if (!r.ok) throw new Error("Error cargando sidebar: " + r.status);
+        return r.text();
+      });
+  return markup
     .then((html) => {
-      container.innerHTML = html;
+      if (html !== null) container.innerHTML = html;
       // 👇 Señal universal: esta página tiene sidebar
       document.body.classList.add('has-sidebar');
-      // Inicializar i18n después de cargar el HTML del sidebar
-      initI18n();
-      initEmailSidebar(opts);
+      // Inicializar i18n después de cargar el HTML del sidebar (el partial no viene pre-renderizado)
+      return initI18n(container).then(() => initEmailSidebar(opts));
     })
     .catch(console.error);
 }
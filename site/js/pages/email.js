@@ -3865,8 +3865,8 @@ await this.loadBatch(prevPage, { replace: false, prepend: true });
   
 }
 
-document.addEventListener('DOMContentLoaded', () => {
-  initI18n();
+document.addEventListener('DOMContentLoaded', async () => {
+  await initI18n();
   new EmailView();
 });
 
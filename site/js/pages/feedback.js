@@ -26,7 +26,7 @@ class FeedbackPage {
     await initSidebar('#sidebarContainer');
     
     // Initialize i18n
-    initI18n();
+    await initI18n();
     
     // Get DOM elements
     this.form = document.getElementById('feedbackForm');
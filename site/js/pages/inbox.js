@@ -497,6 +497,9 @@ document.addEventListener('DOMContentLoaded', async () => {
     try { await window.configReady; } catch(_) {}
   }
 
+  // Inicializar i18n (antes del primer t(): sin catálogo incluido, las traducciones se descargan)
+  await initI18n();
+
   // Verificar si hay un mensaje en la URL (como shopify_connected)
   const urlParams = new URLSearchParams(window.location.search);
   const msg = urlParams.get('msg');
@@ -529,9 +532,6 @@ document.addEventListener('DOMContentLoaded', async () => {
     try { await window.appUserPromise; } catch(_) {}
   }
 
-  // Inicializar i18n
-  initI18n();
-
   new EmailInbox();
 });
 
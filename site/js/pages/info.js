@@ -9,7 +9,7 @@ import { LIMITS } from '/js/config.js';
 import { t, initI18n } from '/js/utils/i18n.js';
 
 document.addEventListener('DOMContentLoaded', async () => {
-  initI18n();
+  await initI18n();
 
   await enforceFlowGate({
     allowOnboarding: ['/secciones/info.html', '/secciones/perfil.html']
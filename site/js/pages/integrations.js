@@ -438,7 +438,7 @@ async function executeShopifyDisconnect() {
 // Inicialización
 document.addEventListener('DOMContentLoaded', async () => {
   // Inicializar i18n
-  initI18n();
+  await initI18n();
   
   // 1. Esperar configuración
   if (window.configReady) {
@@ -158,7 +158,7 @@ class UserProfile {
     }
     async init() {
         // Inicializar sistema i18n
-        initI18n();
+        await initI18n();
         
         // Populate translated dropdowns
         this.populateTranslatedDropdowns();
@@ -553,7 +553,7 @@ function updateCenteredOption(scrollerId = 'conversationsScroller', isPackSelect
 
 document.addEventListener("DOMContentLoaded", async () => {
   // Inicializar i18n
-  initI18n();
+  await initI18n();
   
   // Traducir las opciones del scroller dinámicamente
   function translateConversationOptions() {
@@ -7,8 +7,8 @@ import { t, initI18n } from '/js/utils/i18n.js';
 
 enforceFlowGate();
 
-document.addEventListener('DOMContentLoaded', () => {
-  initI18n();
+document.addEventListener('DOMContentLoaded', async () => {
+  await initI18n();
   initSidebar('#sidebarContainer');
 
   const form       = document.getElementById('composeForm');
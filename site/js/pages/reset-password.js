@@ -3,8 +3,8 @@ import { API_BASE } from '/js/utils/api.js';
 import { notify } from '/js/utils/notify.js';
 import { t, initI18n } from '/js/utils/i18n.js';
 
-// Inicializar i18n
-initI18n();
+// Inicializar i18n (antes del primer t(): sin catálogo incluido, las traducciones se descargan)
+await initI18n();
 
 // Elementos del formulario
 const resetPasswordForm = document.getElementById('resetPasswordForm');
@@ -26,7 +26,7 @@ class ShopifyLoadingPage {
    */
   async init() {
     console.log('🔄 Inicializando página de carga Shopify...');
-    initI18n();
+    await initI18n();
     // Leer params
     const urlParams = new URLSearchParams(window.location.search);
 
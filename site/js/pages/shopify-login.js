@@ -5,8 +5,8 @@
 import { API_BASE, setToken } from '/js/utils/api.js';
 import { t, initI18n } from '/js/utils/i18n.js';
 
-// Inicializar i18n
-initI18n();
+// Inicializar i18n (antes del primer t(): sin catálogo incluido, las traducciones se descargan)
+await initI18n();
 
 // Obtener query params de Shopify
 const urlParams = new URLSearchParams(window.location.search);
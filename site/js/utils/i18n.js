@@ -8,6 +8,7 @@
 const SUPPORTED_LOCALES = ['es', 'en'];
 const DEFAULT_LOCALE = 'es';
 const STORAGE_KEY = 'app_locale';
+const BUNDLE_MANIFEST_URL = '/i18n/manifest.json';
 
 /**
  * Traducciones para toda la aplicación
@@ -2347,21 +2348,155 @@ const translations = {
   }
 };
 
+/**
+ * Tablas planas por idioma: clave → texto o plantilla precompilada
+ * Una plantilla es [literal, placeholder, literal, ..., literal], lo que
+ * devuelve text.split(PLACEHOLDER_RE). En deploy las genera
+ * build_i18n_tables.py (--link cambia la línea siguiente por el import del
+ * módulo); si no, se aplana el literal la primera vez que se usa un idioma.
+ */
+const PRECOMPILED_TABLES = null;
+const PLACEHOLDER_RE = /\{([A-Za-z_$][\w$]*)\}/;
+const flatTables = {};
+// locale → Map(sección → objeto) rehecho desde la tabla; se vacía junto con flatTables
+const sectionCache = {};
+
+function compileTemplate(text) {
+  const segments = text.split(PLACEHOLDER_RE);
+  return segments.length === 1 ? text : segments;
+}
+
+function flatten(node, prefix, table) {
+  for (const [k, v] of Object.entries(node)) {
+    const key = prefix ? `${prefix}.${k}` : k;
+    if (typeof v === 'string') {
+      table.set(key, compileTemplate(v));
+    } else if (v && typeof v === 'object') {
+      flatten(v, key, table);
+    }
+  }
+  return table;
+}
+
+function getTable(locale) {
+  let table = flatTables[locale];
+  if (!table) {
+    table = PRECOMPILED_TABLES?.[locale]
+      ? new Map(PRECOMPILED_TABLES[locale])
+      : flatten(translations[locale] || {}, '', new Map());
+    flatTables[locale] = table;
+  }
+  return table;
+}
+
+function joinTemplate(segments) {
+  return segments.map((segment, i) => (i % 2 ? `{${segment}}` : segment)).join('');
+}
+
+function renderTemplate(segments, params) {
+  let out = segments[0];
+  for (let i = 1; i < segments.length; i += 2) {
+    const name = segments[i];
+    out += (params && Object.hasOwn(params, name) ? params[name] : `{${name}}`) + segments[i + 1];
+  }
+  return out;
+}
+
+/**
+ * Bundles por idioma y sección (build_i18n_bundles.py)
+ * Si el build vació el literal anterior, las traducciones se descargan bajo
+ * demanda: solo el idioma actual y las secciones que usa la página.
+ */
+const INLINE_CATALOG = PRECOMPILED_TABLES !== null
+  || Object.values(translations).some(locale => Object.keys(locale).length > 0);
+let manifestPromise = null;
+const pendingBundles = new Map();
+
+function loadBundleManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch(BUNDLE_MANIFEST_URL, { cache: 'no-cache' })
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null);
+  }
+  return manifestPromise;
+}
+
+function loadBundle(manifest, locale, section) {
+  const id = `${locale}/${section}`;
+  if (!pendingBundles.has(id)) {
+    const info = manifest.bundles[locale][section];
+    const request = fetch(`/i18n/${id}.json?v=${info.hash}`)
+      .then(res => {
+        if (!res.ok) throw new Error(`HTTP ${res.status}`);
+        return res.json();
+      })
+      .then(data => {
+        translations[locale] = translations[locale] || {};
+        translations[locale][section] = data;
+        delete flatTables[locale];
+        delete sectionCache[locale];
+      })
+      .catch(err => {
+        pendingBundles.delete(id);
+        console.warn(`[i18n] Error loading bundle ${id}:`, err);
+      });
+    pendingBundles.set(id, request);
+  }
+  return pendingBundles.get(id);
+}
+
+/**
+ * Descarga las secciones que necesita la página para un idioma
+ * No hace nada si el catálogo viene incluido en este archivo
+ */
+export async function loadTranslations(locale = getCurrentLocale(), sections = null) {
+  if (INLINE_CATALOG) return;
+
+  const manifest = await loadBundleManifest();
+  if (!manifest || !manifest.bundles[locale]) return;
+
+  if (!sections) {
+    const path = window.location.pathname;
+    sections = manifest.pages[path] || manifest.pages[`${path.replace(/\/$/, '')}/index.html`]
+      || Object.keys(manifest.bundles[locale]);
+  }
+
+  await Promise.all(
+    sections
+      .filter(section => manifest.bundles[locale][section])
+      .map(section => loadBundle(manifest, locale, section))
+  );
+}
+
 /**
  * Obtiene el idioma actual del usuario
+ * El resultado se reutiliza mientras no cambien los valores de localStorage
+ * de los que depende (se comparan como texto, sin volver a parsear el store)
  */
+const localeCache = { token: null, store: null, stored: null, browser: null, locale: null };
+
 export function getCurrentLocale() {
-  // 1. Intentar leer del perfil del store (SOLO si el usuario está autenticado)
   const token = localStorage.getItem('token');
-  if (token) {
+  const storeData = token ? localStorage.getItem('store') : null;
+  const stored = localStorage.getItem(STORAGE_KEY);
+  const browser = navigator.language;
+  if (localeCache.locale && localeCache.token === token && localeCache.store === storeData
+      && localeCache.stored === stored && localeCache.browser === browser) {
+    return localeCache.locale;
+  }
+  const locale = resolveLocale(storeData, stored, browser);
+  Object.assign(localeCache, { token, store: storeData, stored, browser, locale });
+  return locale;
+}
+
+function resolveLocale(storeData, stored, browser) {
+  // 1. Intentar leer del perfil del store (SOLO si el usuario está autenticado)
+  if (storeData) {
     try {
-      const storeData = localStorage.getItem('store');
-      if (storeData) {
-        const store = JSON.parse(storeData);
-        // El idioma está en 'language', no en 'preferred_language'
-        if (store.language && SUPPORTED_LOCALES.includes(store.language)) {
-          return store.language;
-        }
+      const store = JSON.parse(storeData);
+      // El idioma está en 'language', no en 'preferred_language'
+      if (store.language && SUPPORTED_LOCALES.includes(store.language)) {
+        return store.language;
       }
     } catch (e) {
       console.warn('[getCurrentLocale] Error reading from store:', e);
@@ -2369,13 +2504,12 @@ export function getCurrentLocale() {
   }
   
   // 2. Intentar leer de localStorage (idioma de la landing page)
-  const stored = localStorage.getItem(STORAGE_KEY);
   if (stored && SUPPORTED_LOCALES.includes(stored)) {
     return stored;
   }
   
   // 3. Intentar detectar del navegador
-  const browserLang = navigator.language?.split('-')[0];
+  const browserLang = browser?.split('-')[0];
   if (browserLang && SUPPORTED_LOCALES.includes(browserLang)) {
     return browserLang;
   }
@@ -2424,42 +2558,28 @@ export function t(key, localeOrParams = null, params = null) {
     replacements = params;
   }
   
-  const keys = key.split('.');
-  let value = translations[locale];
-  
-  for (const k of keys) {
-    if (value && typeof value === 'object') {
-      value = value[k];
-    } else {
-      break;
-    }
-  }
+  const entry = getTable(locale).get(key);
   
   // Si no encontramos traducción, devolver la clave
-  if (typeof value !== 'string') {
+  if (entry === undefined) {
     console.warn(`Translation not found for key: ${key} (locale: ${locale})`);
     return key;
   }
   
-  // Reemplazar placeholders si hay parámetros
-  if (replacements && typeof replacements === 'object') {
-    for (const [placeholder, replacement] of Object.entries(replacements)) {
-      value = value.replace(new RegExp(`\\{${placeholder}\\}`, 'g'), replacement);
-    }
-  }
-  
-  return value;
+  // Rellenar placeholders (los que no vienen en los parámetros se dejan tal cual)
+  return typeof entry === 'string' ? entry : renderTemplate(entry, replacements);
 }
 
 /**
  * Traduce todos los elementos con atributo data-i18n en el DOM
+ * (o solo dentro de ``root``, p. ej. un partial recién insertado)
  * Ejemplo: <h1 data-i18n="landing.heroTitle"></h1>
  */
-export function translatePage() {
+export function translatePage(root = document) {
   const locale = getCurrentLocale();
   
   // Traducir textos
-  const elements = document.querySelectorAll('[data-i18n]');
+  const elements = root.querySelectorAll('[data-i18n]');
   elements.forEach(el => {
     const key = el.getAttribute('data-i18n');
     if (key) {
@@ -2468,7 +2588,7 @@ export function translatePage() {
   });
   
   // Traducir placeholders
-  const placeholders = document.querySelectorAll('[data-i18n-placeholder]');
+  const placeholders = root.querySelectorAll('[data-i18n-placeholder]');
   placeholders.forEach(el => {
     const key = el.getAttribute('data-i18n-placeholder');
     if (key) {
@@ -2477,7 +2597,7 @@ export function translatePage() {
   });
   
   // Traducir títulos (tooltips)
-  const titles = document.querySelectorAll('[data-i18n-title]');
+  const titles = root.querySelectorAll('[data-i18n-title]');
   titles.forEach(el => {
     const key = el.getAttribute('data-i18n-title');
     if (key) {
@@ -2508,23 +2628,65 @@ export function getSection(sectionKey, locale = null) {
     }
   }
   
+  // Con las tablas enlazadas el literal está vacío: se rehace desde la tabla una vez
+  if (!value && PRECOMPILED_TABLES) {
+    const cache = sectionCache[locale] = sectionCache[locale] || new Map();
+    if (cache.has(sectionKey)) return cache.get(sectionKey);
+    const prefix = `${sectionKey}.`;
+    for (const [key, entry] of getTable(locale)) {
+      if (!key.startsWith(prefix)) continue;
+      value = value || {};
+      let node = value;
+      const parts = key.slice(prefix.length).split('.');
+      for (const part of parts.slice(0, -1)) {
+        node = node[part] = node[part] || {};
+      }
+      node[parts[parts.length - 1]] = typeof entry === 'string' ? entry : joinTemplate(entry);
+    }
+    value = value || {};
+    cache.set(sectionKey, value);
+  }
+  
   return value || {};
 }
 
+let localeListenerAdded = false;
+
 /**
- * Inicializa el sistema i18n en una página
+ * Inicializa el sistema i18n en una página (o en ``root``)
+ * Devuelve una promesa que se resuelve cuando las traducciones están cargadas
  */
-export function initI18n() {
-  // Traducir la página actual
-  translatePage();
+export function initI18n(root = document) {
+  // Las páginas pre-renderizadas (prerender_locales.py) ya llegan traducidas
+  const prerendered = root === document
+    && document.documentElement.dataset.i18nPrerendered === getCurrentLocale();
+  const translate = () => {
+    if (!prerendered) translatePage(root);
+  };
   
-  // Escuchar cambios de idioma
-  window.addEventListener('locale-changed', () => {
-    translatePage();
-  });
+  // Traducir la página actual (en el acto si el catálogo está incluido)
+  let ready;
+  if (INLINE_CATALOG) {
+    translate();
+    ready = Promise.resolve();
+  } else {
+    ready = loadTranslations().then(translate);
+  }
+  
+  // Escuchar cambios de idioma: un solo listener, que ya traduce todo el documento
+  // (initI18n se llama una vez por página y otra por cada partial, como el sidebar)
+  if (!localeListenerAdded) {
+    localeListenerAdded = true;
+    window.addEventListener('locale-changed', (event) => {
+      const locale = event.detail?.locale || getCurrentLocale();
+      loadTranslations(locale).then(() => translatePage());
+    });
+  }
   
   // Añadir clase al HTML con el idioma actual
   document.documentElement.lang = getCurrentLocale();
+  
+  return ready;
 }
 
 /**
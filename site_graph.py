@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Grafo de recursos del sitio: qué carga cada página y qué importa cada módulo
+
+  - page_refs():    <script src>, <link href>, <img src>... de una página HTML
+  - js_imports():   import estáticos, export ... from e import() dinámicos de un módulo
+                    (import(/* eager */ '...') cuenta como parte de la carga inicial)
+  - css_imports():  @import y url(...) de una hoja de estilos
+  - module_graph(): cierre transitivo de imports desde unos módulos de entrada
+  - page_assets():  todo lo que descarga una página (CSS, fuentes, módulos, partials...)
+
+Las URLs (/js/x.js?v=1, ../utils/y.js, css/z.css) se resuelven a rutas dentro
+de site/ sin la query, para que la misma URL escrita de varias formas apunte
+al mismo archivo.
+"""
+
+import os
+import posixpath
+import re
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+from html_index import build_index
+
+SITE_DIR = 'site'
+
+# kind: 'script' | 'module' | 'stylesheet' | 'icon' | 'image' | 'preload' | 'modulepreload' | 'partial'
+Ref = namedtuple('Ref', 'kind url path offset attr')
+# eager: import() marcado con /* eager */ (se carga siempre, igual que un import estático)
+Import = namedtuple('Import', 'specifier path dynamic offset eager', defaults=(False,))
+
+_STATIC_IMPORT_RE = re.compile(
+    r'''^[ \t]*(?:import|export)\b[^'"`;()]*?\bfrom\s*(['"])([^'"]+)\1'''
+    r'''|^[ \t]*import\s*(['"])([^'"]+)\3''',
+    re.MULTILINE,
+)
+_DYNAMIC_IMPORT_RE = re.compile(r'''\bimport\(\s*(?:/\*\s*(eager)\s*\*/\s*)?(['"`])([^'"`$]+)\2\s*\)''')
+_PARTIAL_FETCH_RE = re.compile(r'''\bfetch\(\s*(['"`])([^'"`$]*/partials/[^'"`$]+\.html)\1''')
+# url(...) de CSS: grupo 2 con comillas, grupo 3 sin ellas (critical_css.py también la usa)
+CSS_URL_RE = re.compile(r'''url\(\s*(?:(['"])([^'"]*)\1|([^'")\s]+))\s*\)''')
+_CSS_IMPORT_RE = re.compile(r'''@import\s+(['"])([^'"]+)\1''')
+
+
+def split_url(url):
+    """'/js/a.js?v=1#x' → ('/js/a.js', 'v=1')"""
+    parts = urlsplit(url)
+    return parts.path, parts.query
+
+
+def is_local(url):
+    if not url or url.startswith(('data:', 'blob:', 'mailto:', 'tel:', 'javascript:', '#')):
+        return False
+    parts = urlsplit(url)
+    return not parts.scheme and not parts.netloc
+
+
+def site_url(path, site_dir=SITE_DIR):
+    """Ruta de archivo dentro de site/ → URL absoluta ('/js/a.js')"""
+    rel = os.path.relpath(path, site_dir).replace(os.sep, '/')
+    return '/' + rel
+
+
+def url_to_path(url, referrer, site_dir=SITE_DIR):
+    """
+    Resuelve ``url`` (tal y como aparece en ``referrer``) a una ruta en site/.
+
+    Devuelve None para URLs externas o que salen de site/.
+    """
+    if not is_local(url):
+        return None
+    path, _ = split_url(url)
+    if not path:
+        return None
+    if path.startswith('/'):
+        resolved = posixpath.normpath(path)
+    else:
+        base = posixpath.dirname(site_url(referrer, site_dir))
+        resolved = posixpath.normpath(posixpath.join(base, path))
+    if resolved.startswith('/..') or resolved == '/':
+        return None
+    return os.path.normpath(os.path.join(site_dir, resolved.lstrip('/')))
+
+
+def _read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def page_refs(html_path, site_dir=SITE_DIR, index=None):
+    """Recursos que referencia una página HTML, en orden de aparición"""
+    index = index or build_index(_read(html_path))
+    refs = []
+    for el in index.elements:
+        attrs = el.attrs
+        if el.tag == 'script' and attrs.get('src'):
+            kind = 'module' if attrs.get('type') == 'module' else 'script'
+            refs.append(Ref(kind, attrs['src'], url_to_path(attrs['src'], html_path, site_dir), el.start, 'src'))
+        elif el.tag == 'link' and attrs.get('href'):
+            rel = (attrs.get('rel') or '').lower().split()
+            if 'stylesheet' in rel:
+                kind = 'stylesheet'
+            elif 'modulepreload' in rel:
+                kind = 'modulepreload'
+            elif 'preload' in rel:
+                kind = 'preload'
+            elif 'icon' in rel or 'apple-touch-icon' in rel:
+                kind = 'icon'
+            else:
+                continue
+            refs.append(Ref(kind, attrs['href'], url_to_path(attrs['href'], html_path, site_dir), el.start, 'href'))
+        elif el.tag in ('img', 'source') and attrs.get('src'):
+            refs.append(Ref('image', attrs['src'], url_to_path(attrs['src'], html_path, site_dir), el.start, 'src'))
+    return refs
+
+
+def js_imports(js_path, site_dir=SITE_DIR, source=None):
+    """Imports de un módulo JS: estáticos, re-exports e import() con literal"""
+    source = _read(js_path) if source is None else source
+    imports = []
+    for m in _STATIC_IMPORT_RE.finditer(source):
+        spec = m.group(2) or m.group(4)
+        start = m.start(2) if m.group(2) else m.start(4)
+        imports.append(Import(spec, url_to_path(spec, js_path, site_dir), False, start))
+    for m in _DYNAMIC_IMPORT_RE.finditer(source):
+        spec = m.group(3)
+        imports.append(Import(spec, url_to_path(spec, js_path, site_dir), True, m.start(3), bool(m.group(1))))
+    imports.sort(key=lambda imp: imp.offset)
+    return imports
+
+
+def css_imports(css_path, site_dir=SITE_DIR, source=None):
+    """Referencias de una hoja de estilos: @import 'x.css' y url(...) (sin data:)"""
+    source = _read(css_path) if source is None else source
+    imports = []
+    for m in _CSS_IMPORT_RE.finditer(source):
+        imports.append(Import(m.group(2), url_to_path(m.group(2), css_path, site_dir), False, m.start(2)))
+    for m in CSS_URL_RE.finditer(source):
+        group = 2 if m.group(2) is not None else 3
+        url = m.group(group)
+        if is_local(url):
+            imports.append(Import(url, url_to_path(url, css_path, site_dir), False, m.start(group)))
+    imports.sort(key=lambda imp: imp.offset)
+    return imports
+
+
+def js_partials(js_path, site_dir=SITE_DIR, source=None):
+    """Partials HTML que un módulo descarga con fetch('/partials/...')"""
+    source = _read(js_path) if source is None else source
+    return [url_to_path(m.group(2), js_path, site_dir) for m in _PARTIAL_FETCH_RE.finditer(source)]
+
+
+def follows(imp, include_dynamic=False):
+    """¿El import forma parte de la carga inicial del módulo?"""
+    return not imp.dynamic or imp.eager or include_dynamic
+
+
+def module_graph(entries, site_dir=SITE_DIR, include_dynamic=False):
+    """
+    Cierre transitivo de imports desde ``entries`` (rutas de módulos).
+
+    Devuelve {ruta: [Import, ...]} en orden de descubrimiento (DFS).
+    Los imports a archivos que no existen se conservan pero no se recorren;
+    los import() solo se siguen si están marcados como eager o con
+    ``include_dynamic``.
+    """
+    graph = {}
+    stack = list(reversed(entries))
+    while stack:
+        path = stack.pop()
+        if path in graph or not path or not os.path.isfile(path):
+            continue
+        imports = js_imports(path, site_dir)
+        graph[path] = imports
+        for imp in reversed(imports):
+            if imp.path and follows(imp, include_dynamic) and imp.path not in graph:
+                stack.append(imp.path)
+    return graph
+
+
+def page_modules(html_path, site_dir=SITE_DIR, include_dynamic=False):
+    """Grafo de módulos de una página (a partir de sus <script type=module>)"""
+    entries = [ref.path for ref in page_refs(html_path, site_dir) if ref.kind == 'module' and ref.path]
+    return module_graph(entries, site_dir, include_dynamic)
+
+
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf', '.eot')
+_FONT_SRC_RE = re.compile(r'\bsrc\s*:([^;}]*)')
+
+
+def _font_fallbacks(source):
+    """Offsets de las url() de src: que solo se descargan si falla la primera"""
+    skipped = set()
+    for m in _FONT_SRC_RE.finditer(source):
+        urls = list(CSS_URL_RE.finditer(source, m.start(1), m.end(1)))
+        skipped.update(u.start(2) if u.group(2) is not None else u.start(3) for u in urls[1:])
+    return skipped
+
+
+def page_assets(html_path, site_dir=SITE_DIR):
+    """
+    Todo lo que descarga una página, sin repetir y en orden de descubrimiento.
+
+    Devuelve [(ruta, tipo, profundidad)] con tipo 'html', 'stylesheet',
+    'font', 'image', 'script', 'module', 'partial'... La profundidad es el
+    número de saltos desde el HTML (módulos importados, @import, url()).
+    En @font-face solo cuenta el primer formato de cada src.
+    """
+    assets = {}
+
+    def add(path, kind, depth):
+        if not path or path in assets or not os.path.isfile(path):
+            return False
+        assets[path] = (kind, depth)
+        return True
+
+    def add_css(path, depth):
+        if not add(path, 'stylesheet', depth):
+            return
+        source = _read(path)
+        fallbacks = _font_fallbacks(source)
+        for imp in css_imports(path, site_dir, source):
+            if imp.offset in fallbacks:
+                continue
+            if imp.path and imp.path.endswith('.css'):
+                add_css(imp.path, depth + 1)
+            else:
+                kind = 'font' if imp.specifier.split('?')[0].endswith(FONT_EXTENSIONS) else 'image'
+                add(imp.path, kind, depth + 1)
+
+    source = _read(html_path)
+    index = build_index(source)
+    add(html_path, 'html', 0)
+    entries = []
+    for ref in page_refs(html_path, site_dir, index):
+        if ref.kind in ('module', 'modulepreload'):
+            entries.append(ref.path)
+        elif ref.kind == 'stylesheet':
+            add_css(ref.path, 1)
+        else:
+            add(ref.path, ref.kind, 1)
+    for el in index.by_tag('script'):
+        if el.attrs.get('type') == 'module' and 'src' not in el.attrs:
+            entries.extend(imp.path for imp in js_imports(html_path, site_dir, index.inner_html(el))
+                           if follows(imp))
+
+    # Profundidad de cada módulo: nivel BFS desde las entradas
+    graph = module_graph([e for e in entries if e], site_dir)
+    level = {path: 1 for path in entries if path in graph}
+    queue = list(level)
+    while queue:
+        path = queue.pop(0)
+        for imp in graph[path]:
+            if imp.path in graph and follows(imp) and imp.path not in level:
+                level[imp.path] = level[path] + 1
+                queue.append(imp.path)
+    for path in graph:
+        add(path, 'module', level.get(path, 1))
+        for partial in js_partials(path, site_dir):
+            add(partial, 'partial', level.get(path, 1) + 1)
+
+    return [(path, kind, depth) for path, (kind, depth) in assets.items()]
+
+
+def section_pages(site_dir=SITE_DIR):
+    """Páginas de site/secciones en orden alfabético"""
+    folder = os.path.join(site_dir, 'secciones')
+    return [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.endswith('.html')]
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reduce Font Awesome a los iconos que usa el sitio
+
+Uso:
+    python subset_fontawesome.py                 # genera subset.min.css y reescribe las páginas
+    python subset_fontawesome.py --check         # solo informa
+    python subset_fontawesome.py --keep fa-flag- # conserva también un prefijo construido en JS
+
+Busca clases fa-* en los atributos class del HTML y en las cadenas de los
+módulos JS (también las de plantillas con HTML dentro), y glifos usados
+directamente desde el CSS del sitio (content: '\\f078' con font-family
+Font Awesome). Con eso escribe css/subset.min.css a partir de all.min.css:
+
+  - reglas de icono (.fa-x:before{content:...}) solo para los iconos usados
+    (y solo con los alias usados)
+  - reglas de utilidades (.fa-spin, .fa-fw, tamaños...) solo si se usan;
+    las que no nombran ninguna clase fa-* (:root, .sr-only) se quedan
+  - los @keyframes que usan las reglas que quedan
+  - los @font-face de los estilos con algún glifo usado (sin los de
+    compatibilidad con v4/v5)
+
+Cada icono va al estilo de las clases que lo acompañan (fas/fa-solid,
+far/fa-regular; por defecto sólido); los de marca, al de marcas. El
+manifiesto de glifos (--manifest) lista por estilo la fuente, los iconos y
+sus codepoints, listo para un subsetter. Si fontTools y brotli están
+instalados, además genera webfonts/subset/*.woff2 con solo esos glifos.
+
+Las clases que se construyen en JS (`fa-${nombre}`, 'fa-' + x) no se pueden
+resolver: sus prefijos tienen que estar en DYNAMIC_PREFIXES (o en --keep).
+Si aparece una construcción sin prefijo autorizado no se escribe nada.
+
+Se ejecuta en deploy antes de fingerprint_assets.py, que versiona la hoja nueva.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import sys
+import time
+
+from build_cache import atomic_write, atomic_write_text
+from build_i18n_bundles import page_paths
+from critical_css import JS_STRING_RE, compact_css, parse_css, split_selectors
+from site_graph import SITE_DIR, site_url
+
+try:
+    from fontTools import subset as ft_subset
+    import brotli  # noqa: F401  (fontTools lo necesita para escribir woff2)
+except ImportError:
+    ft_subset = None
+
+FA_DIR = os.path.join(SITE_DIR, 'vendor', 'fontawesome-6.4.0')
+FULL_CSS = os.path.join(FA_DIR, 'css', 'all.min.css')
+SUBSET_CSS = os.path.join(FA_DIR, 'css', 'subset.min.css')
+SUBSET_FONTS_DIR = os.path.join(FA_DIR, 'webfonts', 'subset')
+MANIFEST_PATH = os.path.join('.build-cache', 'fontawesome-glyphs.json')
+SKIP_DIRS = {'vendor', 'i18n', 'localized'}
+
+# Prefijos de clases de icono que se construyen en tiempo de ejecución (p. ej. 'fa-flag-')
+DYNAMIC_PREFIXES = ()
+
+STYLE_CLASSES = {
+    'fas': 'solid', 'fa-solid': 'solid',
+    'far': 'regular', 'fa-regular': 'regular',
+    'fab': 'brands', 'fa-brands': 'brands',
+}
+# Estilo de cada fuente según su nombre de archivo
+FONT_STYLES = {'fa-solid-900': 'solid', 'fa-regular-400': 'regular', 'fa-brands-400': 'brands'}
+
+_CLASS_ATTR_RE = re.compile(r'''\bclass\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+_FA_TOKEN_RE = re.compile(r'(?<![\w-])(fa[bsr]?|fa-[a-z0-9]+(?:-[a-z0-9]+)*)(?![\w-])')
+_FA_CLASS_RE = re.compile(r'\.(fa[bsr]?|fa-[a-z0-9-]+)(?![\w-])')
+_DYNAMIC_RE = re.compile(r'''(?<![\w-])(fa-[a-z0-9-]*)(?:\$\{|['"`]\s*\+)''')
+_ICON_SELECTOR_RE = re.compile(r'^\.(fa-[a-z0-9-]+)::?before$')
+_CONTENT_RE = re.compile(r'''content\s*:\s*(["'])((?:\\.|(?!\1).)*)\1''')
+_FONT_WEIGHT_RE = re.compile(r'font-weight\s*:\s*(\d+|bold|normal)')
+_FAMILY_RE = re.compile(r'''font-family\s*:\s*([^;}]*)''')
+_SRC_STEM_RE = re.compile(r'url\([^)]*?([\w-]+)\.woff2')
+_KEYFRAMES_NAME_RE = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+_LICENSE_RE = re.compile(r'^\s*/\*!.*?\*/', re.S)
+_CSS_ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?|\\(.)')
+_LINK_RE = re.compile(r'''(<link\b[^>]*\bhref\s*=\s*["']?)([^"'\s>]*/)all\.min\.css(?=[?"'\s>])''')
+
+
+def css_string(value):
+    """Valor de una cadena CSS con sus escapes resueltos ('\\f015' → '\uf015')"""
+    return _CSS_ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)) if m.group(1) else m.group(2), value)
+
+
+# --- catálogo de iconos ------------------------------------------------------
+
+def icon_catalog(rules):
+    """
+    {clase: (codepoint, es de marca)} de las reglas .fa-x:before{content:"..."}.
+
+    En all.css los iconos de marca van justo después del @font-face de
+    "Font Awesome 6 Brands" y hasta el siguiente :root.
+    """
+    icons = {}
+    brands = False
+    for rule in rules:
+        if rule.kind == 'font-face':
+            family = _FAMILY_RE.search(rule.body or '')
+            brands = bool(family and 'Brands' in family.group(1))
+        elif rule.kind == 'style' and rule.prelude.startswith(':host'):
+            brands = False
+        elif rule.kind == 'style':
+            content = _CONTENT_RE.search(rule.body or '')
+            selectors = [_ICON_SELECTOR_RE.match(s) for s in split_selectors(rule.prelude)]
+            if content and selectors and all(selectors):
+                text = css_string(content.group(2))
+                for m in selectors:
+                    icons[m.group(1)] = (ord(text[0]) if len(text) == 1 else None, brands)
+    return icons
+
+
+# --- uso en el sitio ---------------------------------------------------------
+
+def site_sources(site_dir=SITE_DIR):
+    for dirpath, dirnames, filenames in os.walk(site_dir):
+        dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+        for name in sorted(filenames):
+            if name.endswith(('.html', '.js', '.mjs', '.css')):
+                yield os.path.join(dirpath, name)
+
+
+def class_groups(path, source):
+    """Grupos de clases que van juntas: atributos class del HTML y cadenas JS"""
+    if path.endswith('.html'):
+        return [m.group(1) if m.group(1) is not None else m.group(2) for m in _CLASS_ATTR_RE.finditer(source)]
+    if path.endswith(('.js', '.mjs')):
+        return [m.group(2) for m in JS_STRING_RE.finditer(source) if 'fa' in m.group(2)]
+    return []
+
+
+def css_glyphs(source):
+    """[(estilo, codepoint)] de reglas del sitio que pintan un glifo de Font Awesome"""
+    glyphs = []
+    for rule in parse_css(source):
+        for style_rule in ([rule] if rule.kind == 'style' else rule.children or []):
+            body = style_rule.body or ''
+            family = _FAMILY_RE.search(body)
+            content = _CONTENT_RE.search(body)
+            if not (family and content and 'Font Awesome' in family.group(1)):
+                continue
+            text = css_string(content.group(2))
+            weight = _FONT_WEIGHT_RE.search(body)
+            if 'Brands' in family.group(1):
+                style = 'brands'
+            else:
+                style = 'regular' if weight and weight.group(1) in ('400', 'normal') else 'solid'
+            glyphs.extend((style, ord(ch)) for ch in text)
+    return glyphs
+
+
+def scan_usage(icons, files, prefixes):
+    """
+    Recorre el sitio y devuelve un dict con:
+      classes:  clases fa-* usadas (iconos, utilidades y estilos)
+      glyphs:   {estilo: {codepoint: {iconos}}}
+      dynamic:  [(archivo, prefijo)] construcciones sin prefijo autorizado
+    """
+    classes = set()
+    glyphs = {}
+    dynamic = []
+
+    def add(style, codepoint, name):
+        glyphs.setdefault(style, {}).setdefault(codepoint, set()).add(name)
+
+    def add_icon(name, styles):
+        codepoint, brand = icons[name]
+        if codepoint is None:
+            return
+        for style in (['brands'] if brand else styles):
+            add(style, codepoint, name[3:])
+
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        if path.endswith('.css'):
+            for style, codepoint in css_glyphs(source):
+                name = next((n for n, (cp, _) in icons.items() if cp == codepoint), None)
+                add(style, codepoint, name[3:] if name else f'U+{codepoint:04X}')
+            continue
+        for group in class_groups(path, source):
+            tokens = set(_FA_TOKEN_RE.findall(group))
+            if not tokens:
+                continue
+            classes |= tokens
+            styles = sorted({STYLE_CLASSES[t] for t in tokens if t in STYLE_CLASSES} - {'brands'}) or ['solid']
+            for name in tokens & icons.keys():
+                add_icon(name, styles)
+        if path.endswith(('.js', '.mjs')):
+            for prefix in _DYNAMIC_RE.findall(source):
+                if not prefix.startswith(tuple(prefixes)) and prefix not in STYLE_CLASSES:
+                    dynamic.append((path, prefix))
+
+    for name in icons:
+        if name.startswith(tuple(prefixes)):
+            classes.add(name)
+            add_icon(name, ['solid'])
+    return {'classes': classes, 'glyphs': glyphs, 'dynamic': dynamic}
+
+
+# --- hoja reducida -----------------------------------------------------------
+
+def _keep_selector(selector, classes):
+    return all(name in classes for name in _FA_CLASS_RE.findall(selector))
+
+
+def subset_rules(rules, icons, classes):
+    """Reglas de estilo (con sus @media) que sobreviven, como texto CSS compacto"""
+    out = []
+    for rule in rules:
+        if rule.kind == 'style':
+            kept = [s for s in split_selectors(rule.prelude) if _keep_selector(s, classes)]
+            if kept:
+                out.append(f"{compact_css(','.join(kept), selector=True)}{{{compact_css(rule.body)}}}")
+        elif rule.children is not None:
+            inner = subset_rules(rule.children, icons, classes)
+            if inner:
+                out.append(f'{compact_css(rule.prelude)}{{{inner}}}')
+    return ''.join(out)
+
+
+def font_face_style(rule):
+    m = _SRC_STEM_RE.search(rule.body or '')
+    return FONT_STYLES.get(m.group(1)) if m else None
+
+
+def build_subset(source, icons, usage, font_urls=None):
+    """CSS reducido: licencia, @font-face necesarios, reglas usadas y sus @keyframes"""
+    rules = parse_css(source)
+    styles = set(usage['glyphs'])
+    body = subset_rules(rules, icons, usage['classes'])
+
+    faces = []
+    keyframes = []
+    for rule in rules:
+        if rule.kind == 'font-face':
+            family = _FAMILY_RE.search(rule.body)
+            name = family.group(1).strip() if family else ''
+            style = font_face_style(rule)
+            if style in styles and name and name in body:
+                css = compact_css(rule.body)
+                if font_urls and style in font_urls:
+                    css = re.sub(r'src\s*:[^;}]*', f'src:url({font_urls[style]}) format("woff2")', css)
+                faces.append(f'@font-face{{{css}}}')
+        elif rule.kind.endswith('keyframes'):
+            name = _KEYFRAMES_NAME_RE.match(rule.prelude)
+            if name and re.search(r'\b' + re.escape(name.group(1)) + r'\b', body):
+                keyframes.append(f'{compact_css(rule.prelude)}{{{compact_css(rule.body)}}}')
+
+    license_comment = _LICENSE_RE.match(source)
+    head = license_comment.group(0).strip() + '\n' if license_comment else ''
+    return head + ''.join(faces) + body + ''.join(keyframes) + '\n'
+
+
+def glyph_manifest(usage):
+    manifest = {}
+    for style, glyphs in sorted(usage['glyphs'].items()):
+        stem = next(stem for stem, s in FONT_STYLES.items() if s == style)
+        manifest[style] = {
+            'font': f'webfonts/{stem}.woff2',
+            'codepoints': [f'{cp:04x}' for cp in sorted(glyphs)],
+            'icons': sorted({name for names in glyphs.values() for name in names}),
+        }
+    return manifest
+
+
+def subset_fonts(manifest, output_dir=SUBSET_FONTS_DIR):
+    """Fuentes woff2 con solo los glifos del manifiesto; devuelve {estilo: url relativa a css/}"""
+    urls = {}
+    for style, info in manifest.items():
+        source = os.path.join(FA_DIR, info['font'])
+        target = os.path.join(output_dir, os.path.basename(info['font']))
+        options = ft_subset.Options()
+        options.flavor = 'woff2'
+        font = ft_subset.load_font(source, options)
+        subsetter = ft_subset.Subsetter(options)
+        subsetter.populate(unicodes=[int(cp, 16) for cp in info['codepoints']])
+        subsetter.subset(font)
+        os.makedirs(output_dir, exist_ok=True)
+        ft_subset.save_font(font, target, options)
+        urls[style] = f'../webfonts/subset/{os.path.basename(target)}'
+    return urls
+
+
+def rewrite_pages(pages, check=False):
+    """Cambia all.min.css por subset.min.css en los <link>; devuelve las páginas que usan la hoja reducida"""
+    linked = []
+    for path in pages:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+        output = _LINK_RE.sub(lambda m: m.group(1) + m.group(2) + os.path.basename(SUBSET_CSS), source)
+        if output != source and not check:
+            atomic_write_text(path, output)
+        if site_url(SUBSET_CSS) in output:
+            linked.append(path)
+    return linked
+
+
+# --- informe -----------------------------------------------------------------
+
+def _gz(data):
+    return len(gzip.compress(data, 9))
+
+
+def report(full, subset, manifest, usage, fonts_before, fonts_after, pages, check, elapsed):
+    print("=" * 72)
+    print("FONT AWESOME: SUBCONJUNTO DE ICONOS USADOS")
+    print("=" * 72)
+    icons = sum(len(info['icons']) for info in manifest.values())
+    print(f"Clases fa-* usadas: {len(usage['classes'])}   iconos: {icons}")
+    for style, info in manifest.items():
+        print(f"   {style:<8} {len(info['codepoints']):>4} glifos  ({info['font']})")
+    print(f"{'':<24} {'Antes':>10} {'Después':>10} {'gzip antes':>11} {'gzip desp.':>11}")
+    print(f"{'Hoja de estilos':<24} {len(full):>10,} {len(subset):>10,} {_gz(full):>11,} {_gz(subset):>11,}")
+    print(f"{'Fuentes (woff2)':<24} {fonts_before:>10,} {fonts_after:>10,}")
+    if ft_subset is None:
+        print("➖ Sin fontTools/brotli: se usan las fuentes completas de los estilos necesarios "
+              "(con pip install fonttools brotli se reducen a los glifos del manifiesto)")
+    print("=" * 72)
+    verb = 'usarían' if check else 'usan'
+    print(f"{'Modo consulta: no se ha escrito nada. ' if check else ''}"
+          f"{len(pages)} páginas {verb} {site_url(SUBSET_CSS)}   ⏱️  {elapsed * 1000:.1f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reduce Font Awesome a los iconos que usa el sitio")
+    parser.add_argument('--check', action='store_true', help="No escribe: solo informa")
+    parser.add_argument('--keep', action='append', default=[], metavar='PREFIJO',
+                        help="Prefijo de clases de icono construidas en JS (repetible)")
+    parser.add_argument('--manifest', default=MANIFEST_PATH, help="Dónde escribir el manifiesto de glifos")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    with open(FULL_CSS, 'r', encoding='utf-8') as f:
+        source = f.read()
+    icons = icon_catalog(parse_css(source))
+    usage = scan_usage(icons, list(site_sources()), DYNAMIC_PREFIXES + tuple(args.keep))
+    if usage['dynamic']:
+        print("❌ Clases de icono construidas en JS sin prefijo en DYNAMIC_PREFIXES (o --keep):")
+        for path, prefix in usage['dynamic']:
+            print(f"   - {path}: {prefix}…")
+        return 1
+
+    manifest = glyph_manifest(usage)
+    font_urls = None
+    if ft_subset is not None and not args.check:
+        font_urls = subset_fonts(manifest)
+    subset = build_subset(source, icons, usage, font_urls).encode('utf-8')
+
+    fonts_before = sum(os.path.getsize(os.path.join(FA_DIR, 'webfonts', f'{stem}.woff2')) for stem in FONT_STYLES)
+    if font_urls:
+        fonts_after = sum(os.path.getsize(os.path.join(SUBSET_FONTS_DIR, os.path.basename(info['font'])))
+                          for info in manifest.values())
+    else:
+        fonts_after = sum(os.path.getsize(os.path.join(FA_DIR, info['font'])) for info in manifest.values())
+
+    if not args.check:
+        atomic_write(SUBSET_CSS, subset)
+        atomic_write_text(args.manifest, json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+    pages = rewrite_pages(page_paths(), args.check)
+    report(source.encode('utf-8'), subset, manifest, usage, fonts_before, fonts_after, pages, args.check,
+           time.perf_counter() - start)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Parser CSS, selectores y primera pantalla de critical_css.py"""
+
+import pytest
+
+import critical_css as cc
+from build_cache import Manifest
+
+
+def flatten(rules, depth=0):
+    """[(profundidad, tipo, preludio, cuerpo)] en orden de documento"""
+    out = []
+    for rule in rules:
+        out.append((depth, rule.kind, rule.prelude, rule.body))
+        if rule.children is not None:
+            out.extend(flatten(rule.children, depth + 1))
+    return out
+
+
+def test_parse_css_nested_grouping_rules():
+    rules = cc.parse_css('''
+        @supports (display: grid) {
+          @media (min-width: 10px) { .a { color: red } }
+          .b { color: blue }
+        }
+        @media print { @supports (x: y) { .c { top: 0 } } }
+        .d { left: 0 }
+    ''')
+    assert [(d, k, p) for d, k, p, _ in flatten(rules)] == [
+        (0, 'supports', '@supports (display: grid)'),
+        (1, 'media', '@media (min-width: 10px)'),
+        (2, 'style', '.a'),
+        (1, 'style', '.b'),
+        (0, 'media', '@media print'),
+        (1, 'supports', '@supports (x: y)'),
+        (2, 'style', '.c'),
+        (0, 'style', '.d'),
+    ]
+    assert [r.prelude for r in cc.iter_style_rules(rules)] == ['.a', '.b', '.c', '.d']
+    # Los índices son únicos aunque las reglas estén anidadas
+    indices = [r.index for r in cc.iter_style_rules(rules)]
+    assert len(set(indices)) == len(indices)
+
+
+def test_parse_css_ignores_braces_and_semicolons_in_strings_and_comments():
+    rules = cc.parse_css('''
+        @charset "utf-8";
+        @import url("x;y.css");
+        /* .z { } ; */
+        .b::after { content: "}{;"; }
+        .q::before { content: '\\'}' }
+        [data-x="{"], .c { color: blue; }
+        .d { background: url('a}b.png') }
+        .e { /* } */ color: red }
+    ''')
+    assert [(k, p) for _, k, p, _ in flatten(rules)] == [
+        ('charset', '@charset "utf-8"'),
+        ('import', '@import url("x;y.css")'),
+        ('style', '.b::after'),
+        ('style', ".q::before"),
+        ('style', '[data-x="{"], .c'),
+        ('style', '.d'),
+        ('style', '.e'),
+    ]
+    bodies = [body.strip() for *_, body in flatten(rules) if body]
+    assert bodies[0] == 'content: "}{;";'
+    assert bodies[3] == "background: url('a}b.png')"
+
+
+def test_parse_css_unclosed_block_stops_at_end():
+    rules = cc.parse_css('.a { color: red } @media print { .b { top: 0 }')
+    assert [(d, k, p) for d, k, p, _ in flatten(rules)] == [
+        (0, 'style', '.a'), (0, 'media', '@media print'), (1, 'style', '.b')]
+
+
+def test_split_selectors_respects_parentheses_and_strings():
+    assert cc.split_selectors('a, b:is(c, d), [x=","] , e') == ['a', 'b:is(c, d)', '[x=","]', 'e']
+
+
+@pytest.mark.parametrize('selector,classes,ids', [
+    (r'.md\:flex', ['md:flex'], []),
+    (r'.w-1\/2', ['w-1/2'], []),
+    (r'.\31 0x', ['10x'], []),
+    (r'.a\ b', ['a b'], []),
+    (r'#\31 0.c', ['c'], ['10']),
+])
+def test_parse_selector_unescapes_names(selector, classes, ids):
+    [(_, compound)] = cc.parse_selector(selector)
+    assert compound['classes'] == classes
+    assert compound['ids'] == ids
+
+
+def test_parse_selector_combinators():
+    steps = cc.parse_selector('nav.top > ul  li.item+a ~ span')
+    assert [c for c, _ in steps] == [' ', '>', ' ', '+', '~']
+    assert steps[0][1]['tag'] == 'nav' and steps[0][1]['classes'] == ['top']
+    assert steps[2][1]['tag'] == 'li' and steps[2][1]['classes'] == ['item']
+    assert cc.parse_selector('a>b')[1][0] == '>'
+
+
+def test_parse_selector_attributes_and_root():
+    [(_, compound)] = cc.parse_selector('input[type="email" i][data-x]:root')
+    assert compound['tag'] == 'input'
+    assert compound['attrs'] == [('type', '=', 'email', True), ('data-x', None, None, False)]
+    assert compound['root'] is True
+
+
+def make_dom(markup):
+    dom = cc.Dom()
+    dom.add_source(markup)
+    cc.mark_first_view(dom)
+    return dom
+
+
+def matches(dom, selector):
+    steps = cc.parse_selector(selector)
+    return [n.id for n in dom.candidates(steps[-1][1]) if cc.selector_matches(n, steps)]
+
+
+def test_selector_matches_child_and_descendant():
+    dom = make_dom('<div class="a"><p class="b"><span id="s" class="c"></span></p></div>'
+                   '<div class="md:flex"><i id="i" class="c"></i></div>')
+    assert matches(dom, '.a .c') == ['s']
+    assert matches(dom, '.a > .c') == []
+    assert matches(dom, '.a > p > .c') == ['s']
+    assert matches(dom, '.a > .b .c') == ['s']
+    assert matches(dom, 'div .c') == ['s', 'i']
+    assert matches(dom, r'.md\:flex > .c') == ['i']
+    assert matches(dom, '.b > .a .c') == []
+
+
+def test_first_view_is_header_sidebar_and_first_block():
+    dom = make_dom('''<html><body>
+        <header id="h"><a id="logo"></a></header>
+        <div id="sidebarContainer"><ul id="nav-items"></ul></div>
+        <main id="m">
+          <div id="gradient"></div>
+          <section id="hero"><h1 id="title"></h1></section>
+          <section id="faq"><p id="answer"></p></section>
+        </main>
+        <footer id="f"></footer>
+        <div id="modal" class="modal"><p id="in-modal"></p></div>
+    </body></html>''')
+    marked = {n.id for n in dom.nodes if n.first_view and n.id}
+    assert marked == {'h', 'logo', 'sidebarContainer', 'nav-items', 'm', 'gradient', 'hero', 'title'}
+    assert cc.classify_selector('#title', dom, set()) == 'critical'
+    assert cc.classify_selector('#answer', dom, set()) == 'below'
+    assert cc.classify_selector('#in-modal', dom, set()) == 'js'
+    assert cc.classify_selector('.toast', dom, {'toast'}) == 'js'
+    assert cc.classify_selector('.nowhere', dom, set()) == 'unused'
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    root = tmp_path / 'site'
+    (root / 'css').mkdir(parents=True)
+    (root / 'css' / 'a.css').write_text(
+        '.top { color: red } .later { color: blue } @media print { .top { color: black } }', encoding='utf-8')
+    page = root / 'index.html'
+    page.write_text('<!doctype html>\n<html><head>\n    <link rel="stylesheet" href="/css/a.css">\n'
+                    '</head><body><header class="top"></header><main><p>x</p></main>'
+                    '<footer><p class="later"></p></footer></body></html>\n', encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+    return root, page
+
+
+def run(root, page, **kwargs):
+    manifest = Manifest(directory=str(root.parent / 'manifest'))
+    return cc.process_page(str(page), manifest, cc._Sheets(), cc._Words(), site_dir=str(root), **kwargs)
+
+
+def test_process_page_and_undo_are_idempotent(site):
+    root, page = site
+    original = page.read_text(encoding='utf-8')
+    result = run(root, page)
+    first = page.read_text(encoding='utf-8')
+    assert result['written'] and not result['blocking']
+    assert '<style>.top{color:red}@media print{.top{color:black}}</style>' in first
+    assert '.later' not in first.split(cc.BLOCK_END)[0]
+    assert 'data-critical="deferred"' in first
+
+    assert cc.undo(first) == original
+    assert cc.undo(cc.undo(first)) == original
+    assert cc.undo(original) == original
+
+    assert not run(root, page, use_cache=False)['written']
+    assert page.read_text(encoding='utf-8') == first
+
+
+def test_process_page_over_cap_keeps_blocking_links(site, monkeypatch):
+    root, page = site
+    original = page.read_text(encoding='utf-8')
+    run(root, page)
+    monkeypatch.setattr(cc, 'CRITICAL_MAX_BYTES', 10)
+    result = run(root, page, use_cache=False)
+    assert result['blocking'] and result['written']
+    assert page.read_text(encoding='utf-8') == original
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Modo batch: aplica las reglas data-i18n a todas las páginas del sitio en paralelo
+
+Uso:
+    python translate_batch.py                                   # globs por defecto
+    python translate_batch.py "site/secciones/*.html" --jobs 4
+    python translate_batch.py "site/partials/*.html" --rules sidebar.html=info
+    python translate_batch.py --rules "*.html=candidates"       # catálogo de i18n_extract.py
+    python translate_batch.py --dry-run                         # no escribe nada
+    python translate_batch.py --force                           # ignora la caché
+"""
+
+import argparse
+import fnmatch
+import glob
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from build_cache import Manifest, atomic_write_text, fingerprint, sha256_bytes
+
+DEFAULT_GLOBS = [
+    os.path.join('site', '*.html'),
+    os.path.join('site', 'secciones', '*.html'),
+    os.path.join('site', 'partials', '*.html'),
+]
+
+# Reglas por página (patrón fnmatch sobre el nombre del archivo → reglas en orden)
+PAGE_RULES = {
+    'info.html': ('info-complete',),
+}
+
+I18N_ATTR_RE = re.compile(r'data-i18n(?:-[a-z-]+)?=')
+
+CACHE_STAGE = 'translate'
+
+
+def _rule_sets():
+    """Registro de reglas disponibles (nombre → (función contenido → contenido, tabla))"""
+    from i18n_annotator import RuleTable, annotate, load_rules
+    from i18n_extract import CANDIDATES_PATH
+    from translate_info_complete import INFO_RULES, annotate_info
+    from translate_info_html import MATCHER, TRANSLATIONS
+
+    available = {
+        'info': (MATCHER.sub, TRANSLATIONS),
+        'info-complete': (annotate_info, INFO_RULES),
+    }
+    # Catálogo de i18n_extract.py (revisado a mano antes de aplicarlo)
+    if os.path.exists(CANDIDATES_PATH):
+        candidates = load_rules(CANDIDATES_PATH)
+        table = RuleTable(candidates)
+        available['candidates'] = (lambda content: annotate(content, table)[0], candidates)
+    return available
+
+
+def rules_fingerprint(rules, available=None):
+    """Hash de las tablas de reglas que se aplican a una página"""
+    available = available or _rule_sets()
+    return fingerprint([(name, available[name][1]) for name in rules])
+
+
+def rules_for(path, page_rules):
+    """Reglas que aplican a ``path`` según su nombre de archivo"""
+    name = os.path.basename(path)
+    for pattern, rules in page_rules.items():
+        if fnmatch.fnmatch(name, pattern):
+            return tuple(rules)
+    return ()
+
+
+def process_file(path, rules, dry_run=False):
+    """Aplica ``rules`` a un archivo y devuelve un resumen (se ejecuta en el pool)"""
+    start = time.perf_counter()
+    available = _rule_sets()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        original = f.read()
+
+    content = original
+    for name in rules:
+        content = available[name][0](content)
+
+    changed = content != original
+    if changed and not dry_run:
+        atomic_write_text(path, content)
+
+    return {
+        'path': path,
+        'rules': rules,
+        'changed': changed,
+        'cached': False,
+        'input': sha256_bytes(original.encode('utf-8')),
+        'output': sha256_bytes(content.encode('utf-8')),
+        'bytes_in': len(original.encode('utf-8')),
+        'bytes_out': len(content.encode('utf-8')),
+        'attrs_added': len(I18N_ATTR_RE.findall(content)) - len(I18N_ATTR_RE.findall(original)),
+        'ms': (time.perf_counter() - start) * 1000,
+    }
+
+
+def expand_globs(patterns):
+    """Expande los globs sin duplicados, en orden estable"""
+    seen = {}
+    for pattern in patterns:
+        for path in sorted(glob.glob(pattern)):
+            seen.setdefault(os.path.normpath(path), None)
+    return list(seen)
+
+
+def _cached_result(path, rules, size):
+    return {
+        'path': path, 'rules': rules, 'changed': False, 'cached': True,
+        'bytes_in': size, 'bytes_out': size, 'attrs_added': 0, 'ms': 0.0,
+    }
+
+
+def run_batch(patterns=None, page_rules=None, jobs=None, dry_run=False, force=False):
+    """
+    Procesa las páginas en un pool de procesos y devuelve los resúmenes.
+
+    Las páginas cuyo contenido y reglas coinciden con el manifiesto se saltan
+    sin arrancar el pool.
+    """
+    page_rules = PAGE_RULES if page_rules is None else page_rules
+    available = _rule_sets()
+    unknown = {name for rules in page_rules.values() for name in rules} - set(available)
+    if unknown:
+        raise ValueError(f"Reglas desconocidas: {', '.join(sorted(unknown))}")
+
+    paths = expand_globs(patterns or DEFAULT_GLOBS)
+    tasks = [(path, rules_for(path, page_rules)) for path in paths]
+
+    manifest = Manifest()
+    fingerprints = {}
+    results = {}
+    pending = []
+    for path, rules in tasks:
+        if not rules:
+            continue
+        if rules not in fingerprints:
+            fingerprints[rules] = rules_fingerprint(rules, available)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not force and manifest.is_fresh(CACHE_STAGE, path, sha256_bytes(data), fingerprints[rules]):
+            results[path] = _cached_result(path, rules, len(data))
+        else:
+            pending.append((path, rules))
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(process_file, path, rules, dry_run) for path, rules in pending]
+            for future in futures:
+                r = future.result()
+                results[r['path']] = r
+                if not dry_run:
+                    manifest.record(CACHE_STAGE, r['path'], r['input'], r['output'],
+                                    fingerprints[r['rules']])
+
+    if not dry_run:
+        manifest.prune(CACHE_STAGE)
+        manifest.save()
+
+    ordered = [results[path] for path, rules in tasks if rules]
+    skipped = [path for path, rules in tasks if not rules]
+    return ordered, skipped
+
+
+def print_summary(results, skipped, elapsed):
+    """Imprime el resumen por archivo y el tiempo total"""
+    print("=" * 60)
+    print("TRADUCCIÓN BATCH")
+    print("=" * 60)
+    for r in results:
+        if r['cached']:
+            print(f"💾 {r['path']}  [{', '.join(r['rules'])}]  sin cambios (caché)")
+            continue
+        icon = '✅' if r['changed'] else '➖'
+        print(f"{icon} {r['path']}  [{', '.join(r['rules'])}]  "
+              f"+{r['attrs_added']} atributos  "
+              f"{r['bytes_in']} → {r['bytes_out']} bytes  {r['ms']:.1f} ms")
+    for path in skipped:
+        print(f"⏭️  {path}  (sin reglas)")
+    print("=" * 60)
+    changed = sum(1 for r in results if r['changed'])
+    cached = sum(1 for r in results if r['cached'])
+    print(f"Archivos procesados: {len(results)}  modificados: {changed}  "
+          f"en caché: {cached}  sin reglas: {len(skipped)}")
+    print(f"Tiempo total: {elapsed * 1000:.1f} ms")
+    print("=" * 60)
+
+
+def parse_rules(values):
+    """Convierte ['info.html=info,info-complete', ...] en un dict de reglas"""
+    page_rules = {}
+    for value in values:
+        pattern, _, names = value.partition('=')
+        if not pattern or not names:
+            raise argparse.ArgumentTypeError(f"Formato inválido: {value!r} (usa pagina=regla1,regla2)")
+        page_rules[pattern] = tuple(n.strip() for n in names.split(',') if n.strip())
+    return page_rules
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Traduce en batch las páginas del sitio")
+    parser.add_argument('globs', nargs='*', help="Globs de páginas (por defecto site/*.html, secciones y partials)")
+    parser.add_argument('--rules', action='append', default=[],
+                        help="Reglas por página: pagina.html=regla1,regla2 (reemplaza PAGE_RULES)")
+    parser.add_argument('--jobs', type=int, default=None, help="Número de procesos (por defecto, uno por núcleo)")
+    parser.add_argument('--dry-run', action='store_true', help="No escribe los archivos")
+    parser.add_argument('--force', action='store_true', help="Reprocesa aunque el manifiesto diga que no hay cambios")
+    args = parser.parse_args(argv)
+
+    try:
+        page_rules = parse_rules(args.rules) if args.rules else None
+    except argparse.ArgumentTypeError as e:
+        parser.error(f"--rules: {e}")
+    if page_rules:
+        available = _rule_sets()
+        unknown = {name for rules in page_rules.values() for name in rules} - set(available)
+        if unknown:
+            parser.error(f"--rules: reglas desconocidas: {', '.join(sorted(unknown))} "
+                         f"(disponibles: {', '.join(sorted(available))})"
+                         + ("; 'candidates' necesita ejecutar antes i18n_extract.py" if 'candidates' in unknown else ''))
+
+    start = time.perf_counter()
+    results, skipped = run_batch(args.globs, page_rules, args.jobs, args.dry_run, args.force)
+    print_summary(results, skipped, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,10 @@
 Script para agregar atributos data-i18n al archivo info.html
 """
 
+import re
+
+from build_cache import atomic_write_text
+
 # Mapeo de traducciones
 TRANSLATIONS = {
     # Returns Policy
@@ -109,21 +113,123 @@ TRANSLATIONS = {
     'aria-label="Mostrar panel"': 'data-i18n-aria-label="info.showPanel" aria-label="Mostrar panel"',
 }
 
+
+class MultiReplacer:
+    """
+    Motor de reemplazo multi-patrón construido una sola vez a partir de una
+    tabla {texto: reemplazo}.
+
+    Las claves se compilan en una única expresión regular con forma de trie
+    (la coincidencia más larga gana), de modo que el documento se reescribe
+    en una sola pasada lineal y el coste no crece con el tamaño de la tabla.
+
+    El resultado es idéntico al del bucle secuencial de ``str.replace`` en
+    orden de la tabla. Si la tabla o el documento tienen casos en los que el
+    orden importa (una clave dentro de otra, claves que se solapan en el
+    texto o reemplazos que contienen otras claves) se recurre a ese bucle.
+    """
+
+    def __init__(self, table):
+        self.table = dict(table)
+        self.pattern = re.compile(_trie_regex(self.table)) if self.table else None
+        # La tabla es segura si ningún reemplazo introduce otra clave
+        self.cascade_free = all(
+            self._is_isolated(old, new) for old, new in self.table.items()
+        )
+
+    def _is_isolated(self, old, new):
+        """¿``new`` es un prefijo + ``old`` sin ninguna otra clave dentro?"""
+        if not new.endswith(old):
+            return False
+        offset = len(new) - len(old)
+        return (not self._has_match(new, 0, offset)
+                and self._longest_at(new, offset, len(new) - 1) is None
+                and not self._has_match(new, offset + 1, len(new)))
+
+    def _longest_at(self, text, pos, endpos=None):
+        """Clave más larga que empieza en ``pos`` (o None)"""
+        m = self.pattern.match(text, pos, len(text) if endpos is None else endpos)
+        return m.group() if m else None
+
+    def _has_match(self, text, start, end):
+        """¿Empieza alguna clave en text[start:end]?"""
+        return any(self._longest_at(text, pos) for pos in range(start, end))
+
+    def sub(self, content):
+        """Aplica toda la tabla a ``content`` en una sola pasada"""
+        if self.pattern is None:
+            return content
+        if not self.cascade_free:
+            return self.sub_sequential(content)
+
+        parts = []
+        last = 0
+        for m in self.pattern.finditer(content):
+            start, end = m.span()
+            # Una clave más corta al mismo inicio o una clave que empieza
+            # dentro de esta coincidencia: el orden de la tabla decide
+            if (self._longest_at(content, start, end - 1)
+                    or self._has_match(content, start + 1, end)):
+                return self.sub_sequential(content)
+            parts.append(content[last:start])
+            parts.append(self.table[m.group()])
+            last = end
+        parts.append(content[last:])
+        return ''.join(parts)
+
+    def sub_sequential(self, content):
+        """Bucle original: un ``replace`` por entrada, en orden de la tabla"""
+        for old, new in self.table.items():
+            if old in content:
+                content = content.replace(old, new)
+        return content
+
+
+def _trie_regex(keys):
+    """Compila las claves en una regex con forma de trie (la más larga primero)"""
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[''] = True
+    return _trie_node_regex(trie)
+
+
+def _trie_node_regex(node):
+    # Cadenas sin bifurcaciones se emiten como un literal
+    literal = []
+    while len(node) == 1 and '' not in node:
+        (ch, node), = node.items()
+        literal.append(re.escape(ch))
+
+    terminal = '' in node
+    branches = [re.escape(ch) + _trie_node_regex(child)
+                for ch, child in sorted(node.items()) if ch != '']
+    if not branches:
+        return ''.join(literal)
+    group = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if terminal:
+        group = '(?:' + group + ')?' if len(branches) == 1 else group + '?'
+    return ''.join(literal) + group
+
+
+MATCHER = MultiReplacer(TRANSLATIONS)
+
+
 def translate_file(filepath):
     """Agrega atributos data-i18n al archivo HTML"""
     with open(filepath, 'r', encoding='utf-8') as f:
         content = f.read()
     
-    # Aplicar todas las traducciones
-    for old, new in TRANSLATIONS.items():
-        if old in content:
-            content = content.replace(old, new)
-    
-    # Guardar archivo
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(content)
+    # Aplicar todas las traducciones en una sola pasada
+    content = MATCHER.sub(content)
     
-    print(f"✅ Archivo traducido: {filepath}")
+    # Guardar archivo (solo si cambia)
+    if atomic_write_text(filepath, content):
+        print(f"✅ Archivo traducido: {filepath}")
+    else:
+        print(f"➖ Sin cambios: {filepath}")
 
 if __name__ == '__main__':
     translate_file('site/secciones/info.html')
@@ -1,78 +1,139 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-"""Script para verificar que info.html está 100% traducido"""
+"""Script para verificar que info.html está 100% traducido
 
+Uso:
+    python verify_translation.py                       # site/secciones/info.html
+    python verify_translation.py site/secciones/*.html
+
+La página se tokeniza una sola vez (html_index) y todas las comprobaciones se
+hacen sobre ese índice, cada hallazgo con su línea:columna exacta.
+"""
+
+import os
 import re
+import sys
+
+from html_index import load_index
+
+DEFAULT_PATH = os.path.join('site', 'secciones', 'info.html')
 
-filepath = r"site\secciones\info.html"
-
-with open(filepath, 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# Buscar elementos sin traducir
-issues = []
-
-# 1. Labels sin data-i18n (excepto algunos genéricos como "Duración:")
-labels_pattern = r'<label(?![^>]*data-i18n)[^>]*>([^<]+)</label>'
-labels = re.findall(labels_pattern, content)
-if labels:
-    issues.append(f"❌ Labels sin data-i18n: {len(labels)}")
-    for label in labels[:5]:  # Mostrar los primeros 5
-        issues.append(f"   - {label.strip()}")
-
-# 2. Botones chip sin data-i18n
-chip_buttons = re.findall(r'<button[^>]*class="chip"[^>]*>([^<]+)</button>', content)
-chip_buttons_sin_i18n = [b for b in chip_buttons if 'data-i18n' not in content[content.find(f'>{b}<') - 100:content.find(f'>{b}<')]]
-if chip_buttons_sin_i18n:
-    issues.append(f"❌ Botones chip sin data-i18n: {len(chip_buttons_sin_i18n)}")
-
-# 3. Inputs placeholder sin data-i18n-placeholder
-placeholders = re.findall(r'placeholder="([^"]+)"', content)
-placeholders_sin_i18n = []
-for ph in placeholders:
-    if ph and not ph.isdigit() and 'http' not in ph:
-        # Buscar si tiene data-i18n-placeholder cerca
-        ph_context = content[max(0, content.find(f'placeholder="{ph}"') - 150):content.find(f'placeholder="{ph}"')]
-        if 'data-i18n-placeholder' not in ph_context:
-            placeholders_sin_i18n.append(ph)
-
-if placeholders_sin_i18n:
-    issues.append(f"⚠️  Placeholders sin data-i18n-placeholder: {len(set(placeholders_sin_i18n))}")
-    for ph in list(set(placeholders_sin_i18n))[:5]:
-        issues.append(f"   - {ph}")
-
-# 4. Textos estáticos importantes
-static_texts = [
-    ('Importante:', 'data-i18n="info.important"'),
-    ('Guardar', 'data-i18n="info.save"'),
-    ('Estamos', 'data-i18n="info.weAre"'),
-    ('guardando tu información', 'data-i18n="info.savingYourInfo"'),
+# Textos estáticos importantes: (texto, clave que debe llevar el elemento que lo contiene)
+STATIC_TEXTS = [
+    ('Importante:', 'info.important'),
+    ('Guardar', 'info.save'),
+    ('Estamos', 'info.weAre'),
+    ('guardando tu información', 'info.savingYourInfo'),
 ]
 
-for text, expected_attr in static_texts:
-    if text in content:
-        # Verificar que el contexto incluye el atributo
-        text_pos = content.find(text)
-        context = content[max(0, text_pos - 100):text_pos + 100]
-        if expected_attr not in context:
-            issues.append(f"⚠️  '{text}' sin atributo correcto")
-
-# Resumen
-print("=" * 60)
-print("VERIFICACIÓN DE TRADUCCIÓN DE INFO.HTML")
-print("=" * 60)
-
-if not issues:
-    print("✅ ¡PERFECTO! TODO está traducido correctamente")
-    print("✅ Todas las etiquetas tienen data-i18n")
-    print("✅ Todos los placeholders tienen data-i18n-placeholder")
-    print("✅ Todos los botones tienen data-i18n")
-else:
-    print(f"⚠️  Se encontraron {len(issues)} problemas:\n")
-    for issue in issues:
-        print(issue)
-
-print("\n" + "=" * 60)
-print(f"Total de atributos data-i18n: {content.count('data-i18n=')}")
-print(f"Total de atributos data-i18n-placeholder: {content.count('data-i18n-placeholder=')}")
-print("=" * 60)
+
+def _plain_text(element):
+    """Texto del elemento si no tiene hijos (como el antiguo ``>([^<]+)<``)"""
+    if element.children:
+        return None
+    text = element.text
+    return text if text.strip() else None
+
+
+def check_labels(index):
+    """1. Labels sin data-i18n (excepto algunos genéricos como "Duración:")"""
+    findings = []
+    for el in index.by_tag('label'):
+        text = _plain_text(el)
+        if text is not None and not el.has('data-i18n'):
+            findings.append((el.start, text.strip()))
+    return findings
+
+
+def check_chip_buttons(index):
+    """2. Botones chip sin data-i18n"""
+    findings = []
+    for el in index.by_tag('button'):
+        if el.attrs.get('class') != 'chip':
+            continue
+        text = _plain_text(el)
+        if text is not None and not el.has('data-i18n'):
+            findings.append((el.start, text.strip()))
+    return findings
+
+
+def check_placeholders(index):
+    """3. Inputs placeholder sin data-i18n-placeholder"""
+    findings = []
+    for el in index.with_attr('placeholder'):
+        ph = el.attrs['placeholder']
+        if ph and not ph.isdigit() and 'http' not in ph and not el.has('data-i18n-placeholder'):
+            findings.append((el.start, ph))
+    return findings
+
+
+def check_static_texts(index, static_texts=STATIC_TEXTS):
+    """4. Textos estáticos importantes: cada aparición debe llevar su clave"""
+    findings = []
+    patterns = [(re.compile(r'(?<!\w)' + re.escape(text) + r'(?!\w)'), text, key)
+                for text, key in static_texts]
+    for offset, data, parent in index.text_nodes:
+        for pattern, text, key in patterns:
+            m = pattern.search(data)
+            if not m:
+                continue
+            # La clave puede estar en el propio elemento o en un ancestro
+            owners = [parent] + list(index.ancestors(parent)) if parent else []
+            if not any(el.attrs.get('data-i18n') == key for el in owners):
+                findings.append((offset + m.start(), text))
+    return findings
+
+
+CHECKS = [
+    ('❌', 'Labels sin data-i18n', check_labels),
+    ('❌', 'Botones chip sin data-i18n', check_chip_buttons),
+    ('⚠️ ', 'Placeholders sin data-i18n-placeholder', check_placeholders),
+    ('⚠️ ', 'Textos estáticos sin atributo correcto', check_static_texts),
+]
+
+
+def verify(path):
+    """Ejecuta todas las comprobaciones y devuelve (índice, [(icono, título, hallazgos)])"""
+    index = load_index(path)
+    results = [(icon, title, check(index)) for icon, title, check in CHECKS]
+    return index, results
+
+
+def report(path, index, results):
+    issues = [(icon, title, found) for icon, title, found in results if found]
+
+    print("=" * 60)
+    print(f"VERIFICACIÓN DE TRADUCCIÓN DE {os.path.basename(path).upper()}")
+    print("=" * 60)
+
+    if not issues:
+        print("✅ ¡PERFECTO! TODO está traducido correctamente")
+        print("✅ Todas las etiquetas tienen data-i18n")
+        print("✅ Todos los placeholders tienen data-i18n-placeholder")
+        print("✅ Todos los botones tienen data-i18n")
+    else:
+        total = sum(len(found) for _, _, found in issues)
+        print(f"⚠️  Se encontraron {total} problemas:\n")
+        for icon, title, found in issues:
+            print(f"{icon} {title}: {len(found)}")
+            for offset, text in found:
+                print(f"   - {path}:{index.location(offset)}  {text}")
+
+    print("\n" + "=" * 60)
+    print(f"Total de atributos data-i18n: {len(index.with_attr('data-i18n'))}")
+    print(f"Total de atributos data-i18n-placeholder: {len(index.with_attr('data-i18n-placeholder'))}")
+    print("=" * 60)
+    return not issues
+
+
+def main(argv=None):
+    paths = (sys.argv[1:] if argv is None else argv) or [DEFAULT_PATH]
+    ok = True
+    for path in paths:
+        index, results = verify(path)
+        ok = report(path, index, results) and ok
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())